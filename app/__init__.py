@@ -17,4 +17,13 @@ def create_app(test_config=None):
     from app.routes import main
     app.register_blueprint(main)
     
+    # Jobs left queued or running by a stopped worker can never finish: fail them
+    # now, and keep sweeping for those of workers that stop while this one runs
+    from app.services import job_queue
+    try:
+        job_queue.fail_stale_jobs()
+    except Exception as e:
+        app.logger.error(f"Error recovering unfinished jobs: {str(e)}")
+    job_queue.start_sweeper()
+    
     return app
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""
+Headless batch extractor for archived Crunchbase pages.
+
+Usage:
+    python -m app.cli PAGES_DIR_OR_ZIP --output OUT_DIR [--workers N] [--settings settings.json]
+
+Runs the same extraction, settings and dedup rules as the web app and
+appends contacts, companies, pipelines and email templates to files in
+OUT_DIR as pages finish. Re-running with the same OUT_DIR resumes after
+the last checkpointed page.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import ZipFile
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+from app.config import Config
+from app.services.batch_processor import HTML_EXTENSIONS
+from app.services.html_stream import read_html
+from app.services.email_generator import generate_email_templates
+from app.services.exporter import CONTACT_FIELDS, COMPANY_FIELDS, PIPELINE_FIELDS
+from app.services.extractor import process_html_file
+from app.services.near_duplicates import NEAR_DUPLICATE_FIELDS, NearDuplicateIndex
+from app.services.result_store import CONTACT_KEYS, COMPANY_KEYS, PIPELINE_KEYS
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'processed.txt'
+# Checkpoint lines are the page name, then the output file sizes once its rows were written
+CHECKPOINT_SEPARATOR = '\t'
+TEMPLATES_FILE = 'email_templates.txt'
+TEMPLATES_HEADER = "\n\n" + "-"*50
+
+OUTPUT_TABLES = [
+    ('contacts', 'contacts.csv', CONTACT_FIELDS, CONTACT_KEYS),
+    ('companies', 'companies.csv', COMPANY_FIELDS, COMPANY_KEYS),
+    ('pipelines', 'pipelines.csv', PIPELINE_FIELDS, PIPELINE_KEYS)
+]
+
+def list_pages(source):
+    """
+    List the HTML pages in a directory tree or zip archive, in a stable order.
+
+    Args:
+        source: Path to a directory or a .zip file
+
+    Returns:
+        List of page names (relative paths or zip member names)
+    """
+    if os.path.isfile(source) and source.lower().endswith('.zip'):
+        with ZipFile(source) as zf:
+            return sorted(info.filename for info in zf.infolist()
+                          if not info.is_dir() and info.filename.lower().endswith(HTML_EXTENSIONS))
+
+    pages = []
+    for root, _, filenames in os.walk(source):
+        for filename in filenames:
+            if filename.lower().endswith(HTML_EXTENSIONS):
+                pages.append(os.path.relpath(os.path.join(root, filename), source))
+    return sorted(pages)
+
+def extract_page(source, name, settings):
+    """Read one page from the source and extract its rows (runs in a worker process)."""
+    if os.path.isfile(source) and source.lower().endswith('.zip'):
+        with ZipFile(source) as zf, zf.open(name) as f:
+            file_content = read_html(f)
+    else:
+        with open(os.path.join(source, name), 'rb') as f:
+            file_content = read_html(f)
+
+    return process_html_file(file_content, settings)
+
+def truncate_file(path, size):
+    """Cut a file back to size bytes if it has grown past it."""
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, 'r+b') as f:
+            f.truncate(size)
+
+def key_digest(row, keys):
+    """Hash the dedup key of a row so the index stays small."""
+    values = [row.get(key, '') for key in keys]
+    return hashlib.sha1(json.dumps(values).encode('utf-8')).digest()
+
+class OutputWriter:
+    """Appends deduplicated rows and email templates to the output directory."""
+
+    def __init__(self, output_dir, settings, sizes=None):
+        """
+        Open the output files, dropping anything written after the last checkpoint.
+
+        Args:
+            output_dir: Directory receiving the CSVs and templates
+            settings: Settings applied to the email templates
+            sizes: Optional file sizes recorded by the last checkpoint, by file name
+        """
+        sizes = sizes or {}
+        self.output_dir = output_dir
+        self.settings = settings
+        self.seen = {table: set() for table, _, _, _ in OUTPUT_TABLES}
+        # Near-duplicate indexes over the rows of each table, keyed by row number
+        self.near = {table: NearDuplicateIndex(table) for table, _, _, _ in OUTPUT_TABLES
+                     if Config.NEAR_DUPLICATES_ENABLED and table in NEAR_DUPLICATE_FIELDS}
+        self.files = {}
+        self.writers = {}
+        self.written = {table: 0 for table, _, _, _ in OUTPUT_TABLES}
+
+        os.makedirs(output_dir, exist_ok=True)
+        for table, filename, fieldnames, keys in OUTPUT_TABLES:
+            path = os.path.join(output_dir, filename)
+            # Rows of pages that were not checkpointed (the last possibly cut short by a crash)
+            # are dropped; those pages are processed again
+            if filename in sizes:
+                truncate_file(path, sizes[filename])
+            exists = os.path.exists(path) and os.path.getsize(path) > 0
+            if exists:
+                # Rebuild the dedup index from rows written by earlier runs
+                with open(path, 'r', newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        self.remember(table, row, key_digest(row, keys))
+
+            self.files[table] = open(path, 'a', newline='', encoding='utf-8')
+            self.writers[table] = csv.DictWriter(self.files[table], fieldnames=fieldnames)
+            if not exists:
+                self.writers[table].writeheader()
+
+        templates_path = os.path.join(output_dir, TEMPLATES_FILE)
+        if TEMPLATES_FILE in sizes:
+            truncate_file(templates_path, sizes[TEMPLATES_FILE])
+        self.templates_written = os.path.exists(templates_path) and os.path.getsize(templates_path) > len(TEMPLATES_HEADER)
+        self.templates_file = open(templates_path, 'a', encoding='utf-8')
+        if self.templates_file.tell() == 0:
+            self.templates_file.write(TEMPLATES_HEADER)
+
+    def remember(self, table, row, digest):
+        """Add a written row to the dedup indexes of its table."""
+        self.seen[table].add(digest)
+        if table in self.near:
+            self.near[table].add(len(self.near[table].signatures), row)
+
+    def is_duplicate(self, table, row, digest):
+        """Check a row against the rows already written, exactly or (when enabled) as a near-duplicate."""
+        if digest in self.seen[table]:
+            return True
+        return table in self.near and self.near[table].find(row) is not None
+
+    def write(self, extracted_data):
+        """Append the rows of one page that are not duplicates of rows already written."""
+        new_contacts = []
+        for table, _, fieldnames, keys in OUTPUT_TABLES:
+            for row in extracted_data[table]:
+                digest = key_digest(row, keys)
+                if self.is_duplicate(table, row, digest):
+                    continue
+                self.remember(table, row, digest)
+                self.writers[table].writerow({field: row.get(field, '') for field in fieldnames})
+                self.written[table] += 1
+                if table == 'contacts':
+                    new_contacts.append(row)
+
+        # Generate email templates only for new contacts
+        for template in generate_email_templates({'contacts': new_contacts}, self.settings):
+            if self.templates_written:
+                self.templates_file.write("\n\n")
+            self.templates_file.write(template)
+            self.templates_written = True
+
+    def flush(self):
+        """Flush all output files to disk and return their sizes in bytes, by file name."""
+        outputs = [(filename, self.files[table]) for table, filename, _, _ in OUTPUT_TABLES]
+        outputs.append((TEMPLATES_FILE, self.templates_file))
+        sizes = {}
+        for filename, f in outputs:
+            f.flush()
+            os.fsync(f.fileno())
+            sizes[filename] = os.fstat(f.fileno()).st_size
+        return sizes
+
+    def close(self):
+        """Flush and close all output files."""
+        self.flush()
+        for f in list(self.files.values()) + [self.templates_file]:
+            f.close()
+
+def load_checkpoint(output_dir):
+    """
+    Read the pages already processed by earlier runs, dropping a last line cut short by a crash.
+
+    Args:
+        output_dir: Directory holding the checkpoint
+
+    Returns:
+        Tuple of (set of page names, output file sizes recorded by the last checkpoint line)
+    """
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return set(), {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    complete = data[:data.rfind(b'\n') + 1]
+    if len(complete) < len(data):
+        truncate_file(path, len(complete))
+
+    pages = set()
+    sizes = {}
+    for line in complete.decode('utf-8').split('\n'):
+        name, _, recorded = line.partition(CHECKPOINT_SEPARATOR)
+        if name.strip():
+            pages.add(name)
+        if recorded:
+            sizes = json.loads(recorded)
+    return pages, sizes
+
+def write_checkpoint(checkpoint, name, sizes):
+    """Record a processed page (or, with an empty name, the start of a run) and the output file sizes."""
+    checkpoint.write(f"{name}{CHECKPOINT_SEPARATOR}{json.dumps(sizes)}\n")
+    checkpoint.flush()
+
+def print_progress(done, total, failed, started):
+    """Print a single-line progress report to stderr."""
+    elapsed = time.time() - started
+    rate = done / elapsed if elapsed else 0.0
+    sys.stderr.write(f"\r{done}/{total} pages, {failed} failed, {rate:.1f} pages/s")
+    sys.stderr.flush()
+
+def run(source, output_dir, settings, workers):
+    """
+    Extract every page in source, appending results to output_dir.
+
+    Args:
+        source: Directory or zip of saved pages
+        output_dir: Directory receiving the CSVs, templates and checkpoint
+        settings: Settings applied to the extracted rows
+        workers: Number of worker processes
+
+    Returns:
+        Number of pages that failed
+    """
+    completed, sizes = load_checkpoint(output_dir)
+    pages = [name for name in list_pages(source) if name not in completed]
+    total = len(completed) + len(pages)
+    logger.info(f"{len(pages)} pages to process, {len(completed)} already done")
+
+    writer = OutputWriter(output_dir, settings, sizes)
+    checkpoint = open(os.path.join(output_dir, CHECKPOINT_FILE), 'a', encoding='utf-8')
+    # Files a crash leaves behind in this run are cut back to at least where it started
+    write_checkpoint(checkpoint, '', writer.flush())
+    done = len(completed)
+    failed = 0
+    started = time.time()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Bound in-flight pages so memory does not grow with the corpus, and
+            # handle results in submission order so dedup matches a sequential run
+            in_flight = deque()
+            page_iter = iter(pages)
+            while True:
+                while len(in_flight) < workers * 2:
+                    name = next(page_iter, None)
+                    if name is None:
+                        break
+                    in_flight.append((name, executor.submit(extract_page, source, name, settings)))
+                if not in_flight:
+                    break
+
+                name, future = in_flight.popleft()
+                try:
+                    writer.write(future.result())
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error processing {name}: {str(e)}")
+                    continue
+
+                # Checkpoint only once the page's rows are on disk
+                write_checkpoint(checkpoint, name, writer.flush())
+                done += 1
+                print_progress(done, total, failed, started)
+    finally:
+        writer.close()
+        checkpoint.close()
+        sys.stderr.write('\n')
+
+    logger.info(f"Wrote {writer.written['contacts']} contacts, {writer.written['companies']} companies, "
+                f"{writer.written['pipelines']} pipelines to {output_dir}")
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extract contacts, companies and pipelines from saved Crunchbase pages.')
+    parser.add_argument('source', help='Directory or zip file of saved HTML pages')
+    parser.add_argument('--output', '-o', required=True, help='Output directory for CSVs, templates and checkpoint')
+    parser.add_argument('--workers', '-j', type=int, default=Config.BATCH_MAX_WORKERS, help='Number of worker processes')
+    parser.add_argument('--settings', help='JSON file with settings overriding the defaults')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = Config.DEFAULT_SETTINGS.copy()
+    if args.settings:
+        with open(args.settings, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+
+    failed = run(args.source, args.output, settings, max(args.workers, 1))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
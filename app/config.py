@@ -3,8 +3,95 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hillsideventures2025'
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH') or 128 * 1024 * 1024)  # 128MB max upload size
+    # Uploads are spooled to disk by the request parser and read back in chunks of this many bytes
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE') or 1024 * 1024)
     APOLLO_API_KEY = os.environ.get('APOLLO_API_KEY') or "YOUR_APOLLO_API_KEY"
+    APOLLO_API_URL = os.environ.get('APOLLO_API_URL') or 'https://api.apollo.io'
+    
+    # Apollo client connection pool, timeouts (seconds) and retry policy
+    APOLLO_POOL_SIZE = int(os.environ.get('APOLLO_POOL_SIZE') or 10)
+    APOLLO_MAX_WORKERS = int(os.environ.get('APOLLO_MAX_WORKERS') or 10)
+    APOLLO_CONNECT_TIMEOUT = float(os.environ.get('APOLLO_CONNECT_TIMEOUT') or 3.05)
+    APOLLO_READ_TIMEOUT = float(os.environ.get('APOLLO_READ_TIMEOUT') or 10)
+    APOLLO_MAX_RETRIES = int(os.environ.get('APOLLO_MAX_RETRIES') or 3)
+    APOLLO_BACKOFF_FACTOR = float(os.environ.get('APOLLO_BACKOFF_FACTOR') or 0.5)
+    
+    # On-disk Apollo lookup cache shared by all worker processes (TTLs in seconds)
+    APOLLO_CACHE_ENABLED = (os.environ.get('APOLLO_CACHE_ENABLED') or '1') == '1'
+    APOLLO_CACHE_PATH = os.environ.get('APOLLO_CACHE_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'cache', 'apollo_cache.sqlite3')
+    APOLLO_CACHE_TTL = int(os.environ.get('APOLLO_CACHE_TTL') or 30 * 24 * 3600)
+    APOLLO_CACHE_NEGATIVE_TTL = int(os.environ.get('APOLLO_CACHE_NEGATIVE_TTL') or 7 * 24 * 3600)
+    APOLLO_CACHE_MAX_ENTRIES = int(os.environ.get('APOLLO_CACHE_MAX_ENTRIES') or 100000)
+    
+    # Token bucket shared by all threads and worker processes: requests per second and burst size (0 disables)
+    APOLLO_RATE_LIMIT = float(os.environ.get('APOLLO_RATE_LIMIT') or 5)
+    APOLLO_RATE_BURST = int(os.environ.get('APOLLO_RATE_BURST') or 10)
+    APOLLO_RATE_LIMIT_PATH = os.environ.get('APOLLO_RATE_LIMIT_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'cache', 'apollo_rate_limit.sqlite3')
+    
+    # Number of worker processes used by the batch upload endpoint
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS') or os.cpu_count() or 1)
+    
+    # HTML parser backend: 'html.parser', 'lxml' or 'html5lib' (the latter two are optional installs)
+    HTML_PARSER = os.environ.get('HTML_PARSER') or 'html.parser'
+    
+    # Read fields from the page's serialized app state before falling back to the DOM
+    APP_STATE_ENABLED = (os.environ.get('APP_STATE_ENABLED') or '1') == '1'
+    
+    # Strip comments, script/style bodies and SVG icons before parsing
+    PREFILTER_ENABLED = (os.environ.get('PREFILTER_ENABLED') or '1') == '1'
+    
+    # Search and list result pages: one record per row, with Apollo lookups batched per chunk of rows
+    LIST_PAGES_ENABLED = (os.environ.get('LIST_PAGES_ENABLED') or '1') == '1'
+    LIST_LOOKUP_BATCH = int(os.environ.get('LIST_LOOKUP_BATCH') or 50)
+    
+    # Content-hash cache of extracted page fields: LRU entries in memory plus an optional disk tier
+    PARSE_CACHE_ENABLED = (os.environ.get('PARSE_CACHE_ENABLED') or '1') == '1'
+    PARSE_CACHE_SIZE = int(os.environ.get('PARSE_CACHE_SIZE') or 256)
+    PARSE_CACHE_DIR = os.environ.get('PARSE_CACHE_DIR') or None
+    
+    # Per-selector hit statistics, persisted across restarts, reported by /api/selector-stats
+    # (diagnostics only, off by default: extraction writes them to SQLite every SELECTOR_STATS_FLUSH pages)
+    SELECTOR_STATS_ENABLED = (os.environ.get('SELECTOR_STATS_ENABLED') or '0') == '1'
+    SELECTOR_STATS_PATH = os.environ.get('SELECTOR_STATS_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'cache', 'selector_stats.sqlite3')
+    SELECTOR_STATS_FLUSH = int(os.environ.get('SELECTOR_STATS_FLUSH') or 20)          # pages between writes
+    SELECTOR_MIN_SAMPLES = int(os.environ.get('SELECTOR_MIN_SAMPLES') or 50)          # pages before ranking or alerting
+    SELECTOR_FALLBACK_ALERT = float(os.environ.get('SELECTOR_FALLBACK_ALERT') or 0.5) # fallback share that warns
+    
+    # Result storage backend: 'sqlite' (durable, shared by all workers) or 'memory'
+    RESULT_STORE = os.environ.get('RESULT_STORE') or 'sqlite'
+    RESULT_STORE_PATH = os.environ.get('RESULT_STORE_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'results.sqlite3')
+    
+    # Also treat entries whose canonical domain, company name tokens and founder nearly match a stored entry as
+    # duplicates (opt-in: matched entries are dropped without saying which stored entry they matched)
+    NEAR_DUPLICATES_ENABLED = (os.environ.get('NEAR_DUPLICATES_ENABLED') or '0') == '1'
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD') or 0.85)
+    
+    # Background processing jobs: worker threads and number of finished jobs kept
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 4)
+    JOB_HISTORY = int(os.environ.get('JOB_HISTORY') or 500)
+    # Unfinished jobs whose worker has not reported progress for this many seconds are failed
+    JOB_STALE_AFTER = int(os.environ.get('JOB_STALE_AFTER') or 900)
+    # Seconds between sweeps for such jobs after the one at startup (0 sweeps only at startup)
+    JOB_SWEEP_INTERVAL = int(os.environ.get('JOB_SWEEP_INTERVAL') or 60)
+    JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'jobs.sqlite3')
+    
+    # Deflate level (0-9) used for the results zip download
+    EXPORT_COMPRESSION_LEVEL = int(os.environ.get('EXPORT_COMPRESSION_LEVEL') or 6)
+    # Rows read from the store and written per batch by NDJSON, Arrow and Parquet exports
+    EXPORT_BATCH_ROWS = int(os.environ.get('EXPORT_BATCH_ROWS') or 10000)
+    # CSV export files appended to on each confirm, so an unchanged download is served as a plain file
+    MATERIALIZED_EXPORTS_ENABLED = (os.environ.get('MATERIALIZED_EXPORTS_ENABLED') or '1') == '1'
+    MATERIALIZED_EXPORT_DIR = os.environ.get('MATERIALIZED_EXPORT_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'exports')
+    
+    # Stage timing, counters, Server-Timing headers and /api/metrics
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or '0') == '1'
     
     # Default settings
     DEFAULT_SETTINGS = {
@@ -15,5 +102,6 @@ class Config:
         'industry_vertical': '',
         'industry': '',
         'sourcing_analyst': '',
-        'investment_cycle': ''
+        'investment_cycle': '',
+        'email_template': 'introduction'
     }
\ No newline at end of file
@@ -1,10 +1,18 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file,
+                   Response, stream_with_context)
 from app.config import Config
 from app.services.extractor import process_html_file
-from app.services.csv_generator import save_to_csv
-from app.services.email_generator import generate_email_templates
-import io
-from zipfile import ZipFile
+from app.services import apollo_cache, job_queue, metrics, parse_cache, selector_stats
+from app.services.exporter import generate_results_zip, available_formats, CONTACT_FIELDS, COMPANY_FIELDS, PIPELINE_FIELDS
+from app.services.email_generator import (EMAIL_TEMPLATE_TEXTS, create_template_records,
+                                          normalize_template_record, render_email_template,
+                                          template_settings_key)
+from app.services.batch_processor import process_html_batch, read_zip_entries
+from app.services.html_stream import read_html
+from app.services.result_store import (ResultTable, create_result_store, is_duplicate_entry, CONTACT_KEYS,
+                                      COMPANY_KEYS, PIPELINE_KEYS, PIPELINE_EMAIL_KEYS, EMAIL_TEMPLATE_KEYS,
+                                      QUERY_COLUMNS)
+import hashlib
 import json
 import os
 import logging
@@ -15,38 +23,107 @@ logger = logging.getLogger(__name__)
 
 main = Blueprint('main', __name__)
 
-# In-memory storage for settings and results
-current_settings = Config.DEFAULT_SETTINGS.copy()
-processed_results = {
-    'contacts': [],
-    'companies': [],
-    'pipelines': [],
-    'email_templates': [],
-    'zip_files': []
+# Storage for settings and results, shared by all workers when backed by SQLite
+result_store = create_result_store()
+
+# Columns shown for each results table, in export order
+RESULT_COLUMNS = {
+    'contacts': CONTACT_FIELDS,
+    'companies': COMPANY_FIELDS,
+    'pipelines': PIPELINE_FIELDS,
+    'email_templates': []
 }
+RESULTS_PAGE_LIMIT = 50
+RESULTS_MAX_LIMIT = 500
+
+@main.before_request
+def start_request_timing():
+    """Start collecting per-stage timings for the Server-Timing header"""
+    metrics.start_request()
+
+@main.after_request
+def add_server_timing(response):
+    """Report the stages timed during this request in a Server-Timing header"""
+    server_timing = metrics.finish_request()
+    if server_timing:
+        response.headers['Server-Timing'] = server_timing
+    return response
 
 @main.route('/')
 def index():
     """Render the main page"""
     return render_template('index.html', 
-                           settings=current_settings, 
-                           processed_results=processed_results)
+                           settings=result_store.get_settings(), 
+                           processed_results=result_store.counts(),
+                           email_templates=list(EMAIL_TEMPLATE_TEXTS))
 
 @main.route('/results')
 def results():
     """Render the results page"""
     # Ensure there are results to display
-    if not processed_results['contacts']:
+    if not result_store.counts()['contacts']:
         return redirect(url_for('main.index'))
     
+    # Rows are fetched page by page from /api/results/<table>
     return render_template('results.html', 
-                           settings=current_settings,
-                           contacts=processed_results['contacts'],
-                           companies=processed_results['companies'],
-                           pipelines=processed_results['pipelines'],
-                           email_templates=processed_results['email_templates'],
+                           settings=result_store.get_settings(),
+                           counts=result_store.counts(),
                            download_url=url_for('main.download_results'))
 
+@main.route('/api/results/<table>', methods=['GET'])
+def query_results(table):
+    """API endpoint returning one page of a results table"""
+    if table not in RESULT_COLUMNS:
+        return jsonify({'status': 'error', 'message': f"Unknown results table: {table}"}), 404
+    
+    try:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', RESULTS_PAGE_LIMIT, type=int), 1), RESULTS_MAX_LIMIT)
+        sort = request.args.get('sort') or None
+        descending = request.args.get('order') == 'desc'
+        
+        # Any sortable column passed as a query argument filters on that column
+        columns = QUERY_COLUMNS[table]
+        filters = {column: request.args[column] for column in columns if request.args.get(column)}
+        if sort is not None and sort not in columns:
+            return jsonify({'status': 'error', 'message': f"Cannot sort {table} by {sort}"}), 400
+        
+        # The page only changes when the stored results do, so let clients revalidate cheaply.
+        # The store id keeps a restarted memory store's reused generations from matching old tags,
+        # and rendered templates also change with the settings they are rendered with.
+        version = f"{result_store.store_id}:{result_store.generation()}"
+        if table == 'email_templates':
+            version += f":{template_settings_key(result_store.get_settings())}"
+        etag = hashlib.sha1(
+            f"{version}:{table}:{request.query_string.decode('utf-8')}".encode('utf-8')
+        ).hexdigest()
+        if etag in request.if_none_match:
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
+        
+        rows, total = result_store.query_rows(table, offset, limit, sort, descending, filters)
+        if table == 'email_templates':
+            # Templates are stored as parameters and rendered for the page being viewed
+            settings = result_store.get_settings()
+            rows = [render_email_template(record, settings) for record in rows]
+        next_offset = offset + len(rows)
+        
+        response = jsonify({
+            'status': 'success',
+            'table': table,
+            'rows': rows,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'next_offset': next_offset if next_offset < total else None,
+            'columns': RESULT_COLUMNS[table],
+            'sortable': columns
+        })
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        logger.error(f"Error querying results: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @main.route('/api/update-settings', methods=['POST'])
 def update_settings():
     """API endpoint to update settings"""
@@ -59,10 +136,14 @@ def update_settings():
         logger.info(f"Received settings update: {data}")
         
         # Update settings
-        current_settings['industry_vertical'] = data.get('industry_vertical', current_settings['industry_vertical'])
-        current_settings['industry'] = data.get('industry', current_settings['industry'])
-        current_settings['sourcing_analyst'] = data.get('sourcing_analyst', current_settings['sourcing_analyst'])
-        current_settings['investment_cycle'] = data.get('investment_cycle', current_settings['investment_cycle'])
+        current_settings = result_store.get_settings()
+        current_settings = result_store.update_settings({
+            'industry_vertical': data.get('industry_vertical', current_settings['industry_vertical']),
+            'industry': data.get('industry', current_settings['industry']),
+            'sourcing_analyst': data.get('sourcing_analyst', current_settings['sourcing_analyst']),
+            'investment_cycle': data.get('investment_cycle', current_settings['investment_cycle']),
+            'email_template': data.get('email_template', current_settings.get('email_template'))
+        })
         
         logger.info(f"Updated settings: {current_settings}")
         
@@ -71,23 +152,94 @@ def update_settings():
         logger.error(f"Error updating settings: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-def is_duplicate_entry(new_entry, existing_entries, keys_to_check):
+def email_template_previews(contacts, settings):
+    """
+    Build template records for new contacts, each with its rendered text for previewing
+    
+    Args:
+        contacts (list): New contacts
+        settings (dict): Settings used to choose and render the template
+    
+    Returns:
+        list: Template records with a 'Preview' field
+    """
+    return [dict(record, Preview=render_email_template(record, settings))
+            for record in create_template_records(contacts, settings)]
+
+def record_dedup_rejections(submitted, accepted):
+    """Count the entries of each table rejected as duplicates"""
+    for table, entries in accepted.items():
+        rejected = len(submitted.get(table, [])) - len(entries)
+        if rejected:
+            metrics.increment('dedup_rejections_total', rejected, table=table)
+
+def process_upload(file_content, settings):
+    """
+    Extract data from an uploaded page and keep only entries not already stored
+    
+    Args:
+        file_content (str): HTML content of the page
+        settings (dict): Settings applied to the extracted rows
+    
+    Returns:
+        dict: New contacts, companies, pipelines and email templates
+    """
+    extracted_data = process_html_file(file_content, settings)
+    
+    # Deduplication logic
+    with metrics.timed('dedup'):
+        deduped_contacts = []
+        for contact in extracted_data['contacts']:
+            if not result_store.is_stored('contacts', contact, CONTACT_KEYS):
+                deduped_contacts.append(contact)
+        
+        deduped_companies = []
+        for company in extracted_data['companies']:
+            if not result_store.is_stored('companies', company, COMPANY_KEYS):
+                deduped_companies.append(company)
+        
+        deduped_pipelines = []
+        for pipeline in extracted_data['pipelines']:
+            if not result_store.is_stored('pipelines', pipeline, PIPELINE_EMAIL_KEYS):
+                deduped_pipelines.append(pipeline)
+    
+    record_dedup_rejections(extracted_data, {
+        'contacts': deduped_contacts,
+        'companies': deduped_companies,
+        'pipelines': deduped_pipelines
+    })
+    
+    # Generate email templates only for new contacts
+    email_templates = email_template_previews(deduped_contacts, settings)
+    
+    return {
+        'contacts': deduped_contacts,
+        'companies': deduped_companies,
+        'pipelines': deduped_pipelines,
+        'email_templates': email_templates
+    }
+
+def read_uploaded_files(uploads):
     """
-    Check if an entry is a duplicate based on specified keys
+    Collect HTML pages from uploaded HTML files and zip archives
     
     Args:
-        new_entry (dict): The new entry to check
-        existing_entries (list): List of existing entries
-        keys_to_check (list): Keys to compare for determining duplicates
+        uploads (list): Uploaded FileStorage objects
     
     Returns:
-        bool: True if duplicate, False otherwise
+        tuple: List of (filename, html_content) tuples and list of skipped filenames
     """
-    for existing_entry in existing_entries:
-        # Check if all specified keys match
-        if all(new_entry.get(key) == existing_entry.get(key) for key in keys_to_check):
-            return True
-    return False
+    files = []
+    skipped = []
+    for upload in uploads:
+        filename = upload.filename.lower()
+        if filename.endswith(('.html', '.htm')):
+            files.append((upload.filename, read_html(upload.stream)))
+        elif filename.endswith('.zip'):
+            files.extend(read_zip_entries(upload.stream))
+        else:
+            skipped.append(upload.filename)
+    return files, skipped
 
 @main.route('/api/process', methods=['POST'])
 def process_files():
@@ -102,69 +254,161 @@ def process_files():
             return jsonify({'status': 'error', 'message': 'No file selected'}), 400
         
         if file and file.filename.endswith(('.html', '.htm')):
-            # Read the file
-            try:
-                file_content = file.read().decode('utf-8')
-            except UnicodeDecodeError:
-                # Try with different encoding if UTF-8 fails
-                file.seek(0)
-                file_content = file.read().decode('latin-1')
+            # Read the spooled upload in chunks, decoding it once
+            file_content = read_html(file.stream)
             
             logger.info(f"Processing file: {file.filename}")
             
             # Process the file
-            extracted_data = process_html_file(file_content, current_settings)
+            new_data = process_upload(file_content, result_store.get_settings())
+            
+            logger.info("File processed successfully")
+            
+            with metrics.timed('serialize'):
+                return jsonify({
+                    'status': 'success',
+                    'message': 'File processed successfully',
+                    'new_data': new_data,
+                    'total_existing_results': result_store.counts()
+                })
+        else:
+            return jsonify({'status': 'error', 'message': 'Invalid file format. Please upload an HTML file.'}), 400
+            
+    except Exception as e:
+        logger.error(f"Error processing file: {str(e)}")
+        return jsonify({'status': 'error', 'message': f"Error processing file: {str(e)}"}), 500
+    
+@main.route('/api/process-batch', methods=['POST'])
+def process_batch():
+    """API endpoint to process many HTML files (or a zip of them) in parallel"""
+    try:
+        uploads = request.files.getlist('files') or request.files.getlist('file')
+        uploads = [upload for upload in uploads if upload and upload.filename]
+        
+        if not uploads:
+            return jsonify({'status': 'error', 'message': 'No files selected'}), 400
+        
+        # Collect HTML pages from direct uploads and zip archives
+        files, skipped = read_uploaded_files(uploads)
+        
+        if not files:
+            return jsonify({'status': 'error', 'message': 'No HTML files found in the upload.'}), 400
+        
+        logger.info(f"Processing batch of {len(files)} files")
+        
+        current_settings = result_store.get_settings()
+        results = process_html_batch(files, current_settings)
+        
+        # Merge results, deduplicating against stored results and within the batch
+        deduped_contacts = ResultTable()
+        deduped_companies = ResultTable()
+        deduped_pipelines = ResultTable()
+        errors = []
+        for filename, extracted_data, error in results:
+            if error:
+                errors.append({'file': filename, 'message': error})
+                continue
             
-            # Deduplication logic
-            deduped_contacts = []
             for contact in extracted_data['contacts']:
-                if not is_duplicate_entry(contact, processed_results['contacts'], 
-                                          ['Contact Name', 'Email', 'Company Name']):
+                if not (result_store.is_stored('contacts', contact, CONTACT_KEYS)
+                        or is_duplicate_entry(contact, deduped_contacts, CONTACT_KEYS, 'contacts')):
                     deduped_contacts.append(contact)
             
-            deduped_companies = []
             for company in extracted_data['companies']:
-                if not is_duplicate_entry(company, processed_results['companies'], 
-                                          ['Company Name', 'Website']):
+                if not (result_store.is_stored('companies', company, COMPANY_KEYS)
+                        or is_duplicate_entry(company, deduped_companies, COMPANY_KEYS, 'companies')):
                     deduped_companies.append(company)
             
-            deduped_pipelines = []
             for pipeline in extracted_data['pipelines']:
-                if not is_duplicate_entry(pipeline, processed_results['pipelines'], 
-                                          ['Deal Name', 'Company Name', 'Contact Name', 'Contact Email']):
+                if not (result_store.is_stored('pipelines', pipeline, PIPELINE_EMAIL_KEYS)
+                        or is_duplicate_entry(pipeline, deduped_pipelines, PIPELINE_EMAIL_KEYS, 'pipelines')):
                     deduped_pipelines.append(pipeline)
-            
-            # Generate email templates only for new contacts
-            email_templates = generate_email_templates(
-                {'contacts': deduped_contacts}, 
-                current_settings
-            )
-            
-            logger.info("File processed successfully")
-            
-            return jsonify({
-                'status': 'success',
-                'message': 'File processed successfully',
-                'new_data': {
-                    'contacts': deduped_contacts,
-                    'companies': deduped_companies,
-                    'pipelines': deduped_pipelines,
-                    'email_templates': email_templates
-                },
-                'total_existing_results': {
-                    'contacts': len(processed_results['contacts']),
-                    'companies': len(processed_results['companies']),
-                    'pipelines': len(processed_results['pipelines']),
-                    'email_templates': len(processed_results['email_templates'])
-                }
-            })
-        else:
-            return jsonify({'status': 'error', 'message': 'Invalid file format. Please upload an HTML file.'}), 400
-            
+        
+        # Generate email templates only for new contacts
+        email_templates = email_template_previews(deduped_contacts.rows, current_settings)
+        
+        logger.info(f"Batch processed: {len(files) - len(errors)} succeeded, {len(errors)} failed")
+        
+        return jsonify({
+            'status': 'success',
+            'message': f"Processed {len(files) - len(errors)} of {len(files)} files",
+            'new_data': {
+                'contacts': deduped_contacts.rows,
+                'companies': deduped_companies.rows,
+                'pipelines': deduped_pipelines.rows,
+                'email_templates': email_templates
+            },
+            'errors': errors,
+            'skipped_files': skipped,
+            'total_existing_results': result_store.counts()
+        })
     except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
-        return jsonify({'status': 'error', 'message': f"Error processing file: {str(e)}"}), 500
+        logger.error(f"Error processing batch: {str(e)}")
+        return jsonify({'status': 'error', 'message': f"Error processing batch: {str(e)}"}), 500
     
+@main.route('/api/jobs', methods=['POST'])
+def submit_processing_job():
+    """API endpoint to queue HTML files (or zips of them) for background processing"""
+    try:
+        uploads = request.files.getlist('files') or request.files.getlist('file')
+        uploads = [upload for upload in uploads if upload and upload.filename]
+        
+        if not uploads:
+            return jsonify({'status': 'error', 'message': 'No files selected'}), 400
+        
+        files, skipped = read_uploaded_files(uploads)
+        if not files:
+            return jsonify({'status': 'error', 'message': 'No HTML files found in the upload.'}), 400
+        
+        # Each file is processed with the settings in effect at submission
+        current_settings = result_store.get_settings()
+        
+        def handle_file(filename, file_content):
+            logger.info(f"Processing file: {filename}")
+            return {
+                'new_data': process_upload(file_content, current_settings),
+                'total_existing_results': result_store.counts()
+            }
+        
+        job_id = job_queue.submit_job(files, handle_file)
+        logger.info(f"Queued job {job_id} with {len(files)} files")
+        
+        return jsonify({
+            'status': 'success',
+            'job_id': job_id,
+            'status_url': url_for('main.get_processing_job', job_id=job_id),
+            'skipped_files': skipped
+        }), 202
+    except Exception as e:
+        logger.error(f"Error queueing job: {str(e)}")
+        return jsonify({'status': 'error', 'message': f"Error queueing job: {str(e)}"}), 500
+
+@main.route('/api/jobs/<job_id>', methods=['GET'])
+def get_processing_job(job_id):
+    """API endpoint to report a job's status and per-file results"""
+    try:
+        job = job_queue.get_job(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        
+        return jsonify({'status': 'success', 'job': job})
+    except Exception as e:
+        logger.error(f"Error reading job {job_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@main.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_processing_job(job_id):
+    """API endpoint to cancel a queued or running job"""
+    try:
+        job_status = job_queue.cancel_job(job_id)
+        if job_status is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        
+        return jsonify({'status': 'success', 'job_status': job_status})
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @main.route('/api/confirm-process', methods=['POST'])
 def confirm_process():
     """API endpoint to confirm and add processed data"""
@@ -175,49 +419,34 @@ def confirm_process():
         if not data:
             return jsonify({'status': 'error', 'message': 'No data provided'}), 400
         
-        # Deduplication logic (to double-check)
-        deduped_contacts = []
-        for contact in data.get('contacts', []):
-            if not is_duplicate_entry(contact, processed_results['contacts'], 
-                                      ['Contact Name', 'Email', 'Company Name']):
-                deduped_contacts.append(contact)
-        
-        deduped_companies = []
-        for company in data.get('companies', []):
-            if not is_duplicate_entry(company, processed_results['companies'], 
-                                      ['Company Name', 'Website']):
-                deduped_companies.append(company)
-        
-        deduped_pipelines = []
-        for pipeline in data.get('pipelines', []):
-            if not is_duplicate_entry(pipeline, processed_results['pipelines'], 
-                                      ['Deal Name', 'Company Name', 'Contact Name']):
-                deduped_pipelines.append(pipeline)
-
-        # Extend processed results with deduped data
-        processed_results['contacts'].extend(deduped_contacts)
-        processed_results['companies'].extend(deduped_companies)
-        processed_results['pipelines'].extend(deduped_pipelines)
-        # Check if email templates already exist before adding
-        new_email_templates = []
-        for template in data.get('email_templates', []):
-            if template not in processed_results['email_templates']:
-                new_email_templates.append(template)
-                
-        processed_results['email_templates'].extend(new_email_templates)
-
+        # Deduplication logic (to double-check), stored in a single transaction
+        with metrics.timed('dedup'):
+            added = result_store.add_results(
+                {
+                    'contacts': data.get('contacts', []),
+                    'companies': data.get('companies', []),
+                    'pipelines': data.get('pipelines', []),
+                    'email_templates': [normalize_template_record(record)
+                                        for record in data.get('email_templates', [])]
+                },
+                {
+                    'contacts': CONTACT_KEYS,
+                    'companies': COMPANY_KEYS,
+                    'pipelines': PIPELINE_KEYS,
+                    'email_templates': EMAIL_TEMPLATE_KEYS
+                }
+            )
+        deduped_contacts = added['contacts']
+        deduped_companies = added['companies']
+        deduped_pipelines = added['pipelines']
+        record_dedup_rejections(data, added)
         
         logger.info(f"Confirmed processing: {len(deduped_contacts)} contacts, {len(deduped_companies)} companies, {len(deduped_pipelines)} pipelines")
         
         return jsonify({
             'status': 'success',
             'message': 'Data added successfully',
-            'total_results': {
-                'contacts': len(processed_results['contacts']),
-                'companies': len(processed_results['companies']),
-                'pipelines': len(processed_results['pipelines']),
-                'email_templates': len(processed_results['email_templates'])
-            }
+            'total_results': result_store.counts()
         })
     except Exception as e:
         logger.error(f"Error confirming process: {str(e)}")
@@ -227,43 +456,33 @@ def confirm_process():
 def download_results():
     """API endpoint to download all processed results"""
     try:
-        if processed_results['contacts']:
-            # Merge all data into single CSV files
-            contacts_csv = save_to_csv(
-                processed_results['contacts'], 
-                ['Contact Name', 'First Name', 'Last Name', 'Prospect Quality Level', 'Company Name', 'Industry', 'Email']
-            )
-            
-            companies_csv = save_to_csv(
-                processed_results['companies'], 
-                ['Company Name', 'Website']
-            )
-            
-            pipelines_csv = save_to_csv(
-                processed_results['pipelines'], 
-                ['Deal Name', 'Company Name', 'Contact Name', 'Contact Email', 'Sub-Pipeline', 
-                 'Description', 'Stage', 'Industry Vertical', 'Investment Cycle', 'Contact', 
-                 'Sourcing Analyst']
-            )
-            
-            # Combine email templates into a single text file
-            email_templates_text = "\n\n" + "-"*50 + "\n\n".join(processed_results['email_templates'])
-            
-            # Create a zip file containing all CSVs and email templates
-            memory_file = io.BytesIO()
-            with ZipFile(memory_file, 'w') as zf:
-                zf.writestr('contacts.csv', contacts_csv)
-                zf.writestr('companies.csv', companies_csv)
-                zf.writestr('pipelines.csv', pipelines_csv)
-                zf.writestr('email_templates.txt', email_templates_text)
+        # Export format, e.g. ?format=ndjson or ?format=parquet (Arrow and Parquet need pyarrow)
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in available_formats():
+            return jsonify({
+                'status': 'error',
+                'message': f"Unsupported export format '{export_format}', expected one of: {', '.join(available_formats())}"
+            }), 400
+        
+        if result_store.counts()['contacts']:
+            # Compression level can be overridden per download, e.g. ?compression=1 for speed
+            compresslevel = request.args.get('compression', Config.EXPORT_COMPRESSION_LEVEL, type=int)
+            compresslevel = min(max(compresslevel, 0), 9)
             
-            memory_file.seek(0)
+            # CSV downloads are built from the export files kept up to date on confirm, and an
+            # unchanged dataset is served the same file again (or a 304 for a matching ETag)
+            if export_format == 'csv' and result_store.exports is not None:
+                download = result_store.exports.download(result_store, compresslevel)
+                if download is not None:
+                    path, etag = download
+                    return send_file(path, mimetype='application/zip', as_attachment=True,
+                                     download_name='crunchbase_data.zip', etag=etag, max_age=0)
             
-            return send_file(
-                memory_file,
-                download_name='crunchbase_data.zip',
-                as_attachment=True,
-                mimetype='application/zip'
+            # Stream the zip so rows are encoded and deflated chunk by chunk
+            return Response(
+                stream_with_context(generate_results_zip(result_store, compresslevel, export_format)),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=crunchbase_data.zip'}
             )
         else:
             return jsonify({'status': 'error', 'message': 'No data available for download'}), 404
@@ -271,16 +490,42 @@ def download_results():
         logger.error(f"Error downloading results: {str(e)}")
         return jsonify({'status': 'error', 'message': f"Error downloading results: {str(e)}"}), 500
 
+@main.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    """API endpoint to report parse and Apollo cache hit rates"""
+    try:
+        stats = {'parse_cache': parse_cache.get_cache_stats()}
+        if Config.APOLLO_CACHE_ENABLED:
+            stats['apollo_cache'] = apollo_cache.get_cache_stats()
+        
+        return jsonify({'status': 'success', 'stats': stats})
+    except Exception as e:
+        logger.error(f"Error reading cache stats: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@main.route('/api/selector-stats', methods=['GET'])
+def selector_stats_endpoint():
+    """API endpoint reporting per-selector hits, hit rankings and dominant fallbacks"""
+    try:
+        return jsonify({'status': 'success', 'stats': selector_stats.get_selector_stats()})
+    except Exception as e:
+        logger.error(f"Error reading selector stats: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@main.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """API endpoint exposing stage timings and counters in Prometheus format"""
+    if not Config.METRICS_ENABLED:
+        return jsonify({'status': 'error', 'message': 'Metrics are disabled'}), 404
+    
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @main.route('/api/reset-results', methods=['POST'])
 def reset_results():
     """API endpoint to reset processed results"""
     try:
         # Clear all processed results
-        processed_results['contacts'].clear()
-        processed_results['companies'].clear()
-        processed_results['pipelines'].clear()
-        processed_results['email_templates'].clear()
-        processed_results['zip_files'].clear()
+        result_store.clear()
         
         return jsonify({
             'status': 'success', 
@@ -294,27 +539,13 @@ def reset_results():
 def remove_last_result():
     """API endpoint to remove the last processed result"""
     try:
-        # Remove the last entries from each list and zip file
-        if processed_results['contacts']:
-            processed_results['contacts'].pop()
-        if processed_results['companies']:
-            processed_results['companies'].pop()
-        if processed_results['pipelines']:
-            processed_results['pipelines'].pop()
-        if processed_results['email_templates']:
-            processed_results['email_templates'].pop()
-        if processed_results['zip_files']:
-            processed_results['zip_files'].pop()
+        # Remove the last entry from each result table
+        result_store.remove_last()
         
         return jsonify({
             'status': 'success', 
             'message': 'Last processed result has been removed.',
-            'total_results': {
-                'contacts': len(processed_results['contacts']),
-                'companies': len(processed_results['companies']),
-                'pipelines': len(processed_results['pipelines']),
-                'email_templates': len(processed_results['email_templates'])
-            }
+            'total_results': result_store.counts()
         })
     except Exception as e:
         logger.error(f"Error removing last result: {str(e)}")
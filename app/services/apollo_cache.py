@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from app.config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apollo_lookups (
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    company_domain TEXT NOT NULL,
+    email TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (first_name, last_name, company_domain)
+);
+CREATE INDEX IF NOT EXISTS idx_apollo_lookups_fetched_at ON apollo_lookups (fetched_at);
+CREATE TABLE IF NOT EXISTS apollo_cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Run capacity eviction once every this many inserts per process
+EVICTION_INTERVAL = 100
+
+# One connection per thread and process; SQLite handles cross-process locking
+_local = threading.local()
+_inserts = 0
+
+def get_connection():
+    """Return this thread's cache connection, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(os.path.dirname(Config.APOLLO_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(Config.APOLLO_CACHE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def make_key(first_name, last_name, company_domain):
+    """Normalize a lookup into its cache key."""
+    return (first_name.strip().lower(), last_name.strip().lower(), company_domain.strip().lower())
+
+def increment_stat(conn, name):
+    """Increment a shared hit/miss counter."""
+    conn.execute(
+        "INSERT INTO apollo_cache_stats (name, value) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+        (name,)
+    )
+
+def get_cached_email(first_name, last_name, company_domain):
+    """
+    Look up a cached Apollo result.
+    
+    Args:
+        first_name: Person's first name
+        last_name: Person's last name
+        company_domain: Domain of the person's company
+        
+    Returns:
+        Cached email (empty string for a cached "no email found"), or None on a miss
+    """
+    try:
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT email FROM apollo_lookups "
+            "WHERE first_name = ? AND last_name = ? AND company_domain = ? AND expires_at > ?",
+            make_key(first_name, last_name, company_domain) + (time.time(),)
+        ).fetchone()
+        
+        if row is None:
+            increment_stat(conn, 'misses')
+            return None
+        
+        increment_stat(conn, 'negative_hits' if row[0] == "" else 'hits')
+        return row[0]
+    except sqlite3.Error as e:
+        logger.error(f"Error reading Apollo cache: {str(e)}")
+        return None
+
+def store_email(first_name, last_name, company_domain, email):
+    """
+    Cache an Apollo result, using the negative TTL when no email was found.
+    
+    Args:
+        first_name: Person's first name
+        last_name: Person's last name
+        company_domain: Domain of the person's company
+        email: Email returned by Apollo, or an empty string if none was found
+    """
+    global _inserts
+    try:
+        now = time.time()
+        ttl = Config.APOLLO_CACHE_TTL if email else Config.APOLLO_CACHE_NEGATIVE_TTL
+        conn = get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO apollo_lookups "
+            "(first_name, last_name, company_domain, email, fetched_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            make_key(first_name, last_name, company_domain) + (email, now, now + ttl)
+        )
+        
+        _inserts += 1
+        if _inserts % EVICTION_INTERVAL == 0:
+            evict(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Error writing Apollo cache: {str(e)}")
+
+def evict(conn=None):
+    """Drop expired entries, then the oldest entries beyond APOLLO_CACHE_MAX_ENTRIES."""
+    conn = conn or get_connection()
+    conn.execute("DELETE FROM apollo_lookups WHERE expires_at <= ?", (time.time(),))
+    conn.execute(
+        "DELETE FROM apollo_lookups WHERE rowid IN ("
+        "SELECT rowid FROM apollo_lookups ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+        (Config.APOLLO_CACHE_MAX_ENTRIES,)
+    )
+
+def get_cache_stats():
+    """
+    Return cache counters shared by all worker processes.
+    
+    Returns:
+        Dictionary with hits, negative_hits, misses, entries and hit_rate
+    """
+    conn = get_connection()
+    stats = {'hits': 0, 'negative_hits': 0, 'misses': 0}
+    stats.update(dict(conn.execute("SELECT name, value FROM apollo_cache_stats").fetchall()))
+    stats['entries'] = conn.execute("SELECT COUNT(*) FROM apollo_lookups").fetchone()[0]
+    lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0.0
+    return stats
+
+def clear_cache():
+    """Remove every cached lookup and reset the counters."""
+    conn = get_connection()
+    conn.execute("DELETE FROM apollo_lookups")
+    conn.execute("DELETE FROM apollo_cache_stats")
@@ -0,0 +1,151 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config import Config
+from app.services import metrics, rate_limiter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Keep-alive session and lookup pool shared by all requests, created on first use
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+# Lookups currently being requested, keyed by their normalized person and domain
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def create_session():
+    """Create a pooled keep-alive session that retries with backoff."""
+    retry = Retry(
+        total=Config.APOLLO_MAX_RETRIES,
+        backoff_factor=Config.APOLLO_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['POST']),  # People search is read-only, so retrying is safe
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=Config.APOLLO_POOL_SIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.headers.update({
+        "Content-Type": "application/json",
+        "Cache-Control": "no-cache"
+    })
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_session():
+    """Return the shared Apollo session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def get_executor():
+    """Return the shared thread pool used for concurrent lookups."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.APOLLO_MAX_WORKERS,
+                                           thread_name_prefix='apollo')
+        return _executor
+
+def find_email(first_name, last_name, company_domain):
+    """
+    Look up a person's email with the Apollo people search API.
+    
+    Args:
+        first_name: Person's first name
+        last_name: Person's last name
+        company_domain: Domain of the person's company
+        
+    Returns:
+        Email address, or an empty string if Apollo has no email for the person
+        
+    Raises:
+        requests.RequestException: If the request fails after all retries
+    """
+    payload = {
+        "api_key": Config.APOLLO_API_KEY,
+        "q_person_first_name": first_name,
+        "q_person_last_name": last_name,
+        "q_organization_domains": company_domain
+    }
+    
+    # Queue for the shared request budget instead of spending quota on 429s
+    rate_limiter.acquire()
+    response = get_session().post(
+        f"{Config.APOLLO_API_URL}/v1/people/search",
+        json=payload,
+        timeout=(Config.APOLLO_CONNECT_TIMEOUT, Config.APOLLO_READ_TIMEOUT)
+    )
+    response.raise_for_status()
+    data = response.json()
+    
+    # Extract email from response
+    if data.get("people") and len(data["people"]) > 0:
+        return data["people"][0].get("email") or ""
+    return ""
+
+def single_flight(key, func, *args):
+    """
+    Run func once for concurrent callers with the same key, sharing its result.
+    
+    The first caller runs the function; callers arriving while it is in flight
+    wait for and receive the same result (or exception).
+    
+    Args:
+        key: Hashable key identifying identical calls
+        func: Function to run
+        *args: Arguments passed to func
+        
+    Returns:
+        Result of func
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    
+    if not leader:
+        metrics.increment('apollo_coalesced_total')
+        return future.result()
+    
+    try:
+        result = func(*args)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+def map_lookups(lookup, people):
+    """
+    Run a lookup function for many people concurrently.
+    
+    Args:
+        lookup: Function taking (first_name, last_name, company_domain)
+        people: List of (first_name, last_name, company_domain) tuples
+        
+    Returns:
+        List of lookup results in input order
+    """
+    return list(get_executor().map(lambda person: lookup(*person), people))
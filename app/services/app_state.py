@@ -0,0 +1,146 @@
+from collections import deque
+import json
+import re
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Angular transfer state saved with the page: 'ng-state' in current builds, 'client-app-state' in older ones
+APP_STATE_PATTERN = re.compile(
+    r'<script\b[^>]*\bid=["\']?(?:ng-state|client-app-state|serverApp-state)["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Older Angular builds escape the JSON with these entities
+TRANSFER_STATE_ESCAPES = {'&q;': '"', '&s;': "'", '&l;': '<', '&g;': '>', '&a;': '&'}
+TRANSFER_STATE_ESCAPE_PATTERN = re.compile('|'.join(TRANSFER_STATE_ESCAPES))
+
+def load_app_state(file_content):
+    """
+    Locate and decode the serialized app state of a saved page, without parsing the HTML.
+
+    Args:
+        file_content: HTML content as a string
+
+    Returns:
+        Decoded app state, or None if the page has no readable state
+    """
+    match = APP_STATE_PATTERN.search(file_content)
+    if not match:
+        return None
+
+    blob = match.group(1).strip()
+    if blob.startswith('{&q;'):
+        blob = TRANSFER_STATE_ESCAPE_PATTERN.sub(lambda m: TRANSFER_STATE_ESCAPES[m.group(0)], blob)
+    try:
+        return json.loads(blob)
+    except ValueError as e:
+        logger.warning(f"Could not decode page app state: {str(e)}")
+        return None
+
+def is_organization(node):
+    """Check if a state node is an entity whose identifier is an organization."""
+    properties = node.get('properties')
+    if not isinstance(properties, dict):
+        return False
+    identifier = properties.get('identifier')
+    return isinstance(identifier, dict) and identifier.get('entity_def_id') == 'organization'
+
+def find_organizations(state, limit=None):
+    """
+    Return the organization entities in the state, in breadth-first order.
+
+    Args:
+        state: Decoded app state
+        limit: Optional maximum number of entities to return
+
+    Returns:
+        List of entity dictionaries (entities nested inside an organization are not included)
+    """
+    organizations = []
+    queue = deque([state])
+    while queue and (limit is None or len(organizations) < limit):
+        node = queue.popleft()
+        if isinstance(node, dict):
+            if is_organization(node):
+                organizations.append(node)
+                continue
+            queue.extend(node.values())
+        elif isinstance(node, list):
+            queue.extend(node)
+    return organizations
+
+def find_organization(state):
+    """Return the first entity in the state whose identifier is an organization."""
+    organizations = find_organizations(state, limit=1)
+    return organizations[0] if organizations else None
+
+def find_value(entity, key):
+    """Return the first non-empty value stored under key anywhere in the entity."""
+    queue = deque([entity])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, dict):
+            value = node.get(key)
+            if value:
+                return value
+            queue.extend(node.values())
+        elif isinstance(node, list):
+            queue.extend(node)
+    return None
+
+def format_website(url):
+    """Format a website URL the way the page displays it, e.g. www.example.com."""
+    return re.sub(r'^https?://', '', url.strip()).rstrip('/')
+
+def entity_fields(entity):
+    """
+    Read company fields from an organization entity.
+
+    Args:
+        entity: Organization entity from the app state
+
+    Returns:
+        Dictionary with whichever of company_name, website, description and founders the entity holds
+    """
+    fields = {}
+    name = entity['properties']['identifier'].get('value')
+    if isinstance(name, str) and name.strip():
+        fields['company_name'] = name.strip()
+
+    website = find_value(entity, 'website') or find_value(entity, 'website_url')
+    if isinstance(website, dict):
+        website = website.get('value')
+    if isinstance(website, str) and website.strip():
+        fields['website'] = format_website(website)
+
+    description = find_value(entity, 'short_description')
+    if isinstance(description, str) and description.strip():
+        fields['description'] = description.strip()
+
+    founders = find_value(entity, 'founder_identifiers')
+    if isinstance(founders, list):
+        names = [founder.get('value', '').strip() for founder in founders if isinstance(founder, dict)]
+        if any(names):
+            fields['founders'] = [name for name in names if name]
+    return fields
+
+def extract_app_state_fields(file_content):
+    """
+    Read company fields from the page's serialized app state.
+
+    Args:
+        file_content: HTML content as a string
+
+    Returns:
+        Dictionary with whichever of company_name, website, description and founders the state holds
+    """
+    state = load_app_state(file_content)
+    if state is None:
+        return {}
+    entity = find_organization(state)
+    if entity is None:
+        return {}
+    return entity_fields(entity)
@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from zipfile import ZipFile, BadZipFile
+import io
+import logging
+import threading
+from app.config import Config
+from app.services.extractor import process_html_file
+from app.services.html_stream import read_html
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# Process pool shared by all batch requests, created on first use and replaced if a worker dies
+_executor = None
+_lock = threading.Lock()
+
+def get_executor():
+    """Return the shared process pool, creating it on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=Config.BATCH_MAX_WORKERS)
+        return _executor
+
+def reset_executor(executor):
+    """Discard a broken process pool so the next submit starts a fresh one."""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def read_zip_entries(source):
+    """
+    Read the HTML pages contained in a zip archive.
+    
+    Args:
+        source: Bytes of the uploaded zip file, or a seekable binary file object
+        
+    Returns:
+        List of (filename, html_content) tuples
+    """
+    entries = []
+    try:
+        with ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(HTML_EXTENSIONS):
+                    continue
+                # Entries are decompressed in chunks rather than read whole
+                with zf.open(info) as entry:
+                    entries.append((info.filename, read_html(entry)))
+    except BadZipFile as e:
+        logger.error(f"Invalid zip archive: {str(e)}")
+    return entries
+
+def run_pages(files, settings):
+    """
+    Extract pages on the shared process pool.
+    
+    Args:
+        files: List of (filename, html_content) tuples
+        settings: Dictionary containing settings
+        
+    Returns:
+        List with the extracted data, or the exception raised, of each page in input order
+    """
+    executor = get_executor()
+    futures = []
+    for _, content in files:
+        try:
+            futures.append(executor.submit(process_html_file, content, dict(settings)))
+        except Exception as e:
+            futures.append(e)
+    
+    outcomes = []
+    for future in futures:
+        if isinstance(future, Exception):
+            outcomes.append(future)
+            continue
+        try:
+            outcomes.append(future.result())
+        except Exception as e:
+            outcomes.append(e)
+    
+    # A worker died (e.g. out of memory or a parser crash): the pool cannot be used again
+    if any(isinstance(outcome, BrokenProcessPool) for outcome in outcomes):
+        reset_executor(executor)
+    return outcomes
+
+def lost_pages(outcomes):
+    """Return the indexes of pages whose worker died before they finished."""
+    return [i for i, outcome in enumerate(outcomes) if isinstance(outcome, BrokenProcessPool)]
+
+def process_html_batch(files, settings):
+    """
+    Extract data from many HTML pages in parallel.
+    
+    Pages lost to a dead worker are retried on a fresh pool, then one at a
+    time, so only a page that itself crashes the worker is reported as failed.
+    
+    Args:
+        files: List of (filename, html_content) tuples
+        settings: Dictionary containing settings
+        
+    Returns:
+        List of (filename, extracted_data, error) tuples in input order
+    """
+    if not files:
+        return []
+    
+    outcomes = run_pages(files, settings)
+    lost = lost_pages(outcomes)
+    if lost:
+        logger.warning(f"Worker process died; retrying {len(lost)} pages on a new pool")
+        for i, outcome in zip(lost, run_pages([files[i] for i in lost], settings)):
+            outcomes[i] = outcome
+    for i in lost_pages(outcomes):
+        outcomes[i] = run_pages([files[i]], settings)[0]
+    
+    results = []
+    for (filename, _), outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error processing {filename} in batch: {str(outcome)}")
+            results.append((filename, None, str(outcome) or type(outcome).__name__))
+        else:
+            results.append((filename, outcome, None))
+    return results
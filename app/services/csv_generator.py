@@ -1,11 +1,13 @@
 import csv
 from io import StringIO
 import logging
+from app.services import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@metrics.timed_function('csv')
 def save_to_csv(data, fieldnames):
     """
     Save data to a CSV file in memory.
@@ -40,6 +42,7 @@ def save_to_csv(data, fieldnames):
         writer.writeheader()
         
         # Write data rows
+        metrics.increment('csv_rows_written_total', len(data))
         for row in data:
             # Ensure the row contains only specified fieldnames
             filtered_row = {field: row.get(field, '') for field in fieldnames}
@@ -52,6 +55,34 @@ def save_to_csv(data, fieldnames):
         logger.error(f"Error saving to CSV: {str(e)}")
         return ""
 
+def generate_csv(rows, fieldnames, chunk_rows=500):
+    """
+    Generate CSV data chunk by chunk without holding every row in memory.
+    
+    Args:
+        rows: Iterable of dictionaries containing the data
+        fieldnames: List of field names for the CSV header
+        chunk_rows: Number of rows written per yielded chunk
+        
+    Yields:
+        Strings of CSV data, starting with the header
+    """
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer.writeheader()
+    
+    count = 0
+    for count, row in enumerate(rows, 1):
+        # Ensure the row contains only specified fieldnames
+        writer.writerow({field: row.get(field, '') for field in fieldnames})
+        if count % chunk_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    
+    yield output.getvalue()
+    metrics.increment('csv_rows_written_total', count)
+
 def read_csv(csv_content, fieldnames=None):
     """
     Read CSV content and return a list of dictionaries.
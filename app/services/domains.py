@@ -0,0 +1,16 @@
+import re
+
+def parse_domain(website):
+    """Extract domain from website URL."""
+    if not website:
+        return "unknown.com"
+    
+    # Remove http://, https://, www.
+    domain = website.lower()
+    domain = re.sub(r'^https?://', '', domain)
+    domain = re.sub(r'^www\.', '', domain)
+    
+    # Get the base domain
+    domain = domain.split('/')[0]
+    
+    return domain
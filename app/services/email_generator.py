@@ -1,41 +1,153 @@
+from string import Formatter
+import hashlib
+import json
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def generate_email_templates(extracted_data, settings):
+DEFAULT_TEMPLATE = 'introduction'
+
+# Named outreach templates; fields are filled from the contact and settings at render time
+EMAIL_TEMPLATE_TEXTS = {
+    'introduction': """{email}
+{company_name} Investment Opportunity - Hillside Ventures Inquiry
+
+Hi {first_name}!
+
+I'm {sourcing_analyst}, an analyst at a student-run venture firm at the University of Connecticut. Our check sizes range from $25,000 to $50,000. In our research, {company_name} stood out due to your impactful value proposition. 
+
+We'd love to learn more about traction and if you're currently fundraising. Would you be open to a quick call in the next few weeks?
+
+Looking forward to connecting!
+
+Best, 
+{sourcing_analyst}
+""",
+    'follow_up': """{email}
+Following up - Hillside Ventures and {company_name}
+
+Hi {first_name}!
+
+I wanted to follow up on my earlier note. I'm {sourcing_analyst}, an analyst at Hillside Ventures, the student-run venture firm at the University of Connecticut, and we're still very interested in what {company_name} is building.
+
+If you have 15 minutes in the coming weeks, we'd love to hear about your traction and fundraising plans.
+
+Best,
+{sourcing_analyst}
+"""
+}
+
+# Settings read when rendering a template record; other settings never change the text
+TEMPLATE_SETTINGS = ['sourcing_analyst']
+
+# Fields of a stored template record: the template, the contact it addresses and optional overrides
+TEMPLATE_RECORD_FIELDS = ['Template', 'Email', 'Company Name', 'First Name', 'Sourcing Analyst', 'Text']
+
+def compile_template(text):
     """
-    Generate email templates for each contact.
-    
+    Split a template into literal text and field names once, so rendering is a plain join.
+
     Args:
-        extracted_data: Dictionary containing extracted data
+        text: Template text with {field} placeholders
+
+    Returns:
+        List of (literal, field name or None) tuples
+    """
+    return [(literal, field) for literal, field, _, _ in Formatter().parse(text)]
+
+COMPILED_TEMPLATES = {name: compile_template(text) for name, text in EMAIL_TEMPLATE_TEXTS.items()}
+
+def create_template_records(contacts, settings):
+    """
+    Build the template records for contacts without rendering any text.
+
+    Args:
+        contacts: List of contact dictionaries
+        settings: Dictionary containing settings (selects the template)
+
+    Returns:
+        List of template record dictionaries
+    """
+    template = settings.get('email_template') or DEFAULT_TEMPLATE
+    if template not in COMPILED_TEMPLATES:
+        logger.warning(f"Unknown email template {template}, using {DEFAULT_TEMPLATE}")
+        template = DEFAULT_TEMPLATE
+
+    # The analyst is left empty so rendering follows the current settings
+    return [{
+        'Template': template,
+        'Email': contact['Email'],
+        'Company Name': contact['Company Name'],
+        'First Name': contact['First Name'],
+        'Sourcing Analyst': '',
+        'Text': ''
+    } for contact in contacts]
+
+def normalize_template_record(record):
+    """
+    Reduce a submitted template to a stored record.
+
+    Args:
+        record: Template record dictionary, or a plain string of edited text
+
+    Returns:
+        Template record dictionary with only the record fields
+    """
+    if isinstance(record, str):
+        return {**{field: '' for field in TEMPLATE_RECORD_FIELDS}, 'Text': record}
+    return {field: record.get(field) or '' for field in TEMPLATE_RECORD_FIELDS}
+
+def render_email_template(record, settings):
+    """
+    Render the text of a template record.
+
+    Args:
+        record: Template record dictionary (or a template string stored by an older version)
         settings: Dictionary containing settings
-        
+
     Returns:
-        List of email templates as strings
+        Email template as a string
     """
-    try:
-        email_templates = []
-        
-        for contact in extracted_data['contacts']:
-            template = f"""{contact['Email']}
-{contact['Company Name']} Investment Opportunity - Hillside Ventures Inquiry
+    if isinstance(record, str):
+        return record
+    if record.get('Text'):
+        return record['Text']
 
-Hi {contact['First Name']}!
+    values = {
+        'email': record['Email'],
+        'company_name': record['Company Name'],
+        'first_name': record['First Name'],
+        'sourcing_analyst': record.get('Sourcing Analyst') or settings['sourcing_analyst']
+    }
+    compiled = COMPILED_TEMPLATES.get(record.get('Template'), COMPILED_TEMPLATES[DEFAULT_TEMPLATE])
+    return ''.join(literal + (values[field] if field is not None else '') for literal, field in compiled)
 
-I'm {settings['sourcing_analyst']}, an analyst at a student-run venture firm at the University of Connecticut. Our check sizes range from $25,000 to $50,000. In our research, {contact['Company Name']} stood out due to your impactful value proposition. 
+def template_settings_key(settings):
+    """Hash the settings template records are rendered with, e.g. for ETags of rendered text."""
+    values = [settings.get(name) for name in TEMPLATE_SETTINGS]
+    return hashlib.sha1(json.dumps(values).encode('utf-8')).hexdigest()[:16]
 
-We'd love to learn more about traction and if you're currently fundraising. Would you be open to a quick call in the next few weeks?
+def render_email_templates(records, settings):
+    """Render template records one at a time, e.g. while streaming an export."""
+    for record in records:
+        yield render_email_template(record, settings)
 
-Looking forward to connecting!
+def generate_email_templates(extracted_data, settings):
+    """
+    Generate email templates for each contact.
 
-Best, 
-{settings['sourcing_analyst']}
-"""
-            email_templates.append(template)
-        
-        return email_templates
+    Args:
+        extracted_data: Dictionary containing extracted data
+        settings: Dictionary containing settings
+
+    Returns:
+        List of email templates as strings
+    """
+    try:
+        records = create_template_records(extracted_data['contacts'], settings)
+        return list(render_email_templates(records, settings))
     except Exception as e:
         logger.error(f"Error generating email templates: {str(e)}")
-        return []
\ No newline at end of file
+        return []
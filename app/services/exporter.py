@@ -0,0 +1,223 @@
+from zipfile import ZipFile, ZIP_DEFLATED
+import json
+import logging
+from app.config import Config
+from app.services import metrics
+from app.services.csv_generator import generate_csv
+from app.services.email_generator import render_email_template, render_email_templates
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: pip install pyarrow for Arrow and Parquet exports
+    pyarrow = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ['Contact Name', 'First Name', 'Last Name', 'Prospect Quality Level', 'Company Name', 'Industry', 'Email']
+COMPANY_FIELDS = ['Company Name', 'Website']
+PIPELINE_FIELDS = ['Deal Name', 'Company Name', 'Contact Name', 'Contact Email', 'Sub-Pipeline', 
+                   'Description', 'Stage', 'Industry Vertical', 'Investment Cycle', 'Contact', 
+                   'Sourcing Analyst']
+# NDJSON, Arrow and Parquet exports hold each rendered email template with the contact it addresses
+EMAIL_TEMPLATE_EXPORT_FIELDS = ['Email', 'Company Name', 'Text']
+
+EXPORT_TABLES = [
+    ('contacts', CONTACT_FIELDS),
+    ('companies', COMPANY_FIELDS),
+    ('pipelines', PIPELINE_FIELDS)
+]
+
+# Banner opening the email templates text file, and the gap between templates
+EMAIL_TEMPLATES_HEADER = "\n\n" + "-"*50
+EMAIL_TEMPLATES_SEPARATOR = "\n\n"
+
+# Export formats mapped to the extension of their per-table files
+EXPORT_FORMATS = {'csv': '.csv', 'ndjson': '.ndjson', 'arrow': '.arrow', 'parquet': '.parquet'}
+COLUMNAR_FORMATS = {'arrow', 'parquet'}
+
+class ChunkBuffer:
+    """Write-only, unseekable file object that hands written bytes back in chunks."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written so far."""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def generate_email_templates_text(templates):
+    """Generate the email templates text file chunk by chunk."""
+    yield EMAIL_TEMPLATES_HEADER
+    for index, template in enumerate(templates):
+        if index:
+            yield EMAIL_TEMPLATES_SEPARATOR
+        yield template
+
+def stream_zip(members, compresslevel=None):
+    """
+    Build a deflated zip archive as a stream of byte chunks.
+    
+    Args:
+        members: List of (filename, chunks) tuples, where chunks is an iterable of strings or bytes
+        compresslevel: Deflate level from 0 to 9, defaulting to Config.EXPORT_COMPRESSION_LEVEL
+        
+    Yields:
+        Bytes of the zip archive
+    """
+    if compresslevel is None:
+        compresslevel = Config.EXPORT_COMPRESSION_LEVEL
+    
+    buffer = ChunkBuffer()
+    # Without a seekable target, zipfile writes sizes in data descriptors after each member
+    with ZipFile(buffer, 'w', compression=ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for filename, chunks in members:
+            with zf.open(filename, 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+                    data = buffer.drain()
+                    if data:
+                        yield data
+    
+    # Flush the data written on closing members and the central directory
+    data = buffer.drain()
+    if data:
+        yield data
+
+def available_formats():
+    """Return the export formats that can be produced with the installed packages."""
+    return [name for name in EXPORT_FORMATS if name not in COLUMNAR_FORMATS or pyarrow is not None]
+
+def iter_email_template_batches(store, settings, batch_size):
+    """Render stored email templates in batches of (email, company name, text) tuples."""
+    batch = []
+    for record in store.iter_rows('email_templates'):
+        text = render_email_template(record, settings)
+        if isinstance(record, str):
+            batch.append((None, None, text))
+        else:
+            batch.append((record.get('Email'), record.get('Company Name'), text))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_ndjson(batches, fieldnames, export_format='ndjson'):
+    """
+    Generate newline-delimited JSON, one object per row, a batch at a time.
+    
+    Args:
+        batches: Iterable of lists of value tuples in field order
+        fieldnames: Field names of the values
+        export_format: Format name used in metrics
+        
+    Yields:
+        Strings of NDJSON data
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    # Keys are encoded once into a line template; each line matches json.dumps of the row dictionary
+    template = '{' + ', '.join(encode(field).replace('%', '%%') + ': %s' for field in fieldnames) + '}\n'
+    count = 0
+    for batch in batches:
+        count += len(batch)
+        yield ''.join(template % tuple(map(encode, values)) for values in batch)
+    metrics.increment('export_rows_written_total', count, format=export_format)
+
+def generate_columnar(batches, fieldnames, export_format):
+    """
+    Generate an Arrow IPC or Parquet file, one record batch at a time.
+    
+    Args:
+        batches: Iterable of lists of value tuples in field order
+        fieldnames: Field names of the values, written as nullable string columns
+        export_format: 'arrow' or 'parquet'
+        
+    Yields:
+        Bytes of the file
+    """
+    schema = pyarrow.schema([(field, pyarrow.string()) for field in fieldnames])
+    buffer = ChunkBuffer()
+    if export_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(buffer, schema)
+    else:
+        writer = pyarrow.ipc.new_file(buffer, schema)
+    
+    count = 0
+    for batch in batches:
+        count += len(batch)
+        columns = list(zip(*batch))
+        writer.write_batch(pyarrow.record_batch(
+            [pyarrow.array(column, pyarrow.string()) for column in columns], schema=schema))
+        data = buffer.drain()
+        if data:
+            yield data
+    
+    # Writers without any batch still produce a valid, empty file
+    writer.close()
+    yield buffer.drain()
+    metrics.increment('export_rows_written_total', count, format=export_format)
+
+def generate_results_zip(store, compresslevel=None, export_format='csv'):
+    """
+    Stream the contacts, companies and pipelines plus email templates as a zip.
+    
+    CSV exports hold three CSVs and a text file of email templates. NDJSON,
+    Arrow IPC and Parquet exports hold one file per table, email templates
+    included, written from batches of values read straight from the store.
+    Email templates are rendered from their stored records with the current
+    settings as the archive is written.
+    
+    Args:
+        store: Result store to export
+        compresslevel: Optional deflate level overriding the configured one
+        export_format: One of EXPORT_FORMATS; Arrow and Parquet need pyarrow
+        
+    Yields:
+        Bytes of the zip archive
+    """
+    settings = store.get_settings()
+    if export_format != 'csv':
+        if export_format not in available_formats():
+            raise ValueError(f"Export format {export_format} is not available")
+        batch_size = Config.EXPORT_BATCH_ROWS
+        extension = EXPORT_FORMATS[export_format]
+        generate = generate_ndjson if export_format == 'ndjson' else generate_columnar
+        members = [
+            (f'{table}{extension}', generate(store.iter_value_batches(table, fields, batch_size), fields, export_format))
+            for table, fields in EXPORT_TABLES
+        ]
+        members.append((f'email_templates{extension}', generate(
+            iter_email_template_batches(store, settings, batch_size), EMAIL_TEMPLATE_EXPORT_FIELDS, export_format)))
+        return stream_zip(members, compresslevel)
+    
+    members = [
+        ('contacts.csv', generate_csv(store.iter_rows('contacts'), CONTACT_FIELDS)),
+        ('companies.csv', generate_csv(store.iter_rows('companies'), COMPANY_FIELDS)),
+        ('pipelines.csv', generate_csv(store.iter_rows('pipelines'), PIPELINE_FIELDS)),
+        ('email_templates.txt', generate_email_templates_text(
+            render_email_templates(store.iter_rows('email_templates'), settings)))
+    ]
+    return stream_zip(members, compresslevel)
@@ -1,35 +1,35 @@
-from bs4 import BeautifulSoup
-import re
-import requests
 import logging
 from app.config import Config
+from app.services import apollo_cache, apollo_client, app_state, list_extractor, metrics, parse_cache, selector_stats
+from app.services.domains import parse_domain
+from app.services.parsers import parse_html
+from app.services.scanner import FALLBACK_PATHS, scan_document
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def extract_company_name(soup):
+def record_path(scan, field):
+    """Count which selector or fallback resolved a field."""
+    path = scan.paths.get(field)
+    selector_stats.record_field(field, scan.available.get(field), path)
+    if path is None:
+        metrics.increment('selector_misses_total', field=field)
+        return
+    metrics.increment('selector_hits_total', field=field, selector=path)
+    if path in FALLBACK_PATHS:
+        metrics.increment('selector_fallbacks_total', field=field)
+
+def extract_company_name(soup, scan=None):
     """Extract the company name from the HTML."""
     try:
-        # Try various selectors to find the company name
-        selectors = [
-            ".entity-name",  # Common class for entity name
-            "span.entity-name",  # With tag specification
-            ".profile-v3-header .entity-name",  # More specific path
-            ".top-row .entity-name"  # Alternative location
-        ]
-        
-        for selector in selectors:
-            company_element = soup.select_one(selector)
-            if company_element and company_element.text.strip():
-                return company_element.text.strip()
-        
-        # If selectors fail, try searching for profile header content
-        header = soup.find('profile-v3-header')
-        if header:
-            entity_name = header.find(class_='entity-name')
-            if entity_name:
-                return entity_name.text.strip()
+        # Selector cascade and header fallback are resolved from a single scan
+        scan = scan or scan_document(soup)
+        with metrics.timed('extract_company_name'):
+            company_name = scan.company_name()
+        record_path(scan, 'company_name')
+        if company_name is not None:
+            return company_name
                 
         logger.warning("Could not find company name using standard selectors")
         return "Unknown Company"
@@ -37,27 +37,16 @@ def extract_company_name(soup):
         logger.error(f"Error extracting company name: {str(e)}")
         return "Unknown Company"
 
-def extract_website(soup):
+def extract_website(soup, scan=None):
     """Extract the website from the HTML."""
     try:
-        # Try various selectors to find the website
-        selectors = [
-            "a[href^='http'][title*='.com']",  # Links with titles containing .com
-            "link-formatter a[target='_blank']",  # External links
-            "field-formatter a[href^='http']"  # Formatted fields with external links
-        ]
-        
-        for selector in selectors:
-            website_elements = soup.select(selector)
-            for element in website_elements:
-                # Look for elements that look like websites (contain domain extensions)
-                if any(ext in element.text.strip() for ext in ['.com', '.org', '.net', '.io']):
-                    return element.text.strip()
-        
-        # Look for href attributes that might contain the website
-        for a_tag in soup.find_all('a', href=True):
-            if any(ext in a_tag['href'] for ext in ['.com', '.org', '.net', '.io']) and not 'crunchbase.com' in a_tag['href']:
-                return a_tag['href']
+        # Link selectors and href fallback are resolved from a single scan
+        scan = scan or scan_document(soup)
+        with metrics.timed('extract_website'):
+            website = scan.website()
+        record_path(scan, 'website')
+        if website is not None:
+            return website
                 
         logger.warning("Could not find website using standard selectors")
         return ""
@@ -65,26 +54,16 @@ def extract_website(soup):
         logger.error(f"Error extracting website: {str(e)}")
         return ""
 
-def extract_description(soup):
+def extract_description(soup, scan=None):
     """Extract the company description from the HTML."""
     try:
-        # Try various selectors to find company description
-        selectors = [
-            ".expanded-only-content:not(.chips-container)",  # Common location for description
-            "profile-v3-header span.expanded-only-content",  # More specific path
-            "tile-description span.description",  # Description in tile format
-            ".overview-row span:not([class])"  # General description in overview section
-        ]
-        
-        for selector in selectors:
-            description_element = soup.select_one(selector)
-            if description_element and description_element.text.strip():
-                return description_element.text.strip()
-        
-        # If standard selectors fail, look for any substantial paragraph text
-        for p in soup.find_all('p'):
-            if len(p.text.strip()) > 50:  # Assume descriptions are reasonably long
-                return p.text.strip()
+        # Description selectors and paragraph fallback are resolved from a single scan
+        scan = scan or scan_document(soup)
+        with metrics.timed('extract_description'):
+            description = scan.description()
+        record_path(scan, 'description')
+        if description is not None:
+            return description
                 
         logger.warning("Could not find description using standard selectors")
         return ""
@@ -92,49 +71,16 @@ def extract_description(soup):
         logger.error(f"Error extracting description: {str(e)}")
         return ""
 
-def extract_founders(soup):
+def extract_founders(soup, scan=None):
     """Extract the founders from the HTML."""
     try:
-        # Look for sections labeled as 'Founders' or containing founder information
-        founder_indicators = ['Founders', 'Founded by', 'Founder']
-        
-        # Find elements with text containing any of the indicators
-        for indicator in founder_indicators:
-            # First find labels containing indicator text
-            labels = soup.find_all(string=lambda text: indicator in text if text else False)
-            
-            for label in labels:
-                # Look for parent or nearby elements that might contain the founder names
-                parent = label.parent
-                
-                # Check if it's a label-with-info element (common in Crunchbase)
-                if parent and parent.name == 'span':
-                    # Look for adjacent field-formatter
-                    field_formatter = parent.find_next('field-formatter')
-                    if field_formatter:
-                        # Try to find links inside which are likely founder profiles
-                        founder_links = field_formatter.find_all('a')
-                        if founder_links:
-                            return [link.text.strip() for link in founder_links if link.text.strip()]
-        
-        # If nothing found with labels, look for common structures
-        founder_sections = soup.select("tile-field span:contains('Founders'), tile-field span:contains('Founded by')")
-        for section in founder_sections:
-            field = section.find_parent('tile-field')
-            if field:
-                links = field.select('a')
-                if links:
-                    return [link.text.strip() for link in links if link.text.strip()]
-        
-        # Another approach - look for identifier-multi-formatter which often contains founder lists
-        formatters = soup.select('identifier-multi-formatter')
-        for formatter in formatters:
-            # Check if this formatter is for founders
-            parent_tile = formatter.find_parent('tile-field')
-            if parent_tile and any(ind in parent_tile.text for ind in founder_indicators):
-                links = formatter.select('a')
-                if links:
-                    return [link.text.strip() for link in links if link.text.strip()]
+        # Founder labels, tile-fields and multi-formatters are resolved from a single scan
+        scan = scan or scan_document(soup)
+        with metrics.timed('extract_founders'):
+            founders = scan.founders()
+        record_path(scan, 'founders')
+        if founders is not None:
+            return founders
         
         logger.warning("Could not find founders using standard selectors")
         return []
@@ -142,60 +88,58 @@ def extract_founders(soup):
         logger.error(f"Error extracting founders: {str(e)}")
         return []
 
+def fetch_email(first_name, last_name, company_domain):
+    """Request an email from Apollo and cache the result."""
+    metrics.increment('apollo_requests_total')
+    email = apollo_client.find_email(first_name, last_name, company_domain)
+    if Config.APOLLO_CACHE_ENABLED:
+        apollo_cache.store_email(first_name, last_name, company_domain, email)
+    return email
+
 def get_email_from_apollo(first_name, last_name, company_domain):
     """
     Get email from Apollo.io API.
-    In a real implementation, this would call the actual API.
+    Falls back to a first.last@domain guess when no key is set or no email is found.
     """
     try:
         if not Config.APOLLO_API_KEY or Config.APOLLO_API_KEY == "YOUR_APOLLO_API_KEY":
-            print("No Apollo API key provided. Using placeholder email.")
+            logger.debug("No Apollo API key provided. Using placeholder email.")
             # Return a placeholder email for demonstration
             return f"{first_name.lower()}.{last_name.lower()}@{company_domain}"
         
-        # This would be the actual API call in production
-        url = "https://api.apollo.io/v1/people/search"
-        headers = {
-            "Content-Type": "application/json",
-            "Cache-Control": "no-cache"
-        }
-        payload = {
-            "api_key": Config.APOLLO_API_KEY,
-            "q_person_first_name": first_name,
-            "q_person_last_name": last_name,
-            "q_organization_domains": company_domain
-        }
-        
-        response = requests.post(url, headers=headers, json=payload)
-        data = response.json()
+        # Serve repeated lookups (including "no email found") from the cache
+        with metrics.timed('apollo'):
+            email = None
+            if Config.APOLLO_CACHE_ENABLED:
+                email = apollo_cache.get_cached_email(first_name, last_name, company_domain)
+            if email is None:
+                # Identical lookups already in flight share that request
+                key = apollo_cache.make_key(first_name, last_name, company_domain)
+                email = apollo_client.single_flight(key, fetch_email, first_name, last_name, company_domain)
+            else:
+                metrics.increment('apollo_cache_hits_total')
         
-        # Extract email from response
-        if data.get("people") and len(data["people"]) > 0:
-            email = data["people"][0].get("email", "")
-            if email:
-                return email
+        if email:
+            return email
             
-        print("No email found in Apollo")
+        logger.debug("No email found in Apollo")
         # If no email found or API call fails
         return f"{first_name.lower()}.{last_name.lower()}@{company_domain}"
     except Exception as e:
         logger.error(f"Error getting email from Apollo: {str(e)}")
         return f"{first_name.lower()}.{last_name.lower()}@{company_domain}"
 
-def parse_domain(website):
-    """Extract domain from website URL."""
-    if not website:
-        return "unknown.com"
-    
-    # Remove http://, https://, www.
-    domain = website.lower()
-    domain = re.sub(r'^https?://', '', domain)
-    domain = re.sub(r'^www\.', '', domain)
-    
-    # Get the base domain
-    domain = domain.split('/')[0]
+def get_emails_from_apollo(people):
+    """
+    Get emails for many people with concurrent Apollo lookups.
     
-    return domain
+    Args:
+        people: List of (first_name, last_name, company_domain) tuples
+        
+    Returns:
+        List of emails in input order
+    """
+    return apollo_client.map_lookups(get_email_from_apollo, people)
 
 def split_name(full_name):
     """Split a full name into first and last name."""
@@ -208,18 +152,83 @@ def split_name(full_name):
         # For names with more than two parts, assume first name and everything else as last name
         return parts[0], " ".join(parts[1:])
 
-def process_html_file(file_content, settings):
-    """Process the HTML file and extract information."""
-    soup = BeautifulSoup(file_content, 'html.parser')
+# Page fields with their DOM extractor, in extraction order
+DOM_EXTRACTORS = [
+    ('website', extract_website),
+    ('company_name', extract_company_name),
+    ('description', extract_description),
+    ('founders', extract_founders)
+]
+
+def extract_page_fields(file_content, parser_backend=None):
+    """
+    Extract the settings-independent fields of a page, reusing cached results.
     
-    # Extract company information
-    company_name = extract_company_name(soup)
-    website = extract_website(soup)
-    description = extract_description(soup)
-    founders = extract_founders(soup)
+    Args:
+        file_content: HTML content as a string
+        parser_backend: Optional parser backend name
+        
+    Returns:
+        Dictionary with company_name, website, description, founders and domain
+    """
+    # Re-uploaded pages are served from the content-hash cache
+    key = None
+    if Config.PARSE_CACHE_ENABLED:
+        key = parse_cache.content_key(file_content, parser_backend)
+        fields = parse_cache.get_fields(key)
+        if fields is not None:
+            metrics.increment('parse_cache_hits_total')
+            return fields
+    
+    # Serialized app state is read without building a DOM
+    fields = {}
+    if Config.APP_STATE_ENABLED:
+        with metrics.timed('app_state'):
+            fields = app_state.extract_app_state_fields(file_content)
+        for field in fields:
+            metrics.increment('selector_hits_total', field=field, selector='app_state')
     
-    # Prepare domain for email generation
-    domain = parse_domain(website)
+    # Fields the state did not provide come from a single traversal of the document
+    missing = [(field, extract) for field, extract in DOM_EXTRACTORS if field not in fields]
+    if missing:
+        with metrics.timed('parse'):
+            soup = parse_html(file_content, parser_backend)
+        with metrics.timed('scan'):
+            scan = scan_document(soup)
+        for field, extract in missing:
+            fields[field] = extract(soup, scan)
+    logger.debug(f"Fields served by the DOM: {[field for field, _ in missing]}")
+    
+    fields = {
+        'company_name': fields['company_name'],
+        'website': fields['website'],
+        'description': fields['description'],
+        'founders': fields['founders'],
+        # Prepare domain for email generation
+        'domain': parse_domain(fields['website'])
+    }
+    
+    if key is not None:
+        parse_cache.store_fields(key, fields)
+    return fields
+
+def build_company_rows(fields, settings, email=None):
+    """
+    Build the contact, company and pipeline rows of one company.
+    
+    Args:
+        fields: Dictionary with company_name, website, description, founders and domain
+        settings: Dictionary containing settings
+        email: Email of the first founder, already looked up
+        
+    Returns:
+        Dictionary with contacts, companies and pipelines lists
+    """
+    company_name = fields['company_name']
+    website = fields['website']
+    description = fields['description']
+    founders = fields['founders']
+    domain = fields['domain']
     
     # Generate data for CSVs
     contacts_data = []
@@ -231,7 +240,8 @@ def process_html_file(file_content, settings):
         # Only use the first founder
         founder = founders[0]  # Get only the first founder
         first_name, last_name = split_name(founder)
-        email = get_email_from_apollo(first_name, last_name, domain)
+        if email is None:
+            email = get_email_from_apollo(first_name, last_name, domain)
         
         # Add to contacts data
         contacts_data.append({
@@ -301,4 +311,57 @@ def process_html_file(file_content, settings):
         'contacts': contacts_data,
         'companies': companies_data,
         'pipelines': pipelines_data
-    }
\ No newline at end of file
+    }
+
+def iter_list_records(file_content, settings, parser_backend=None, batch_size=None):
+    """
+    Yield one record per company on a search or list result page.
+    
+    The page is parsed once; Apollo lookups for the founders of each chunk of
+    rows run as one concurrent batch before the chunk's records are yielded.
+    
+    Args:
+        file_content: HTML content as a string
+        settings: Dictionary containing settings
+        parser_backend: Optional parser backend name
+        batch_size: Rows per Apollo batch (defaults to LIST_LOOKUP_BATCH)
+        
+    Returns:
+        Generator of dictionaries with contacts, companies and pipelines lists
+    """
+    batch_size = batch_size or Config.LIST_LOOKUP_BATCH
+    batch = []
+    for fields in list_extractor.iter_list_companies(file_content, parser_backend):
+        fields['domain'] = parse_domain(fields['website'])
+        batch.append(fields)
+        if len(batch) >= batch_size:
+            yield from build_list_batch(batch, settings)
+            batch = []
+    if batch:
+        yield from build_list_batch(batch, settings)
+
+def build_list_batch(batch, settings):
+    """Look up the first founder of every company in a batch at once, then build their rows."""
+    people = []
+    for fields in batch:
+        if fields['founders']:
+            first_name, last_name = split_name(fields['founders'][0])
+            people.append((first_name, last_name, fields['domain']))
+    emails = iter(get_emails_from_apollo(people))
+    
+    for fields in batch:
+        email = next(emails) if fields['founders'] else None
+        yield build_company_rows(fields, settings, email)
+
+def process_html_file(file_content, settings, parser_backend=None):
+    """Process the HTML file and extract information."""
+    # Search and list result pages produce one set of rows per company
+    if Config.LIST_PAGES_ENABLED and list_extractor.is_list_page(file_content):
+        extracted_data = {'contacts': [], 'companies': [], 'pipelines': []}
+        for record in iter_list_records(file_content, settings, parser_backend):
+            for name, rows in record.items():
+                extracted_data[name].extend(rows)
+        return extracted_data
+    
+    fields = extract_page_fields(file_content, parser_backend)
+    return build_company_rows(fields, settings)
@@ -0,0 +1,116 @@
+import codecs
+import re
+import logging
+from app.config import Config
+from app.services import metrics
+from app.services.app_state import APP_STATE_PATTERN
+from app.services.parsers import PREFILTER_BACKENDS, get_parser_backend
+from app.services.prefilter import prune_stream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Byte order marks, longest first so UTF-32 is not taken for UTF-16
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be')
+]
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET_PATTERN = re.compile(rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([A-Za-z0-9_.:\-]+)', re.IGNORECASE)
+
+# Bytes examined for a charset declaration, as browsers do
+SNIFF_BYTES = 4096
+
+# Undeclared pages are read as UTF-8, or as latin-1 if they turn out not to be
+DEFAULT_ENCODING = 'utf-8'
+FALLBACK_ENCODING = 'latin-1'
+
+def detect_charset(head):
+    """
+    Detect a page's encoding from its first bytes.
+
+    Args:
+        head: First bytes of the page (SNIFF_BYTES are enough)
+
+    Returns:
+        Tuple of (codec name or None if undeclared, length of the byte order mark)
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+
+    match = META_CHARSET_PATTERN.search(head[:SNIFF_BYTES])
+    if match:
+        try:
+            encoding = codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            logger.warning(f"Unknown charset {match.group(1)!r} declared, ignoring it")
+            return None, 0
+        # A page whose declaration could be read as ASCII is not UTF-16/32
+        if encoding.startswith(('utf-16', 'utf-32')):
+            encoding = 'utf-8'
+        return encoding, 0
+    return None, 0
+
+def iter_text(stream, encoding, chunk_size):
+    """Decode a binary stream incrementally, yielding text chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        raw = stream.read(chunk_size)
+        if not raw:
+            break
+        text = decoder.decode(raw)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+def keep_app_state(markup):
+    """Keep the serialized app state script, which the fast path reads without a DOM."""
+    return markup[:7].lower() == '<script' and APP_STATE_PATTERN.match(markup) is not None
+
+def read_text(stream, offset, encoding, chunk_size, prune):
+    """Decode a stream from offset with one encoding, pruning it if requested."""
+    stream.seek(offset)
+    with metrics.timed('read'):
+        chunks = iter_text(stream, encoding, chunk_size)
+        if prune:
+            return prune_stream(chunks, keep=keep_app_state)[0]
+        return ''.join(chunks)
+
+def read_html(stream, parser_backend=None, chunk_size=None):
+    """
+    Read a page from a binary stream in chunks, decoding it once and pruning it as it arrives.
+
+    The charset is taken from a byte order mark or <meta charset> in the first
+    bytes; undeclared pages are read as UTF-8, and a page that does not decode
+    is read again from the start as latin-1. When the parser backend allows
+    pre-filtering, dead weight is dropped chunk by chunk (keeping the app
+    state), so only the markup the extractors read is ever held in memory.
+
+    Args:
+        stream: Seekable binary file object, e.g. a spooled upload
+        parser_backend: Optional parser backend name
+        chunk_size: Bytes read at a time (defaults to Config.UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        HTML content as a string
+    """
+    chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+    start = stream.tell()
+    encoding, bom_length = detect_charset(stream.read(SNIFF_BYTES))
+    encoding = encoding or DEFAULT_ENCODING
+    prune = Config.PREFILTER_ENABLED and get_parser_backend(parser_backend) in PREFILTER_BACKENDS
+
+    try:
+        return read_text(stream, start + bom_length, encoding, chunk_size, prune)
+    except UnicodeDecodeError:
+        # latin-1 decodes any bytes, so the second pass cannot fail
+        logger.info(f"Page is not valid {encoding}, reading it as {FALLBACK_ENCODING}")
+        return read_text(stream, start + bom_length, FALLBACK_ENCODING, chunk_size, prune)
@@ -0,0 +1,350 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from app.config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+UNFINISHED_STATUSES = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+# Columns added after the first release, created on databases that predate them
+MIGRATED_COLUMNS = {'owner': 'TEXT', 'heartbeat_at': 'REAL'}
+
+# Jobs run on a thread pool in the worker that accepted them; their state lives in
+# SQLite so any worker can report status or cancel them
+_executor = None
+_local = threading.local()
+_lock = threading.Lock()
+
+# Process running the stale job sweeper, so it is started once per worker
+_sweeper_pid = None
+
+def get_executor():
+    """Return the shared job worker pool, creating it on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.JOB_WORKERS, thread_name_prefix='job')
+        return _executor
+
+def get_connection():
+    """Return this thread's job database connection, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(os.path.dirname(Config.JOB_STORE_PATH), exist_ok=True)
+        conn = sqlite3.connect(Config.JOB_STORE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in MIGRATED_COLUMNS.items():
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def worker_name():
+    """Name the current worker process, as recorded on the jobs it runs."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+def is_worker_alive(owner):
+    """
+    Check whether the worker process that owns a job is still running.
+    
+    Args:
+        owner: Worker name recorded on the job
+        
+    Returns:
+        True or False, or None when it cannot be told (another host, or no POSIX signals)
+    """
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    if int(pid) == os.getpid():
+        return True
+    if os.name != 'posix':
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def fail_stale_jobs():
+    """
+    Fail unfinished jobs whose worker is gone, or on another host stopped reporting progress.
+    
+    A job's files only live in the memory of the worker that accepted it, so
+    a job left behind by a restarted or recycled worker can never finish.
+    
+    Returns:
+        Number of jobs marked as failed
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT id, owner, heartbeat_at, created_at FROM jobs WHERE status IN (?, ?)", UNFINISHED_STATUSES
+    ).fetchall()
+    
+    now = time.time()
+    stale = []
+    for job, owner, heartbeat_at, created_at in rows:
+        alive = is_worker_alive(owner)
+        # Workers that cannot be checked directly are judged by how long ago they reported progress
+        if alive is False or (alive is None and now - (heartbeat_at or created_at) > Config.JOB_STALE_AFTER):
+            stale.append(job)
+    for job in stale:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (FAILED, 'The worker running this job stopped before it finished', now, job) + UNFINISHED_STATUSES
+            )
+            if cursor.rowcount:
+                conn.execute("UPDATE job_files SET status = ? WHERE job_id = ? AND status IN (?, ?)",
+                             (FAILED, job) + UNFINISHED_STATUSES)
+                logger.warning(f"Job {job} was left unfinished by its worker, marking it failed")
+    return len(stale)
+
+def sweep_stale_jobs(interval):
+    """Fail stale jobs every interval seconds (runs on the sweeper thread)."""
+    while True:
+        time.sleep(interval)
+        try:
+            fail_stale_jobs()
+        except Exception as e:
+            logger.error(f"Error sweeping stale jobs: {str(e)}")
+
+def start_sweeper():
+    """Start the daemon thread sweeping stale jobs every Config.JOB_SWEEP_INTERVAL seconds, once per process."""
+    global _sweeper_pid
+    if Config.JOB_SWEEP_INTERVAL <= 0:
+        return
+    with _lock:
+        if _sweeper_pid == os.getpid():
+            return
+        _sweeper_pid = os.getpid()
+    threading.Thread(target=sweep_stale_jobs, args=(Config.JOB_SWEEP_INTERVAL,),
+                     name='job-sweeper', daemon=True).start()
+
+def submit_job(files, handler):
+    """
+    Queue files for background processing.
+    
+    The job's status and results are stored in SQLite, but the files are
+    held only in this worker's memory. A job whose worker stops before it
+    finishes is failed by the stale job sweep and cannot be retried; its
+    files have to be submitted again.
+    
+    Args:
+        files: List of (filename, html_content) tuples
+        handler: Function taking (filename, html_content) and returning a JSON-serializable result
+        
+    Returns:
+        ID of the new job
+    """
+    job_id = uuid.uuid4().hex
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        conn.execute("INSERT INTO jobs (id, status, created_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?)",
+                     (job_id, QUEUED, now, worker_name(), now))
+        conn.executemany(
+            "INSERT INTO job_files (job_id, position, filename, status) VALUES (?, ?, ?, ?)",
+            [(job_id, position, filename, QUEUED) for position, (filename, _) in enumerate(files)]
+        )
+    
+    get_executor().submit(run_job, job_id, files, handler)
+    prune_jobs()
+    return job_id
+
+def run_job(job_id, files, handler):
+    """Process a job's files in order, stopping early if it is cancelled; always leaves it finished."""
+    finished = False
+    failure = 'Job stopped unexpectedly'
+    try:
+        conn = get_connection()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), worker_name(), time.time(), job_id, QUEUED)
+        )
+        if cursor.rowcount == 0:
+            # Cancelled (or pruned) before a worker picked it up
+            finished = True
+            return
+        
+        failures = 0
+        for position, (filename, content) in enumerate(files):
+            if is_cancel_requested(job_id):
+                conn.execute("UPDATE job_files SET status = ? WHERE job_id = ? AND status = ?",
+                             (CANCELLED, job_id, QUEUED))
+                conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                             (CANCELLED, time.time(), job_id, RUNNING))
+                logger.info(f"Job {job_id} cancelled")
+                finished = True
+                return
+            
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+            conn.execute("UPDATE job_files SET status = ? WHERE job_id = ? AND position = ?",
+                         (RUNNING, job_id, position))
+            try:
+                result = handler(filename, content)
+                conn.execute("UPDATE job_files SET status = ?, result = ? WHERE job_id = ? AND position = ?",
+                             (DONE, json.dumps(result), job_id, position))
+            except Exception as e:
+                failures += 1
+                logger.error(f"Error processing {filename} in job {job_id}: {str(e)}")
+                conn.execute("UPDATE job_files SET status = ?, error = ? WHERE job_id = ? AND position = ?",
+                             (FAILED, str(e), job_id, position))
+        
+        # A job fails only if none of its files could be processed
+        status = FAILED if failures == len(files) else DONE
+        error = f"{failures} of {len(files)} files failed" if failures else None
+        conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                     (status, error, time.time(), job_id, RUNNING))
+        finished = True
+    except Exception as e:
+        logger.error(f"Job {job_id} stopped unexpectedly: {str(e)}")
+        failure = str(e)
+    finally:
+        if not finished:
+            # E.g. a database error while recording progress; the job must not stay running
+            mark_failed(job_id, failure)
+
+def mark_failed(job_id, error):
+    """Fail a job and its unfinished files, if it has not finished already."""
+    try:
+        conn = get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                         (FAILED, error, time.time(), job_id) + UNFINISHED_STATUSES)
+            conn.execute("UPDATE job_files SET status = ? WHERE job_id = ? AND status IN (?, ?)",
+                         (FAILED, job_id) + UNFINISHED_STATUSES)
+    except Exception as e:
+        logger.error(f"Error marking job {job_id} failed: {str(e)}")
+
+def is_cancel_requested(job_id):
+    """Check whether cancellation was requested for a job."""
+    row = get_connection().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return row is None or bool(row[0])
+
+def cancel_job(job_id):
+    """
+    Cancel a job. Queued jobs stop immediately, running jobs before their next file.
+    
+    Args:
+        job_id: ID of the job
+        
+    Returns:
+        The job's status after the request, or None if the job does not exist
+    """
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row[0] in FINISHED_STATUSES:
+            return row[0]
+        
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        if row[0] == QUEUED:
+            conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?",
+                         (CANCELLED, time.time(), job_id))
+            conn.execute("UPDATE job_files SET status = ? WHERE job_id = ?", (CANCELLED, job_id))
+            return CANCELLED
+        return row[0]
+
+def get_job(job_id):
+    """
+    Return a job's status and per-file results.
+    
+    Args:
+        job_id: ID of the job
+        
+    Returns:
+        Dictionary describing the job, or None if it does not exist
+    """
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT id, status, cancel_requested, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+        (job_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    
+    files = conn.execute(
+        "SELECT filename, status, result, error FROM job_files WHERE job_id = ? ORDER BY position",
+        (job_id,)
+    ).fetchall()
+    return {
+        'job_id': row[0],
+        'status': row[1],
+        'cancel_requested': bool(row[2]),
+        'error': row[3],
+        'created_at': row[4],
+        'started_at': row[5],
+        'finished_at': row[6],
+        'files': [
+            {
+                'filename': filename,
+                'status': status,
+                'result': json.loads(result) if result else None,
+                'error': error
+            }
+            for filename, status, result, error in files
+        ]
+    }
+
+def prune_jobs():
+    """Delete the oldest finished jobs beyond Config.JOB_HISTORY."""
+    conn = get_connection()
+    conn.execute(
+        "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN (?, ?, ?) "
+        "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+        FINISHED_STATUSES + (Config.JOB_HISTORY,)
+    )
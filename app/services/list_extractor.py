@@ -0,0 +1,173 @@
+import re
+import logging
+from app.config import Config
+from app.services import app_state, metrics
+from app.services.parsers import parse_html
+from app.services.scanner import link_texts
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Search and list results render one <grid-row> per company
+LIST_PAGE_PATTERN = re.compile(r'<grid-row[\s>]', re.IGNORECASE)
+# ... in a results grid with an organization identifier column, by id or by header label
+RESULTS_GRID_PATTERN = re.compile(
+    r'<grid-(?:cell|column-header)\b[^>]*\bdata-columnid=["\']?identifier[\s"\'>]'
+    r'|<grid-column-header\b[^>]*>\s*organization name\s*<',
+    re.IGNORECASE
+)
+# Company profiles have a profile header (which the company's own fields are read from), even
+# when they embed a grid of related or similar companies
+PROFILE_HEADER_PATTERN = re.compile(
+    r'<profile-v3-header[\s>]|\bclass=["\']?[^"\'>]*\bprofile-v3-header\b',
+    re.IGNORECASE
+)
+
+# Grid column ids for each field, with the header labels used when cells carry no id
+COLUMN_IDS = {
+    'company_name': ['identifier'],
+    'website': ['website', 'website_url'],
+    'description': ['short_description', 'description'],
+    'founders': ['founder_identifiers']
+}
+COLUMN_LABELS = {
+    'organization name': 'identifier',
+    'website': 'website',
+    'description': 'short_description',
+    'founders': 'founder_identifiers'
+}
+
+def is_list_page(file_content):
+    """
+    Check whether a page is a search or list result page rather than a company profile.
+
+    Args:
+        file_content: HTML content as a string
+
+    Returns:
+        True if the page holds a results grid with organization identifier cells and no profile header
+    """
+    return (LIST_PAGE_PATTERN.search(file_content) is not None
+            and RESULTS_GRID_PATTERN.search(file_content) is not None
+            and PROFILE_HEADER_PATTERN.search(file_content) is None)
+
+def header_columns(soup):
+    """Return the column id of each grid header, in column order."""
+    columns = []
+    for header in soup.find_all('grid-column-header'):
+        column = header.get('data-columnid')
+        if not column:
+            column = COLUMN_LABELS.get(header.get_text(' ', strip=True).lower())
+        columns.append(column)
+    return columns
+
+def cell_fields(cells):
+    """
+    Read company fields from the cells of one grid row.
+
+    Args:
+        cells: Dictionary of column id to grid-cell tag
+
+    Returns:
+        Dictionary with company_name, website, description and founders
+    """
+    fields = {'company_name': 'Unknown Company', 'website': '', 'description': '', 'founders': []}
+
+    cell = next((cells[column] for column in COLUMN_IDS['company_name'] if column in cells), None)
+    if cell is not None:
+        label = cell.select_one('.identifier-label') or cell.find('a') or cell
+        name = label.get_text(' ', strip=True)
+        if name:
+            fields['company_name'] = name
+
+    cell = next((cells[column] for column in COLUMN_IDS['website'] if column in cells), None)
+    if cell is not None:
+        link = cell.find('a', href=True)
+        if link is not None:
+            fields['website'] = link.text.strip() or app_state.format_website(link['href'])
+        else:
+            fields['website'] = cell.get_text(strip=True)
+
+    cell = next((cells[column] for column in COLUMN_IDS['description'] if column in cells), None)
+    if cell is not None:
+        fields['description'] = cell.get_text(' ', strip=True)
+
+    cell = next((cells[column] for column in COLUMN_IDS['founders'] if column in cells), None)
+    if cell is not None:
+        fields['founders'] = link_texts(cell.find_all('a'))
+        if not fields['founders']:
+            fields['founders'] = [name.strip() for name in cell.get_text().split(',') if name.strip()]
+    return fields
+
+def iter_grid_companies(soup):
+    """Yield the fields of each company row in a parsed results grid."""
+    headers = None
+    for row in soup.find_all('grid-row'):
+        cells = {}
+        for position, cell in enumerate(row.find_all('grid-cell')):
+            column = cell.get('data-columnid')
+            if not column:
+                if headers is None:
+                    headers = header_columns(soup)
+                column = headers[position] if position < len(headers) else None
+            if column and column not in cells:
+                cells[column] = cell
+        # Header rows and empty placeholder rows carry no company
+        if any(column in cells for column in COLUMN_IDS['company_name']):
+            yield cell_fields(cells)
+
+def iter_state_companies(file_content):
+    """
+    Yield the fields of each organization in the page's serialized app state.
+
+    Args:
+        file_content: HTML content as a string
+
+    Returns:
+        Generator of field dictionaries, empty unless the state lists several organizations
+    """
+    state = app_state.load_app_state(file_content)
+    if state is None:
+        return
+    organizations = app_state.find_organizations(state)
+    if len(organizations) < 2:
+        return
+    for entity in organizations:
+        fields = app_state.entity_fields(entity)
+        yield {
+            'company_name': fields.get('company_name', 'Unknown Company'),
+            'website': fields.get('website', ''),
+            'description': fields.get('description', ''),
+            'founders': fields.get('founders', [])
+        }
+
+def iter_list_companies(file_content, parser_backend=None):
+    """
+    Yield the fields of every company on a search or list result page, from a single parse.
+
+    Args:
+        file_content: HTML content as a string
+        parser_backend: Optional parser backend name
+
+    Returns:
+        Generator of dictionaries with company_name, website, description and founders
+    """
+    # The serialized state lists every row without building a DOM
+    if Config.APP_STATE_ENABLED:
+        found = False
+        for fields in iter_state_companies(file_content):
+            found = True
+            metrics.increment('list_rows_total', source='app_state')
+            yield fields
+        if found:
+            return
+
+    with metrics.timed('parse'):
+        soup = parse_html(file_content, parser_backend)
+    count = 0
+    for fields in iter_grid_companies(soup):
+        count += 1
+        metrics.increment('list_rows_total', source='grid')
+        yield fields
+    logger.info(f"Read {count} companies from a list page")
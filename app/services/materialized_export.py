@@ -0,0 +1,396 @@
+from array import array
+import atexit
+from io import StringIO
+import csv
+import json
+import os
+import shutil
+import threading
+import uuid
+import logging
+from app.config import Config
+from app.services import metrics
+from app.services.email_generator import render_email_template, template_settings_key
+from app.services.exporter import (CONTACT_FIELDS, COMPANY_FIELDS, PIPELINE_FIELDS, EMAIL_TEMPLATES_HEADER,
+                                   EMAIL_TEMPLATES_SEPARATOR, stream_zip)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Export file of each table, in zip order, with its CSV columns (None for the email templates text)
+MATERIALIZED_FILES = [
+    ('contacts', 'contacts.csv', CONTACT_FIELDS),
+    ('companies', 'companies.csv', COMPANY_FIELDS),
+    ('pipelines', 'pipelines.csv', PIPELINE_FIELDS),
+    ('email_templates', 'email_templates.txt', None)
+]
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_KEYS = {'store_id', 'generation', 'settings', 'build', 'files'}
+ZIP_PREFIX = 'crunchbase_data-'
+
+# Archives kept: the newest, plus the previous one a concurrent request may be about to send
+KEPT_ARCHIVES = 2
+
+# Memory stores keep their files in a directory per process, named after its pid
+MEMORY_DIRECTORY_PREFIX = 'memory-'
+
+# Each export file has a sidecar of the byte offset where every entry ends, so the last one can be truncated
+OFFSETS_SUFFIX = '.offsets'
+OFFSET_TYPE = 'q'
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+def is_process_alive(pid):
+    """Check whether a local process exists (assumed alive where POSIX signals are unavailable)."""
+    if pid == os.getpid() or os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def memory_directory(parent):
+    """
+    Return this process's export directory for a memory store, removing those of exited processes.
+
+    Args:
+        parent: Directory holding the export files
+
+    Returns:
+        Path of the directory, which is also removed when this process exits
+    """
+    try:
+        names = os.listdir(parent)
+    except OSError:
+        names = []
+    for name in names:
+        pid = name[len(MEMORY_DIRECTORY_PREFIX):]
+        if name.startswith(MEMORY_DIRECTORY_PREFIX) and pid.isdigit() and not is_process_alive(int(pid)):
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+    directory = os.path.join(parent, f'{MEMORY_DIRECTORY_PREFIX}{os.getpid()}')
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+def encode_header(fields):
+    """Encode the start of an export file: the CSV header, or the email templates banner."""
+    if fields is None:
+        return EMAIL_TEMPLATES_HEADER.encode('utf-8')
+    output = StringIO()
+    csv.DictWriter(output, fieldnames=fields).writeheader()
+    return output.getvalue().encode('utf-8')
+
+def encode_entries(entries, fields, settings, first_index):
+    """
+    Encode entries exactly as the streamed export writes them.
+
+    Args:
+        entries: List of entry dictionaries (or template records)
+        fields: CSV columns, or None for email templates
+        settings: Settings email templates are rendered with
+        first_index: Number of entries already in the file
+
+    Returns:
+        List of bytes, one per entry
+    """
+    if fields is None:
+        return [((EMAIL_TEMPLATES_SEPARATOR if first_index + index else '')
+                 + render_email_template(entry, settings)).encode('utf-8')
+                for index, entry in enumerate(entries)]
+
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=fields)
+    encoded = []
+    for entry in entries:
+        writer.writerow({field: entry.get(field, '') for field in fields})
+        encoded.append(output.getvalue().encode('utf-8'))
+        output.seek(0)
+        output.truncate()
+    return encoded
+
+class MaterializedExport:
+    """
+    Export files kept on disk and updated as entries change.
+
+    Confirmed entries are appended to the CSVs and email templates file, and
+    removing the last entries truncates them, so the files always match one
+    generation of the result store. A manifest records that generation and the
+    size of each file; files whose manifest does not match the store are
+    rebuilt on the next download. The mutating methods are called by the store
+    while it holds its write lock, which serializes them across threads and,
+    for SQLite, across worker processes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def load_manifest(self):
+        """Return the manifest, or None if the files are missing, invalidated or the manifest is damaged."""
+        try:
+            with open(self.path(MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(manifest, dict) or not MANIFEST_KEYS <= manifest.keys()
+                or not isinstance(manifest['files'], dict)
+                or any(filename not in manifest['files'] for _, filename, _ in MATERIALIZED_FILES)):
+            return None
+        return manifest
+
+    def save_manifest(self, manifest):
+        """Replace the manifest atomically, so readers never see a partial one."""
+        temp_path = self.path(f'{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.path(MANIFEST_NAME))
+
+    def invalidate(self):
+        """Mark the files out of date, so the next download rebuilds them."""
+        try:
+            os.remove(self.path(MANIFEST_NAME))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error invalidating materialized export: {str(e)}")
+
+    def current(self, store_id, generation, settings=None):
+        """
+        Return the manifest if the files hold the given generation of a store.
+
+        Args:
+            store_id: Identity of the result store
+            generation: Store generation the files must match
+            settings: Optional settings the email templates must have been rendered with
+
+        Returns:
+            Manifest dictionary, or None if the files are out of date
+        """
+        manifest = self.load_manifest()
+        if (manifest is None or manifest.get('store_id') != store_id
+                or manifest.get('generation') != generation):
+            return None
+        if settings is not None and manifest.get('settings') != template_settings_key(settings):
+            return None
+        return manifest
+
+    def create(self, store_id, generation, settings):
+        """Start empty export files holding only their headers, returning their manifest."""
+        os.makedirs(self.directory, exist_ok=True)
+        files = {}
+        for _, filename, fields in MATERIALIZED_FILES:
+            header = encode_header(fields)
+            with open(self.path(filename), 'wb') as f:
+                f.write(header)
+            with open(self.path(filename + OFFSETS_SUFFIX), 'wb'):
+                pass
+            files[filename] = {'header': len(header), 'size': len(header), 'rows': 0}
+        return {
+            'store_id': store_id,
+            'generation': generation,
+            'settings': template_settings_key(settings),
+            'build': uuid.uuid4().hex,
+            'files': files
+        }
+
+    def write_entries(self, filename, state, encoded):
+        """Write encoded entries after the last entry of a file, dropping anything past it."""
+        offsets = array(OFFSET_TYPE)
+        end = state['size']
+        for data in encoded:
+            end += len(data)
+            offsets.append(end)
+
+        with open(self.path(filename), 'r+b') as f:
+            f.seek(state['size'])
+            f.write(b''.join(encoded))
+            f.truncate()
+        with open(self.path(filename + OFFSETS_SUFFIX), 'r+b') as f:
+            f.seek(state['rows'] * offsets.itemsize)
+            f.write(offsets.tobytes())
+            f.truncate()
+        state['rows'] += len(encoded)
+        state['size'] = end
+
+    def append(self, store_id, before, after, added, settings):
+        """
+        Append newly added entries, moving the files from one generation to the next.
+
+        Args:
+            store_id: Identity of the result store
+            before: Store generation before the entries were added
+            after: Store generation with the entries added
+            added: Dictionary mapping table names to the entries added
+            settings: Current settings, used to render email templates
+        """
+        manifest = self.current(store_id, before, settings)
+        if manifest is None:
+            # Files that already missed a change are rebuilt on the next download instead
+            self.invalidate()
+            return
+        try:
+            for table, filename, fields in MATERIALIZED_FILES:
+                entries = added.get(table)
+                if entries:
+                    state = manifest['files'][filename]
+                    self.write_entries(filename, state, encode_entries(entries, fields, settings, state['rows']))
+            manifest['generation'] = after
+            self.save_manifest(manifest)
+        except OSError as e:
+            logger.error(f"Error appending to materialized export: {str(e)}")
+            self.invalidate()
+
+    def remove_last(self, store_id, before, after, tables):
+        """
+        Truncate the last entry of the given tables' files.
+
+        Args:
+            store_id: Identity of the result store
+            before: Store generation before the entries were removed
+            after: Store generation without them
+            tables: Names of the tables whose last entry was removed
+        """
+        manifest = self.current(store_id, before)
+        if manifest is None:
+            self.invalidate()
+            return
+        try:
+            for table, filename, _ in MATERIALIZED_FILES:
+                state = manifest['files'][filename]
+                if table not in tables or not state['rows']:
+                    continue
+                offsets = array(OFFSET_TYPE)
+                with open(self.path(filename + OFFSETS_SUFFIX), 'r+b') as f:
+                    # The entry before the last one ends where the file is cut (the header if there is none)
+                    if state['rows'] > 1:
+                        f.seek((state['rows'] - 2) * offsets.itemsize)
+                        offsets.frombytes(f.read(offsets.itemsize))
+                    f.truncate((state['rows'] - 1) * offsets.itemsize)
+                size = offsets[0] if offsets else state['header']
+                with open(self.path(filename), 'r+b') as f:
+                    f.truncate(size)
+                state['rows'] -= 1
+                state['size'] = size
+            manifest['generation'] = after
+            self.save_manifest(manifest)
+        except OSError as e:
+            logger.error(f"Error truncating materialized export: {str(e)}")
+            self.invalidate()
+
+    def clear(self, store_id, after, settings):
+        """Reset the files to their headers for an emptied store."""
+        try:
+            self.save_manifest(self.create(store_id, after, settings))
+        except OSError as e:
+            logger.error(f"Error clearing materialized export: {str(e)}")
+            self.invalidate()
+
+    def rebuild(self, store):
+        """
+        Rewrite the files from every stored entry; the caller holds the store's write lock.
+
+        Args:
+            store: Result store to export
+
+        Returns:
+            Manifest of the rebuilt files
+        """
+        with metrics.timed('export_rebuild'):
+            self.invalidate()
+            settings = store.get_settings()
+            manifest = self.create(store.store_id, store.generation(), settings)
+            for table, filename, fields in MATERIALIZED_FILES:
+                state = manifest['files'][filename]
+                batch = []
+                for entry in store.iter_rows(table):
+                    batch.append(entry)
+                    if len(batch) >= Config.EXPORT_BATCH_ROWS:
+                        self.write_entries(filename, state, encode_entries(batch, fields, settings, state['rows']))
+                        batch = []
+                if batch:
+                    self.write_entries(filename, state, encode_entries(batch, fields, settings, state['rows']))
+            self.save_manifest(manifest)
+        metrics.increment('export_rebuilds_total')
+        return manifest
+
+    def read_file(self, filename, size):
+        """Read the first size bytes of an export file in chunks, ignoring anything appended since."""
+        with open(self.path(filename), 'rb') as f:
+            while size > 0:
+                data = f.read(min(size, READ_CHUNK_SIZE))
+                if not data:
+                    break
+                size -= len(data)
+                yield data
+
+    def download(self, store, compresslevel=None):
+        """
+        Return the results zip for the store's current entries, building what is out of date.
+
+        An unchanged store is served the archive built for its generation. A
+        changed one has its zip built from the export files, which confirms
+        keep up to date, so no entry is encoded again.
+
+        Args:
+            store: Result store to export
+            compresslevel: Optional deflate level overriding the configured one
+
+        Returns:
+            Tuple of (zip path, ETag), or None if the entries changed while it was built
+        """
+        if compresslevel is None:
+            compresslevel = Config.EXPORT_COMPRESSION_LEVEL
+
+        manifest = self.current(store.store_id, store.generation(), store.get_settings())
+        if manifest is None:
+            with store.exclusive():
+                manifest = self.current(store.store_id, store.generation(), store.get_settings())
+                if manifest is None:
+                    manifest = self.rebuild(store)
+
+        etag = f"{manifest['store_id']}-{manifest['generation']}-{manifest['settings']}-{compresslevel}"
+        zip_path = self.path(f'{ZIP_PREFIX}{etag}.zip')
+        if os.path.exists(zip_path):
+            metrics.increment('export_zip_cache_hits_total')
+            return zip_path, etag
+
+        temp_path = f'{zip_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        members = [(filename, self.read_file(filename, manifest['files'][filename]['size']))
+                   for _, filename, _ in MATERIALIZED_FILES]
+        with open(temp_path, 'wb') as f:
+            for data in stream_zip(members, compresslevel):
+                f.write(data)
+
+        # Writers change the manifest while holding the lock, so an unchanged one
+        # means no file was modified while it was read
+        with store.exclusive():
+            unchanged = self.load_manifest() == manifest
+        if not unchanged:
+            os.remove(temp_path)
+            return None
+        os.replace(temp_path, zip_path)
+
+        self.prune_archives()
+        return zip_path, etag
+
+    def prune_archives(self):
+        """Delete all but the KEPT_ARCHIVES newest archives, so a path just handed out stays servable."""
+        archives = []
+        for name in os.listdir(self.directory):
+            if name.startswith(ZIP_PREFIX) and name.endswith('.zip'):
+                try:
+                    archives.append((os.path.getmtime(self.path(name)), name))
+                except OSError:
+                    pass
+        for _, name in sorted(archives, reverse=True)[KEPT_ARCHIVES:]:
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                pass
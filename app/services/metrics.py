@@ -0,0 +1,168 @@
+from bisect import bisect_left
+import functools
+import threading
+import time
+import logging
+from app.config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER_HELP = {
+    'apollo_requests_total': 'Apollo API requests made',
+    'apollo_cache_hits_total': 'Apollo lookups served from the cache',
+    'apollo_coalesced_total': 'Apollo lookups that shared an identical request already in flight',
+    'apollo_rate_limited_total': 'Apollo requests queued by the rate limiter',
+    'parse_cache_hits_total': 'Pages whose fields were served from the parse cache',
+    'selector_hits_total': 'Fields resolved per extractor selector',
+    'selector_fallbacks_total': 'Fields resolved by a full-document fallback scan',
+    'selector_misses_total': 'Fields no selector or fallback could resolve',
+    'selector_fallback_alerts_total': 'Times a fallback scan started resolving most pages of a field',
+    'prefilter_bytes_skipped_total': 'Bytes of markup dropped before parsing',
+    'prefilter_nodes_skipped_total': 'Nodes dropped before parsing',
+    'list_rows_total': 'Company rows read from search and list result pages',
+    'dedup_rejections_total': 'Entries rejected as duplicates',
+    'near_duplicates_total': 'Entries matched to a stored entry as near-duplicates',
+    'csv_rows_written_total': 'Rows written to CSV exports',
+    'export_rows_written_total': 'Rows written to NDJSON, Arrow and Parquet exports',
+    'export_rebuilds_total': 'Materialized export files rebuilt from every stored entry',
+    'export_zip_cache_hits_total': 'Result downloads served from the zip built for an unchanged generation'
+}
+
+# Metrics are kept per process; each worker exposes its own values
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+_request = threading.local()
+
+class NullTimer:
+    """Timer used when metrics are disabled; does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = NullTimer()
+
+class StageTimer:
+    """Time a block and record it as a stage duration."""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+def timed(stage):
+    """Return a context manager timing a stage, or a no-op when metrics are disabled."""
+    if not Config.METRICS_ENABLED:
+        return NULL_TIMER
+    return StageTimer(stage)
+
+def timed_function(stage):
+    """Decorate a function so that every call is timed as a stage."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def observe(stage, seconds):
+    """Record a stage duration in its histogram and the current request's timings."""
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = {'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+        histogram['buckets'][bisect_left(BUCKETS, seconds)] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+    
+    timings = getattr(_request, 'timings', None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+def increment(name, amount=1, **labels):
+    """Increment a counter, optionally labelled."""
+    if not Config.METRICS_ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def start_request():
+    """Start collecting stage timings for the current request."""
+    if Config.METRICS_ENABLED:
+        _request.timings = {}
+
+def finish_request():
+    """
+    Stop collecting stage timings for the current request.
+    
+    Returns:
+        Server-Timing header value, or None if nothing was timed
+    """
+    timings = getattr(_request, 'timings', None)
+    _request.timings = None
+    if not timings:
+        return None
+    return ', '.join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+def format_labels(labels):
+    """Format labels in Prometheus exposition syntax."""
+    if not labels:
+        return ''
+    escaped = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+def render_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    
+    Returns:
+        Metrics as a string
+    """
+    lines = []
+    with _lock:
+        histograms = {stage: dict(h, buckets=list(h['buckets'])) for stage, h in _histograms.items()}
+        counters = dict(_counters)
+    
+    lines.append('# HELP stage_duration_seconds Time spent per processing stage')
+    lines.append('# TYPE stage_duration_seconds histogram')
+    for stage, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), histogram['buckets']):
+            cumulative += count
+            lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'stage_duration_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+        lines.append(f'stage_duration_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+    
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f'# HELP {name} {COUNTER_HELP.get(name, name)}')
+        lines.append(f'# TYPE {name} counter')
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+    
+    return '\n'.join(lines) + '\n'
+
+def reset_metrics():
+    """Clear all histograms and counters."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
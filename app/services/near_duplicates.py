@@ -0,0 +1,180 @@
+import re
+import logging
+from app.config import Config
+from app.services import metrics
+from app.services.domains import parse_domain
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Columns holding the company name, a website or email, and the contact of each table
+NEAR_DUPLICATE_FIELDS = {
+    'contacts': {'name': 'Company Name', 'email': 'Email', 'founder': 'Contact Name'},
+    'companies': {'name': 'Company Name', 'website': 'Website'},
+    'pipelines': {'name': 'Company Name', 'email': 'Contact Email', 'founder': 'Contact Name'}
+}
+
+# Legal suffixes and filler words that do not tell companies apart
+NAME_STOP_WORDS = {'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation',
+                   'co', 'company', 'gmbh', 'plc', 'ag', 'sa', 'the'}
+
+# Placeholders written when a page had no value; they never make two entries alike
+PLACEHOLDER_NAMES = {'unknown company'}
+PLACEHOLDER_FOUNDERS = {'unknown contact'}
+PLACEHOLDER_DOMAINS = {'unknown.com', ''}
+FREE_MAIL_DOMAINS = {'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com',
+                     'aol.com', 'proton.me', 'protonmail.com'}
+
+# Weight of each signal in a candidate's score
+SIGNAL_WEIGHTS = (0.4, 0.35, 0.25)
+
+# Blocks shared by more entries than this are too common to narrow the search and are skipped
+MAX_BLOCK_SIZE = 1000
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+def name_tokens(name):
+    """Normalize a company name into its distinguishing tokens, e.g. 'Acme, Inc.' -> {'acme'}."""
+    if not isinstance(name, str) or name.strip().lower() in PLACEHOLDER_NAMES:
+        return None
+    tokens = WORD_PATTERN.findall(name.lower().replace('&', ' and '))
+    distinctive = [token for token in tokens if token not in NAME_STOP_WORDS]
+    return frozenset(distinctive or tokens) or None
+
+def canonical_domain(value):
+    """Return the parse_domain-canonical domain of a website or email address."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    if '@' in value:
+        domain = value.rsplit('@', 1)[1].strip().lower()
+        if domain in FREE_MAIL_DOMAINS:
+            return None
+    else:
+        domain = parse_domain(value.strip())
+    return None if domain in PLACEHOLDER_DOMAINS else domain
+
+def founder_name(name):
+    """Normalize a contact name, ignoring punctuation, case and spacing."""
+    if not isinstance(name, str):
+        return None
+    normalized = ' '.join(WORD_PATTERN.findall(name.lower()))
+    return None if not normalized or normalized in PLACEHOLDER_FOUNDERS else normalized
+
+def make_signature(table, entry):
+    """
+    Reduce an entry to the normalized values it is compared on.
+
+    Args:
+        table: Table name
+        entry: Entry dictionary
+
+    Returns:
+        Tuple of (domain, company name tokens, founder name), each None when missing
+    """
+    fields = NEAR_DUPLICATE_FIELDS[table]
+    domain = canonical_domain(entry.get(fields.get('website') or fields.get('email')))
+    founder = founder_name(entry.get(fields['founder'])) if 'founder' in fields else None
+    return domain, name_tokens(entry.get(fields['name'])), founder
+
+def blocking_keys(signature):
+    """Return the block keys of a signature; entries can only match if they share one."""
+    domain, tokens, founder = signature
+    keys = []
+    if domain:
+        keys.append(f'domain:{domain}')
+    if tokens:
+        keys.append('name:' + ' '.join(sorted(tokens)))
+    if founder:
+        keys.append(f'founder:{founder}')
+    return keys
+
+def score(signature, other):
+    """
+    Score how alike two signatures are, over the signals both of them have.
+
+    Args:
+        signature: Signature of the new entry
+        other: Signature of a stored entry
+
+    Returns:
+        Tuple of (score between 0 and 1, number of signals compared)
+    """
+    total = weights = 0.0
+    compared = 0
+    for weight, value, other_value in zip(SIGNAL_WEIGHTS, signature, other):
+        if not value or not other_value:
+            continue
+        if isinstance(value, frozenset):
+            similarity = len(value & other_value) / len(value | other_value)
+        else:
+            similarity = 1.0 if value == other_value else 0.0
+        total += weight * similarity
+        weights += weight
+        compared += 1
+    return (total / weights if weights else 0.0), compared
+
+def best_match(table, signature, candidates):
+    """
+    Pick the stored entry most like a new one, if it scores as a near-duplicate.
+
+    Args:
+        table: Table name
+        signature: Signature of the new entry
+        candidates: Iterable of (entry id, signature) pairs sharing a block with it
+
+    Returns:
+        Tuple of (entry id, score), or None if no candidate reaches NEAR_DUPLICATE_THRESHOLD
+    """
+    best = None
+    for entry_id, other in candidates:
+        similarity, compared = score(signature, other)
+        # A single shared signal (e.g. only the name) is not enough evidence
+        if compared >= 2 and similarity >= Config.NEAR_DUPLICATE_THRESHOLD:
+            if best is None or similarity > best[1]:
+                best = (entry_id, similarity)
+    if best is not None:
+        metrics.increment('near_duplicates_total', table=table)
+    return best
+
+class NearDuplicateIndex:
+    """
+    In-memory blocking index over one table's entries.
+
+    Each entry is filed under its blocking keys; a lookup scores only the
+    entries sharing a block with the new entry, so the cost depends on block
+    sizes rather than on how many entries are stored.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.blocks = {}
+        self.signatures = {}
+
+    def add(self, entry_id, entry):
+        """File an entry under its blocking keys."""
+        signature = make_signature(self.table, entry)
+        self.signatures[entry_id] = signature
+        for key in blocking_keys(signature):
+            self.blocks.setdefault(key, set()).add(entry_id)
+
+    def remove(self, entry_id):
+        """Drop an entry from its blocks."""
+        signature = self.signatures.pop(entry_id, None)
+        if signature is None:
+            return
+        for key in blocking_keys(signature):
+            ids = self.blocks[key]
+            ids.discard(entry_id)
+            if not ids:
+                del self.blocks[key]
+
+    def find(self, entry):
+        """Return (entry id, score) of the best near-duplicate of an entry, or None."""
+        signature = make_signature(self.table, entry)
+        candidates = set()
+        for key in blocking_keys(signature):
+            ids = self.blocks.get(key, ())
+            if len(ids) <= MAX_BLOCK_SIZE:
+                candidates.update(ids)
+        return best_match(self.table, signature, ((entry_id, self.signatures[entry_id]) for entry_id in candidates))
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import os
+import threading
+import logging
+from app.config import Config
+from app.services.parsers import get_parser_backend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when extraction logic changes so stale on-disk entries are ignored
+EXTRACTION_VERSION = 2
+
+_entries = OrderedDict()
+_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+_lock = threading.Lock()
+
+def content_key(file_content, parser_backend=None):
+    """
+    Hash uploaded content into its cache key.
+    
+    The key also names the parser backend and the app state and pre-filter
+    switches, since each of them can change the extracted fields.
+    
+    Args:
+        file_content: HTML content as a string or bytes
+        parser_backend: Optional backend name overriding Config.HTML_PARSER
+        
+    Returns:
+        Cache key string
+    """
+    if isinstance(file_content, str):
+        file_content = file_content.encode('utf-8', 'surrogatepass')
+    digest = hashlib.sha256(file_content).hexdigest()
+    options = f"{get_parser_backend(parser_backend)}-a{int(Config.APP_STATE_ENABLED)}p{int(Config.PREFILTER_ENABLED)}"
+    return f"v{EXTRACTION_VERSION}-{options}-{digest}"
+
+def get_disk_path(key):
+    """Return the on-disk location of an entry, or None if the disk tier is off."""
+    if not Config.PARSE_CACHE_DIR:
+        return None
+    return os.path.join(Config.PARSE_CACHE_DIR, key[-2:], f"{key}.json")
+
+def remember(key, fields):
+    """Store fields in the memory tier, evicting the least recently used entry."""
+    _entries[key] = fields
+    _entries.move_to_end(key)
+    while len(_entries) > Config.PARSE_CACHE_SIZE:
+        _entries.popitem(last=False)
+
+def get_fields(key):
+    """
+    Look up extracted fields by content key.
+    
+    Args:
+        key: Key returned by content_key
+        
+    Returns:
+        Copy of the extracted fields, or None on a miss
+    """
+    with _lock:
+        fields = _entries.get(key)
+        if fields is not None:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return copy.deepcopy(fields)
+    
+    path = get_disk_path(key)
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                fields = json.load(f)
+            with _lock:
+                remember(key, copy.deepcopy(fields))
+                _stats['disk_hits'] += 1
+            return fields
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading parse cache entry {key}: {str(e)}")
+    
+    with _lock:
+        _stats['misses'] += 1
+    return None
+
+def store_fields(key, fields):
+    """Store a copy of extracted fields in the memory tier and, if enabled, on disk."""
+    with _lock:
+        remember(key, copy.deepcopy(fields))
+    
+    path = get_disk_path(key)
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(fields, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error writing parse cache entry {key}: {str(e)}")
+
+def get_cache_stats():
+    """
+    Return this process's parse cache statistics.
+    
+    Returns:
+        Dictionary with hits, disk_hits, misses, entries and hit_rate
+    """
+    with _lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_entries)
+    lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+    return stats
+
+def clear_cache():
+    """Empty the memory tier and reset the statistics."""
+    with _lock:
+        _entries.clear()
+        _stats.update(hits=0, disk_hits=0, misses=0)
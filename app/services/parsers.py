@@ -0,0 +1,53 @@
+from bs4 import BeautifulSoup, FeatureNotFound
+import logging
+from app.config import Config
+from app.services.prefilter import prune_html
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Parser backends mapped to the BeautifulSoup tree builder they use.
+# Every backend yields a BeautifulSoup tree so the extract_* functions work unchanged.
+PARSER_BACKENDS = {
+    'html.parser': 'html.parser',  # Pure Python, always available
+    'lxml': 'lxml',                # libxml2 based, requires the lxml package
+    'html5lib': 'html5lib'         # Browser-grade parsing, requires the html5lib package
+}
+
+DEFAULT_BACKEND = 'html.parser'
+
+# Backends whose trees keep script and style text out of .text, so pre-filtering cannot change results
+PREFILTER_BACKENDS = {'html.parser', 'lxml'}
+
+def get_parser_backend(name=None):
+    """Resolve a backend name to a tree builder, defaulting to Config.HTML_PARSER."""
+    name = name or Config.HTML_PARSER
+    if name not in PARSER_BACKENDS:
+        logger.warning(f"Unknown parser backend '{name}', using {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+    return PARSER_BACKENDS[name]
+
+def parse_html(file_content, backend=None, prefilter=None):
+    """
+    Parse HTML content with the configured parser backend.
+    
+    Args:
+        file_content: HTML content as a string
+        backend: Optional backend name overriding Config.HTML_PARSER
+        prefilter: Whether to prune dead weight first, defaulting to Config.PREFILTER_ENABLED
+        
+    Returns:
+        BeautifulSoup object
+    """
+    builder = get_parser_backend(backend)
+    if prefilter is None:
+        prefilter = Config.PREFILTER_ENABLED
+    if prefilter and builder in PREFILTER_BACKENDS and isinstance(file_content, str):
+        file_content, _ = prune_html(file_content)
+    
+    try:
+        return BeautifulSoup(file_content, builder)
+    except FeatureNotFound:
+        logger.warning(f"Parser backend '{builder}' is not installed, using {DEFAULT_BACKEND}")
+        return BeautifulSoup(file_content, PARSER_BACKENDS[DEFAULT_BACKEND])
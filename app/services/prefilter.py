@@ -0,0 +1,189 @@
+import re
+import logging
+from app.services import metrics
+from app.services.scanner import FOUNDER_INDICATORS, TILE_FOUNDER_INDICATORS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Comments, script/style elements and inline SVG, matched left to right so a comment
+# or script body hides any markup inside it
+DEAD_WEIGHT_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|(<(script|style)\b[^>]*>)(.*?)(</\s*\2\s*>)'
+    r'|(<svg\b[^>]*>)(.*?)(</svg\s*>)',
+    re.IGNORECASE | re.DOTALL
+)
+# Where a match of DEAD_WEIGHT_PATTERN can begin
+DEAD_WEIGHT_START_PATTERN = re.compile(r'<!--|<(?:script|style)\b|<svg\b', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+TAG_START_PATTERN = re.compile(r'<[A-Za-z/!]')
+
+# Dropped markup leaves an empty comment behind, so neighbouring text stays in separate
+# strings and BeautifulSoup collapses whitespace-only strings exactly as before
+PLACEHOLDER = '<!---->'
+
+# Markup inside an SVG that an extractor could match, in which case the SVG is kept
+EXTRACTOR_MARKUP_PATTERN = re.compile(
+    r'<(?:a|p|span|svg|profile-v3-header|link-formatter|field-formatter|tile-field|tile-description|'
+    r'identifier-multi-formatter)[\s/>]'
+    r'|entity-name|top-row|expanded-only-content|overview-row|description',
+    re.IGNORECASE
+)
+
+def prune_match(match, skipped, keep=None):
+    """Return the replacement for one dead-weight match, counting what it drops."""
+    text = match.group(0)
+    if keep is not None and keep(text):
+        return text
+    # Markup followed directly by a tag can simply go; anywhere else it leaves a
+    # placeholder so the text on either side is not merged into one string
+    followed_by_tag = TAG_START_PATTERN.match(match.string, match.end()) is not None
+    placeholder = '' if followed_by_tag else PLACEHOLDER
+    
+    if text.startswith('<!--'):
+        # Comment text is invisible to the extractors, except as a founder label inside a span
+        if text == PLACEHOLDER or any(indicator in text for indicator in FOUNDER_INDICATORS):
+            return text
+        kind, replacement, nodes = 'comment', placeholder, 0 if placeholder else 1
+    elif match.group(1):
+        opening, name, body = match.group(1), match.group(2), match.group(3)
+        # Script text counts towards :contains() matches, so keep bodies naming founders
+        if (EXTRACTOR_MARKUP_PATTERN.search(opening[len(name) + 1:])
+                or any(indicator in body for indicator in TILE_FOUNDER_INDICATORS)):
+            return text
+        kind, replacement, nodes = name.lower(), placeholder, 2 if body else 1
+    else:
+        opening, body = match.group(5), match.group(6)
+        if EXTRACTOR_MARKUP_PATTERN.search(opening[4:]) or EXTRACTOR_MARKUP_PATTERN.search(body):
+            return text
+        # Only icons without text can go; whitespace strings are kept so the parent's text is unchanged
+        whitespace = [segment for segment in TAG_PATTERN.split(body) if segment]
+        if any(segment.strip() for segment in whitespace):
+            return text
+        nodes = 1 + sum(1 for tag in TAG_PATTERN.findall(body) if not tag.startswith('</'))
+        if whitespace:
+            replacement = PLACEHOLDER + PLACEHOLDER.join(whitespace) + placeholder
+        else:
+            replacement = placeholder
+        kind = 'svg'
+
+    stats = skipped.setdefault(kind, [0, 0])
+    stats[0] += len(text.encode('utf-8')) - len(replacement.encode('utf-8'))
+    stats[1] += nodes
+    return replacement
+
+def prune_html(file_content):
+    """
+    Drop markup no extractor looks at before the page is parsed.
+
+    Replaces <script> and <style> elements, inline SVG icons and comment text
+    with empty comments, keeping any whitespace that contributes to the
+    surrounding text so every extract_* function sees the same text and
+    candidates.
+
+    Args:
+        file_content: HTML content as a string
+
+    Returns:
+        Tuple of (pruned HTML, dictionary of kind to [bytes skipped, nodes skipped])
+    """
+    skipped = {}
+    with metrics.timed('prefilter'):
+        pruned = DEAD_WEIGHT_PATTERN.sub(lambda match: prune_match(match, skipped), file_content)
+    logger.debug(f"Pre-filter skipped {len(file_content) - len(pruned)} characters: {skipped}")
+
+    for kind, (skipped_bytes, skipped_nodes) in skipped.items():
+        metrics.increment('prefilter_bytes_skipped_total', skipped_bytes, kind=kind)
+        metrics.increment('prefilter_nodes_skipped_total', skipped_nodes, kind=kind)
+    return pruned, skipped
+
+def closing_pattern(opener):
+    """Return the pattern of the text that can end the dead-weight markup starting with opener."""
+    if opener == '<!--':
+        return COMMENT_END_PATTERN
+    name = opener[1:].lower()
+    return re.compile(rf'</\s*{name}\s*>', re.IGNORECASE)
+
+COMMENT_END_PATTERN = re.compile(r'-->')
+
+def prune_stream(chunks, keep=None):
+    """
+    Prune a page arriving as text chunks, holding only unfinished markup in memory.
+
+    Produces the same text as prune_html on the joined chunks: each match is
+    resolved once its closing tag and the character after it have arrived.
+
+    Args:
+        chunks: Iterable of HTML text chunks
+        keep: Optional predicate; dead-weight markup for which it returns True is kept
+
+    Returns:
+        Tuple of (pruned HTML, dictionary of kind to [bytes skipped, nodes skipped])
+    """
+    skipped = {}
+    pruned = []
+    buffer = ''
+    # Unfinished markup at the start of the buffer waits for its closing tag, searched from wait_from
+    closing, wait_from = None, 0
+    chunks = iter(chunks)
+    final = False
+    with metrics.timed('prefilter'):
+        while not final:
+            chunk = next(chunks, None)
+            if chunk is None:
+                final = True
+            else:
+                buffer += chunk
+            
+            if closing is not None and not final:
+                found = closing.search(buffer, wait_from)
+                if found is not None and found.end() + 2 > len(buffer):
+                    wait_from = found.start()
+                    continue
+                if found is None:
+                    # Resume where an unfinished closing tag could begin
+                    if closing is COMMENT_END_PATTERN:
+                        wait_from = max(wait_from, len(buffer) - 2)
+                    else:
+                        last_tag = buffer.rfind('<', wait_from)
+                        wait_from = last_tag if last_tag != -1 else len(buffer)
+                    continue
+            closing = None
+            
+            position = 0
+            while True:
+                start = DEAD_WEIGHT_START_PATTERN.search(buffer, position)
+                if start is None:
+                    # Hold back a few characters that could begin a match
+                    end = len(buffer) if final else max(position, len(buffer) - 8)
+                    pruned.append(buffer[position:end])
+                    position = end
+                    break
+                
+                match = DEAD_WEIGHT_PATTERN.match(buffer, start.start())
+                # A match needs the character after it too, to know whether a tag follows
+                if match is not None and (final or match.end() + 2 <= len(buffer)):
+                    pruned.append(buffer[position:match.start()])
+                    pruned.append(prune_match(match, skipped, keep))
+                    position = match.end()
+                elif final:
+                    # Never closed: the whole-page pattern would move past it
+                    pruned.append(buffer[position:start.start() + 1])
+                    position = start.start() + 1
+                else:
+                    pruned.append(buffer[position:start.start()])
+                    position = start.start()
+                    if match is None:
+                        closing = closing_pattern(start.group(0))
+                        wait_from = start.end()
+                    break
+            buffer = buffer[position:]
+            wait_from = max(0, wait_from - position)
+    
+    pruned = ''.join(pruned)
+    for kind, (skipped_bytes, skipped_nodes) in skipped.items():
+        metrics.increment('prefilter_bytes_skipped_total', skipped_bytes, kind=kind)
+        metrics.increment('prefilter_nodes_skipped_total', skipped_nodes, kind=kind)
+    return pruned, skipped
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from app.config import Config
+from app.services import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Longest single sleep while queued, so a changed rate or freed capacity is noticed quickly
+MAX_SLEEP = 1.0
+
+# One connection per thread and process; SQLite handles cross-process locking
+_local = threading.local()
+
+# Threads of a process queue here, so only one of them polls the shared bucket at a time
+_queue_lock = threading.Lock()
+
+def get_connection():
+    """Return this thread's rate limit connection, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(os.path.dirname(Config.APOLLO_RATE_LIMIT_PATH), exist_ok=True)
+        conn = sqlite3.connect(Config.APOLLO_RATE_LIMIT_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def take_token(conn, name, rate, burst):
+    """
+    Refill a bucket for the time elapsed and take one token if there is one.
+
+    Args:
+        conn: Rate limit connection
+        name: Bucket name
+        rate: Tokens added per second
+        burst: Bucket capacity
+
+    Returns:
+        Seconds to wait before a token is available, or 0.0 if one was taken
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (name,)).fetchone()
+        tokens = float(burst) if row is None else min(float(burst), row[0] + max(0.0, now - row[1]) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        conn.execute("INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                     (name, tokens, now))
+    return wait
+
+def acquire(name='apollo'):
+    """
+    Block until the shared bucket grants a request.
+
+    The bucket lives in SQLite so every thread and worker process draws from
+    the same budget. Callers over the limit queue instead of failing.
+
+    Args:
+        name: Bucket name
+
+    Returns:
+        Seconds spent waiting
+    """
+    rate = Config.APOLLO_RATE_LIMIT
+    if rate <= 0:
+        return 0.0
+
+    start = time.perf_counter()
+    queued = False
+    with metrics.timed('apollo_rate_limit'), _queue_lock:
+        while True:
+            try:
+                wait = take_token(get_connection(), name, rate, max(1, Config.APOLLO_RATE_BURST))
+            except sqlite3.Error as e:
+                # A broken limiter must not stop lookups; Apollo's own 429s are still retried
+                logger.error(f"Error reading Apollo rate limit: {str(e)}")
+                break
+            if wait <= 0:
+                break
+            queued = True
+            time.sleep(min(wait, MAX_SLEEP))
+
+    if queued:
+        metrics.increment('apollo_rate_limited_total')
+    return time.perf_counter() - start
+
+def reset(name='apollo'):
+    """Refill a bucket to capacity."""
+    conn = get_connection()
+    conn.execute("DELETE FROM token_buckets WHERE name = ?", (name,))
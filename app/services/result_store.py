@@ -0,0 +1,796 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import uuid
+import logging
+from app.config import Config
+from app.services.materialized_export import MaterializedExport, memory_directory
+from app.services.near_duplicates import (NEAR_DUPLICATE_FIELDS, MAX_BLOCK_SIZE, NearDuplicateIndex, best_match,
+                                          blocking_keys, make_signature)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RESULT_TABLES = ['contacts', 'companies', 'pipelines', 'email_templates']
+
+# Key combinations used to deduplicate each table (None compares the whole entry)
+CONTACT_KEYS = ['Contact Name', 'Email', 'Company Name']
+COMPANY_KEYS = ['Company Name', 'Website']
+PIPELINE_KEYS = ['Deal Name', 'Company Name', 'Contact Name']
+PIPELINE_EMAIL_KEYS = ['Deal Name', 'Company Name', 'Contact Name', 'Contact Email']
+# Email templates are stored as parameter records and compared on every field
+EMAIL_TEMPLATE_KEYS = ['Template', 'Email', 'Company Name', 'First Name', 'Sourcing Analyst', 'Text']
+
+DEDUP_KEYS = {
+    'contacts': [CONTACT_KEYS],
+    'companies': [COMPANY_KEYS],
+    'pipelines': [PIPELINE_KEYS, PIPELINE_EMAIL_KEYS],
+    'email_templates': [EMAIL_TEMPLATE_KEYS]
+}
+
+# Columns results can be sorted and filtered on: the dedup key columns of each table
+QUERY_COLUMNS = {
+    table: list(dict.fromkeys(key for keys in key_sets if keys for key in keys))
+    for table, key_sets in DEDUP_KEYS.items()
+}
+QUERY_COLUMNS['email_templates'] = ['Email', 'Company Name']
+
+# Columns filled from settings, whose few distinct values are shared between rows
+SHARED_VALUE_COLUMNS = {'Prospect Quality Level', 'Industry', 'Sub-Pipeline', 'Stage', 'Industry Vertical',
+                        'Investment Cycle', 'Contact', 'Sourcing Analyst', 'Template'}
+MAX_SHARED_VALUES = 10000
+
+class RowShape:
+    """Column names of a row and their positions, shared by every row with the same columns."""
+
+    __slots__ = ('keys', 'positions')
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.positions = {key: position for position, key in enumerate(keys, 1)}
+
+# Shapes and settings values seen so far, so packed rows reference one copy of each
+row_shapes = {}
+shared_values = {}
+
+def share_value(value):
+    """Return the shared copy of a settings value."""
+    shared = shared_values.get(value)
+    if shared is None:
+        if len(shared_values) >= MAX_SHARED_VALUES:
+            return value
+        shared = shared_values.setdefault(value, value)
+    return shared
+
+def pack_row(row):
+    """
+    Pack a row dictionary into a compact tuple.
+    
+    The tuple holds the row's shared RowShape followed by its values, so the
+    column names are stored once per shape instead of once per row.
+    
+    Args:
+        row: Row dictionary (non-dictionary entries are stored as they are)
+        
+    Returns:
+        Packed row tuple
+    """
+    if not isinstance(row, dict):
+        return row
+    keys = tuple(row)
+    shape = row_shapes.get(keys)
+    if shape is None:
+        shape = row_shapes.setdefault(keys, RowShape(keys))
+    return (shape,) + tuple(
+        share_value(value) if key in SHARED_VALUE_COLUMNS and isinstance(value, str) else value
+        for key, value in row.items()
+    )
+
+def unpack_row(record):
+    """Rebuild the row dictionary of a packed row, with its original column order."""
+    if not isinstance(record, tuple):
+        return record
+    return dict(zip(record[0].keys, record[1:]))
+
+def record_value(record, key):
+    """Read one column of a packed row, or None if the row does not have it."""
+    position = record[0].positions.get(key)
+    return record[position] if position is not None else None
+
+def matches_filters(record, filters):
+    """Check if a packed row contains every filter value (case-insensitive) in its column."""
+    return all(value.lower() in str(record_value(record, column) or '').lower()
+               for column, value in filters.items())
+
+class ResultTable:
+    """
+    Ordered list of result rows with hash indexes for deduplication.
+
+    Rows are kept packed (see pack_row) and rebuilt as dictionaries when read.
+    Indexes are built lazily the first time a key combination is checked and
+    kept up to date on every append and removal, so membership checks are
+    O(1) regardless of how many rows have accumulated. Each index counts the
+    rows sharing a key, so removing one of several equal rows keeps the key.
+    Near-duplicate indexes (see near_duplicates) are built and maintained the
+    same way, keyed by row position.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.indexes = {}
+        self.near_indexes = {}
+
+    @staticmethod
+    def make_key(row, keys):
+        """Build the index key of a row dictionary; keys=None indexes the whole row."""
+        if keys is None:
+            return pack_row(row)
+        return tuple(row.get(key) for key in keys)
+
+    @staticmethod
+    def make_record_key(record, keys):
+        """Build the index key of a packed row."""
+        if keys is None:
+            return record
+        return tuple(record_value(record, key) for key in keys)
+
+    @property
+    def rows(self):
+        """All rows as dictionaries, in insertion order."""
+        return [unpack_row(record) for record in self.records]
+
+    def get_index(self, keys):
+        """Return the index for a key combination, building it on first use."""
+        index_name = tuple(keys) if keys is not None else None
+        index = self.indexes.get(index_name)
+        if index is None:
+            index = {}
+            for record in self.records:
+                key = self.make_record_key(record, keys)
+                index[key] = index.get(key, 0) + 1
+            self.indexes[index_name] = index
+        return index
+
+    def contains(self, row, keys=None):
+        """Check if a row matching the given keys is already stored."""
+        return self.make_key(row, keys) in self.get_index(keys)
+
+    def get_near_index(self, table):
+        """Return the near-duplicate index of the table's columns, building it on first use."""
+        index = self.near_indexes.get(table)
+        if index is None:
+            index = NearDuplicateIndex(table)
+            for position, record in enumerate(self.records):
+                index.add(position, unpack_row(record))
+            self.near_indexes[table] = index
+        return index
+
+    def find_near_duplicate(self, row, table):
+        """
+        Find a stored row that is a near-duplicate of a row.
+
+        Args:
+            row: Row dictionary
+            table: Table whose columns the rows have (a key of NEAR_DUPLICATE_FIELDS)
+
+        Returns:
+            The matching row, or None
+        """
+        match = self.get_near_index(table).find(row)
+        return unpack_row(self.records[match[0]]) if match else None
+
+    def append(self, row):
+        """Add a row and update every index."""
+        record = pack_row(row)
+        self.records.append(record)
+        for index_name, index in self.indexes.items():
+            key = self.make_record_key(record, index_name)
+            index[key] = index.get(key, 0) + 1
+        for index in self.near_indexes.values():
+            index.add(len(self.records) - 1, row)
+
+    def extend(self, rows):
+        """Add several rows."""
+        for row in rows:
+            self.append(row)
+
+    def pop(self):
+        """Remove and return the last row, updating every index."""
+        record = self.records.pop()
+        for index_name, index in self.indexes.items():
+            key = self.make_record_key(record, index_name)
+            if index[key] == 1:
+                del index[key]
+            else:
+                index[key] -= 1
+        for index in self.near_indexes.values():
+            index.remove(len(self.records))
+        return unpack_row(record)
+
+    def clear(self):
+        """Remove all rows and indexes."""
+        self.records.clear()
+        self.indexes.clear()
+        self.near_indexes.clear()
+
+    def __contains__(self, row):
+        return self.contains(row)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return (unpack_row(record) for record in self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [unpack_row(record) for record in self.records[index]]
+        return unpack_row(self.records[index])
+
+def is_duplicate_entry(new_entry, existing_entries, keys_to_check, near_table=None):
+    """
+    Check if an entry is a duplicate based on specified keys
+    
+    Args:
+        new_entry (dict): The new entry to check
+        existing_entries (ResultTable or list): Existing entries
+        keys_to_check (list): Keys to compare for determining duplicates
+        near_table (str): Table whose columns the entries have, to also match near-duplicates in a ResultTable
+    
+    Returns:
+        bool: True if duplicate, False otherwise
+    """
+    # Result tables answer from a hash index instead of scanning
+    if isinstance(existing_entries, ResultTable):
+        if existing_entries.contains(new_entry, keys_to_check):
+            return True
+        return bool(near_table and Config.NEAR_DUPLICATES_ENABLED
+                    and existing_entries.find_near_duplicate(new_entry, near_table) is not None)
+    
+    for existing_entry in existing_entries:
+        # Check if all specified keys match
+        if all(new_entry.get(key) == existing_entry.get(key) for key in keys_to_check):
+            return True
+    return False
+
+class MemoryResultStore:
+    """Process-local result store kept in hash-indexed ResultTables."""
+
+    def __init__(self):
+        self.tables = {table: ResultTable() for table in RESULT_TABLES}
+        self.settings = Config.DEFAULT_SETTINGS.copy()
+        self.lock = threading.Lock()
+        self.generation_counter = 0
+        # Identifies this store's generations to the materialized export files
+        self.store_id = uuid.uuid4().hex
+        self.exports = None
+
+    def generation(self):
+        """Return a counter that changes whenever stored entries change."""
+        return self.generation_counter
+
+    def exclusive(self):
+        """Hold the write lock, e.g. to rebuild files derived from the entries consistently."""
+        return self.lock
+
+    def get_settings(self):
+        """Return a copy of the current settings."""
+        return dict(self.settings)
+
+    def update_settings(self, updates):
+        """Update settings and return the new settings."""
+        with self.lock:
+            self.settings.update(updates)
+            return dict(self.settings)
+
+    def counts(self):
+        """Return the number of stored entries per table."""
+        return {table: len(rows) for table, rows in self.tables.items()}
+
+    def rows(self, table):
+        """Return all entries of a table in insertion order."""
+        return list(self.tables[table].rows)
+
+    def iter_rows(self, table):
+        """Iterate over a snapshot of a table's entries in insertion order."""
+        return (unpack_row(record) for record in list(self.tables[table].records))
+
+    def iter_value_batches(self, table, fields, batch_size=10000):
+        """
+        Iterate over a snapshot of a table's values in insertion order, in batches.
+        
+        Args:
+            table: Table name
+            fields: Columns to read
+            batch_size: Maximum number of rows per batch
+            
+        Yields:
+            Lists of value tuples in field order (None for missing columns)
+        """
+        records = list(self.tables[table].records)
+        for start in range(0, len(records), batch_size):
+            yield [tuple(record_value(record, field) for field in fields)
+                   for record in records[start:start + batch_size]]
+
+    def query_rows(self, table, offset=0, limit=50, sort=None, descending=False, filters=None):
+        """
+        Return one page of a table's entries.
+        
+        Args:
+            table: Table name
+            offset: Number of matching entries to skip
+            limit: Maximum number of entries to return
+            sort: Optional column from QUERY_COLUMNS to sort by (insertion order otherwise)
+            descending: Sort in descending order
+            filters: Optional dictionary of column to substring filters
+            
+        Returns:
+            Tuple of (entries, total number of matching entries)
+        """
+        records = list(self.tables[table].records)
+        if filters:
+            records = [record for record in records if matches_filters(record, filters)]
+        if sort:
+            records.sort(key=lambda record: str(record_value(record, sort) or ''), reverse=descending)
+        elif descending:
+            records.reverse()
+        return [unpack_row(record) for record in records[offset:offset + limit]], len(records)
+
+    def is_duplicate(self, table, entry, keys):
+        """Check if an entry matching the given keys is already stored."""
+        return self.tables[table].contains(entry, keys)
+
+    def find_near_duplicate(self, table, entry):
+        """Return a stored entry that is a near-duplicate of an entry, or None."""
+        if table not in NEAR_DUPLICATE_FIELDS:
+            return None
+        return self.tables[table].find_near_duplicate(entry, table)
+
+    def is_stored(self, table, entry, keys):
+        """Check if an entry is stored, exactly on the given keys or (when enabled) as a near-duplicate."""
+        if self.is_duplicate(table, entry, keys):
+            return True
+        return Config.NEAR_DUPLICATES_ENABLED and self.find_near_duplicate(table, entry) is not None
+
+    def add_results(self, results, dedup_keys):
+        """
+        Add new entries, skipping duplicates of stored entries.
+        
+        Args:
+            results: Dictionary mapping table names to lists of entries
+            dedup_keys: Dictionary mapping table names to the keys used for dedup
+            
+        Returns:
+            Dictionary mapping table names to the entries actually added
+        """
+        with self.lock:
+            added = {}
+            for table, entries in results.items():
+                keys = dedup_keys.get(table)
+                added[table] = [entry for entry in entries
+                                if not self.is_stored(table, entry, keys)]
+            for table, entries in added.items():
+                self.tables[table].extend(entries)
+            if any(added.values()):
+                self.generation_counter += 1
+                if self.exports is not None:
+                    self.exports.append(self.store_id, self.generation_counter - 1, self.generation_counter,
+                                        added, self.settings)
+            return added
+
+    def remove_last(self):
+        """Remove the last entry from each table."""
+        with self.lock:
+            removed = [name for name, table in self.tables.items() if table]
+            for name in removed:
+                self.tables[name].pop()
+            self.generation_counter += 1
+            if self.exports is not None:
+                self.exports.remove_last(self.store_id, self.generation_counter - 1, self.generation_counter,
+                                         removed)
+
+    def clear(self):
+        """Remove all entries."""
+        with self.lock:
+            for table in self.tables.values():
+                table.clear()
+            self.generation_counter += 1
+            if self.exports is not None:
+                self.exports.clear(self.store_id, self.generation_counter, self.settings)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_table ON results (table_name, id);
+CREATE TABLE IF NOT EXISTS result_keys (
+    result_id INTEGER NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+    table_name TEXT NOT NULL,
+    key_name TEXT NOT NULL,
+    key_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_result_keys_lookup ON result_keys (table_name, key_name, key_hash);
+CREATE INDEX IF NOT EXISTS idx_result_keys_result ON result_keys (result_id);
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (name, value) VALUES ('generation', 0);
+"""
+
+# Random identity of a database, so files derived from it never match a recreated one
+INSERT_STORE_ID = "INSERT OR IGNORE INTO store_meta (name, value) VALUES ('store_id', ?)"
+
+def column_expression(column):
+    """SQL expression reading a column from an entry's JSON data."""
+    return f"json_extract(data, '$.\"{column}\"')"
+
+# Expression indexes so sorting on the dedup key columns does not scan every entry
+SQLITE_SCHEMA += ''.join(
+    f"CREATE INDEX IF NOT EXISTS idx_results_{column.lower().replace(' ', '_')} "
+    f"ON results (table_name, {column_expression(column)});\n"
+    for column in dict.fromkeys(column for columns in QUERY_COLUMNS.values() for column in columns)
+)
+
+BUMP_GENERATION = "UPDATE store_meta SET value = value + 1 WHERE name = 'generation'"
+
+# Key index name under which an entry's near-duplicate blocking keys are stored
+NEAR_KEY_NAME = 'near'
+
+class SQLiteResultStore:
+    """
+    Durable result store in an embedded SQLite database.
+
+    The database runs in WAL mode so any number of worker processes and
+    threads can read while one writes. Dedup keys are hashed into an indexed
+    side table, and each confirm is written in a single transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self.get_connection()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.execute(INSERT_STORE_ID, (secrets.randbits(62),))
+        self.store_id = str(conn.execute("SELECT value FROM store_meta WHERE name = 'store_id'").fetchone()[0])
+        self.exports = None
+        self.index_near_keys()
+
+    def get_connection(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def key_name(keys):
+        """Name a key combination for the key index."""
+        return '*' if keys is None else '|'.join(keys)
+
+    @staticmethod
+    def key_hash(entry, keys):
+        """Hash the values an entry has for a key combination."""
+        values = entry if keys is None else [entry.get(key) for key in keys]
+        return hashlib.sha256(json.dumps(values).encode('utf-8')).hexdigest()
+
+    def near_key_rows(self, result_id, table, entry):
+        """Rows of the key index holding an entry's near-duplicate blocking keys."""
+        if table not in NEAR_DUPLICATE_FIELDS:
+            return []
+        return [(result_id, table, NEAR_KEY_NAME, self.key_hash(key, None))
+                for key in blocking_keys(make_signature(table, entry))]
+
+    def index_near_keys(self):
+        """Add blocking keys for entries stored before near-duplicate detection existed (runs once)."""
+        conn = self.get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM store_meta WHERE name = 'near_keys'").fetchone():
+                return
+            tables = list(NEAR_DUPLICATE_FIELDS)
+            cursor = conn.execute(
+                f"SELECT id, table_name, data FROM results WHERE table_name IN ({', '.join('?' * len(tables))})",
+                tables
+            )
+            rows = [key_row for result_id, table, data in cursor.fetchall()
+                    for key_row in self.near_key_rows(result_id, table, json.loads(data))]
+            conn.executemany(
+                "INSERT INTO result_keys (result_id, table_name, key_name, key_hash) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("INSERT INTO store_meta (name, value) VALUES ('near_keys', 1)")
+
+    def get_settings(self):
+        """Return the current settings, filling in defaults."""
+        settings = Config.DEFAULT_SETTINGS.copy()
+        rows = self.get_connection().execute("SELECT name, value FROM settings").fetchall()
+        settings.update({name: json.loads(value) for name, value in rows})
+        return settings
+
+    def update_settings(self, updates):
+        """Update settings and return the new settings."""
+        conn = self.get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value)) for name, value in updates.items()]
+            )
+        return self.get_settings()
+
+    def counts(self):
+        """Return the number of stored entries per table."""
+        counts = dict.fromkeys(RESULT_TABLES, 0)
+        counts.update(self.get_connection().execute(
+            "SELECT table_name, COUNT(*) FROM results GROUP BY table_name").fetchall())
+        return counts
+
+    def rows(self, table):
+        """Return all entries of a table in insertion order."""
+        cursor = self.get_connection().execute(
+            "SELECT data FROM results WHERE table_name = ? ORDER BY id", (table,))
+        return [json.loads(data) for (data,) in cursor]
+
+    def iter_rows(self, table):
+        """Iterate over a table's entries in insertion order without loading them all."""
+        cursor = self.get_connection().execute(
+            "SELECT data FROM results WHERE table_name = ? ORDER BY id", (table,))
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def iter_value_batches(self, table, fields, batch_size=10000):
+        """
+        Iterate over a table's values in insertion order, in batches read straight from SQLite.
+        
+        Args:
+            table: Table name
+            fields: Columns to read
+            batch_size: Maximum number of rows per batch
+            
+        Yields:
+            Lists of value tuples in field order (None for missing columns)
+        """
+        cursor = self.get_connection().execute(
+            f"SELECT {', '.join(column_expression(field) for field in fields)} "
+            "FROM results WHERE table_name = ? ORDER BY id", (table,))
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the database write lock, e.g. to rebuild files derived from the entries consistently."""
+        conn = self.get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield
+
+    def generation(self):
+        """Return a counter that changes whenever stored entries change."""
+        row = self.get_connection().execute(
+            "SELECT value FROM store_meta WHERE name = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def query_rows(self, table, offset=0, limit=50, sort=None, descending=False, filters=None):
+        """
+        Return one page of a table's entries.
+        
+        Args:
+            table: Table name
+            offset: Number of matching entries to skip
+            limit: Maximum number of entries to return
+            sort: Optional column from QUERY_COLUMNS to sort by (insertion order otherwise)
+            descending: Sort in descending order
+            filters: Optional dictionary of column to substring filters
+            
+        Returns:
+            Tuple of (entries, total number of matching entries)
+        """
+        columns = QUERY_COLUMNS.get(table, [])
+        where = "table_name = ?"
+        params = [table]
+        for column, value in (filters or {}).items():
+            if column not in columns:
+                raise ValueError(f"Cannot filter {table} on {column}")
+            escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where += f" AND {column_expression(column)} LIKE ? ESCAPE '\\'"
+            params.append(f"%{escaped}%")
+        
+        direction = 'DESC' if descending else 'ASC'
+        if sort:
+            if sort not in columns:
+                raise ValueError(f"Cannot sort {table} on {sort}")
+            order = f"{column_expression(sort)} {direction}, id"
+        else:
+            order = f"id {direction}"
+        
+        conn = self.get_connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM results WHERE {where}", params).fetchone()[0]
+        cursor = conn.execute(
+            f"SELECT data FROM results WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return [json.loads(data) for (data,) in cursor], total
+
+    def is_duplicate(self, table, entry, keys, conn=None):
+        """Check if an entry matching the given keys is already stored."""
+        conn = conn or self.get_connection()
+        if keys not in DEDUP_KEYS.get(table, []):
+            # Key combinations without an index fall back to comparing every entry
+            return any(ResultTable.make_key(row, keys) == ResultTable.make_key(entry, keys)
+                       for row in self.rows(table))
+        
+        row = conn.execute(
+            "SELECT 1 FROM result_keys WHERE table_name = ? AND key_name = ? AND key_hash = ? LIMIT 1",
+            (table, self.key_name(keys), self.key_hash(entry, keys))
+        ).fetchone()
+        return row is not None
+
+    def find_near_duplicate(self, table, entry, conn=None):
+        """Return a stored entry that is a near-duplicate of an entry, or None."""
+        if table not in NEAR_DUPLICATE_FIELDS:
+            return None
+        conn = conn or self.get_connection()
+        signature = make_signature(table, entry)
+        keys = [self.key_hash(key, None) for key in blocking_keys(signature)]
+        if not keys:
+            return None
+        
+        # Blocks too common to narrow the search are skipped, as NearDuplicateIndex does
+        keys = [key for key in keys if conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM result_keys "
+            "WHERE table_name = ? AND key_name = ? AND key_hash = ? LIMIT ?)",
+            (table, NEAR_KEY_NAME, key, MAX_BLOCK_SIZE + 1)
+        ).fetchone()[0] <= MAX_BLOCK_SIZE]
+        if not keys:
+            return None
+        
+        # Only entries sharing a block are read and scored
+        cursor = conn.execute(
+            "SELECT DISTINCT results.id, results.data FROM result_keys "
+            "JOIN results ON results.id = result_keys.result_id "
+            f"WHERE result_keys.table_name = ? AND result_keys.key_name = ? "
+            f"AND result_keys.key_hash IN ({', '.join('?' * len(keys))})",
+            [table, NEAR_KEY_NAME] + keys
+        )
+        entries = {result_id: json.loads(data) for result_id, data in cursor}
+        match = best_match(table, signature,
+                           ((result_id, make_signature(table, stored)) for result_id, stored in entries.items()))
+        return entries[match[0]] if match else None
+
+    def is_stored(self, table, entry, keys, conn=None):
+        """Check if an entry is stored, exactly on the given keys or (when enabled) as a near-duplicate."""
+        if self.is_duplicate(table, entry, keys, conn):
+            return True
+        return Config.NEAR_DUPLICATES_ENABLED and self.find_near_duplicate(table, entry, conn) is not None
+
+    def add_results(self, results, dedup_keys):
+        """
+        Add new entries in one transaction, skipping duplicates of stored entries.
+        
+        Args:
+            results: Dictionary mapping table names to lists of entries
+            dedup_keys: Dictionary mapping table names to the keys used for dedup
+            
+        Returns:
+            Dictionary mapping table names to the entries actually added
+        """
+        conn = self.get_connection()
+        added = {}
+        # BEGIN IMMEDIATE takes the write lock up front so the dedup checks
+        # and inserts cannot interleave with another worker's confirm
+        conn.execute("BEGIN IMMEDIATE")
+        exported = False
+        try:
+            for table, entries in results.items():
+                keys = dedup_keys.get(table)
+                added[table] = [entry for entry in entries
+                                if not self.is_stored(table, entry, keys, conn)]
+            
+            for table, entries in added.items():
+                for entry in entries:
+                    cursor = conn.execute(
+                        "INSERT INTO results (table_name, data) VALUES (?, ?)",
+                        (table, json.dumps(entry))
+                    )
+                    conn.executemany(
+                        "INSERT INTO result_keys (result_id, table_name, key_name, key_hash) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(cursor.lastrowid, table, self.key_name(index_keys), self.key_hash(entry, index_keys))
+                         for index_keys in DEDUP_KEYS[table]]
+                        + self.near_key_rows(cursor.lastrowid, table, entry)
+                    )
+            if any(added.values()):
+                conn.execute(BUMP_GENERATION)
+                if self.exports is not None:
+                    # Files are appended under the write lock, so workers update them in commit order
+                    after = self.generation()
+                    exported = True
+                    self.exports.append(self.store_id, after - 1, after, added, self.get_settings())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if exported:
+                self.exports.invalidate()
+            raise
+        return added
+
+    def remove_last(self):
+        """Remove the last entry from each table."""
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        exported = False
+        try:
+            removed = [table for (table,) in conn.execute("SELECT DISTINCT table_name FROM results")]
+            conn.execute(
+                "DELETE FROM results WHERE id IN "
+                "(SELECT MAX(id) FROM results GROUP BY table_name)"
+            )
+            conn.execute(BUMP_GENERATION)
+            if self.exports is not None:
+                after = self.generation()
+                exported = True
+                self.exports.remove_last(self.store_id, after - 1, after, removed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if exported:
+                self.exports.invalidate()
+            raise
+
+    def clear(self):
+        """Remove all entries."""
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        exported = False
+        try:
+            conn.execute("DELETE FROM result_keys")
+            conn.execute("DELETE FROM results")
+            conn.execute(BUMP_GENERATION)
+            if self.exports is not None:
+                exported = True
+                self.exports.clear(self.store_id, self.generation(), self.get_settings())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if exported:
+                self.exports.invalidate()
+            raise
+
+RESULT_STORE_BACKENDS = {
+    'memory': lambda: MemoryResultStore(),
+    'sqlite': lambda: SQLiteResultStore(Config.RESULT_STORE_PATH)
+}
+
+def create_result_store(backend=None):
+    """Create the result store selected by Config.RESULT_STORE."""
+    backend = backend or Config.RESULT_STORE
+    if backend not in RESULT_STORE_BACKENDS:
+        logger.warning(f"Unknown result store '{backend}', using sqlite")
+        backend = 'sqlite'
+    store = RESULT_STORE_BACKENDS[backend]()
+    if Config.MATERIALIZED_EXPORTS_ENABLED:
+        directory = Config.MATERIALIZED_EXPORT_DIR
+        if backend == 'memory':
+            # Each process holds its own entries, and files only it may write
+            directory = memory_directory(directory)
+        store.exports = MaterializedExport(directory)
+    return store
@@ -0,0 +1,288 @@
+from bisect import bisect_right
+from bs4 import NavigableString, Tag
+from bs4.element import CData, Comment, Declaration, Doctype, ProcessingInstruction
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FOUNDER_INDICATORS = ['Founders', 'Founded by', 'Founder']
+TILE_FOUNDER_INDICATORS = ['Founders', 'Founded by']
+WEBSITE_EXTENSIONS = ['.com', '.org', '.net', '.io']
+
+# Selectors behind each candidate tier, in priority order, followed by the fallback scan
+COMPANY_NAME_PATHS = ['.entity-name', 'span.entity-name', '.profile-v3-header .entity-name',
+                      '.top-row .entity-name', 'profile-v3-header']
+WEBSITE_PATHS = ["a[href^='http'][title*='.com']", "link-formatter a[target='_blank']",
+                 "field-formatter a[href^='http']", 'a[href]']
+DESCRIPTION_PATHS = ['.expanded-only-content:not(.chips-container)', 'profile-v3-header span.expanded-only-content',
+                     'tile-description span.description', '.overview-row span:not([class])', 'p']
+FOUNDER_PATHS = ['founder label', 'tile-field span', 'identifier-multi-formatter']
+
+# Paths that scan the whole document rather than match a targeted selector
+FALLBACK_PATHS = {COMPANY_NAME_PATHS[-1], WEBSITE_PATHS[-1], DESCRIPTION_PATHS[-1]}
+
+# Strings that CSS :contains() ignores when matching element text
+SPECIAL_STRINGS = (Comment, Declaration, CData, ProcessingInstruction, Doctype)
+
+def get_classes(tag):
+    """Return the class list of a tag."""
+    classes = tag.get('class')
+    if not classes:
+        return ()
+    if isinstance(classes, str):
+        return classes.split()
+    return classes
+
+def has_website_extension(text):
+    """Check whether text contains a known website domain extension."""
+    return any(ext in text for ext in WEBSITE_EXTENSIONS)
+
+def content_text(tag):
+    """Return the text of a tag the way CSS :contains() sees it."""
+    return ''.join(
+        node for node in tag.descendants
+        if isinstance(node, NavigableString) and not isinstance(node, SPECIAL_STRINGS)
+    )
+
+def link_texts(links):
+    """Return the stripped, non-empty texts of a list of links."""
+    return [link.text.strip() for link in links if link.text.strip()]
+
+class DocumentScan:
+    """
+    Field candidates collected from a single traversal of a parsed page.
+
+    Each extractor selector is tracked as a tier that keeps only the
+    information the original cascade needed (usually its first match), so
+    resolving a field preserves the original fallback priority without
+    walking the document again.
+    """
+
+    def __init__(self):
+        # Path that resolved each field, e.g. {'website': "link-formatter a[target='_blank']"}
+        self.paths = {}
+        # Which paths had a candidate for each resolved field, in path order
+        self.available = {}
+
+        # Company name: first match of each selector, then the header fallback
+        self.name_tiers = [None, None, None, None]
+        self.header = None
+        self.header_entity = None
+
+        # Website: first match with a domain-like text per selector, then href fallback
+        self.website_tiers = [None, None, None]
+        self.website_href = None
+
+        # Description: first match of each selector, then all paragraphs
+        self.description_tiers = [None, None, None, None]
+        self.paragraphs = []
+
+        # Founders: label spans per indicator, field-formatters by position,
+        # spans inside tile-fields and identifier-multi-formatters with their tile
+        self.founder_labels = {indicator: [] for indicator in FOUNDER_INDICATORS}
+        self.field_formatter_positions = []
+        self.field_formatters = []
+        self.tile_spans = []
+        self.multi_formatters = []
+
+    def resolve(self, field, paths, candidates):
+        """
+        Pick the first available candidate of a field and record the path that produced it.
+
+        Args:
+            field: Field name used in self.paths and self.available
+            paths: Selector paths of the field, fallback last
+            candidates: Value found by each path in priority order, or None where the path matched nothing
+
+        Returns:
+            The resolved value, or None if no candidate matched
+        """
+        self.available[field] = [candidate is not None for candidate in candidates]
+        for path, candidate in zip(paths, candidates):
+            if candidate is not None:
+                self.paths[field] = path
+                return candidate
+        return None
+
+    def company_name(self):
+        """Resolve the company name, or None if no candidate matched."""
+        candidates = [element.text.strip() or None if element is not None else None
+                      for element in self.name_tiers]
+        if self.header is not None and self.header_entity is not None:
+            candidates.append(self.header_entity.text.strip())
+        else:
+            candidates.append(None)
+        return self.resolve('company_name', COMPANY_NAME_PATHS, candidates)
+
+    def website(self):
+        """Resolve the website, or None if no candidate matched."""
+        candidates = [element.text.strip() if element is not None else None
+                      for element in self.website_tiers]
+        candidates.append(self.website_href)
+        return self.resolve('website', WEBSITE_PATHS, candidates)
+
+    def description(self):
+        """Resolve the description, or None if no candidate matched."""
+        candidates = [element.text.strip() or None if element is not None else None
+                      for element in self.description_tiers]
+        candidates.append(next((p.text.strip() for p in self.paragraphs if len(p.text.strip()) > 50), None))
+        return self.resolve('description', DESCRIPTION_PATHS, candidates)
+
+    def founders(self):
+        """Resolve the founder names, or None if no candidate matched."""
+        # Labels followed by a field-formatter holding profile links
+        for indicator in FOUNDER_INDICATORS:
+            for span_position in self.founder_labels[indicator]:
+                index = bisect_right(self.field_formatter_positions, span_position)
+                if index < len(self.field_formatters):
+                    founder_links = self.field_formatters[index].find_all('a')
+                    if founder_links:
+                        self.paths['founders'] = FOUNDER_PATHS[0]
+                        return link_texts(founder_links)
+
+        # Spans inside tile-fields that mention founders
+        for span, tile in self.tile_spans:
+            text = content_text(span)
+            if any(indicator in text for indicator in TILE_FOUNDER_INDICATORS):
+                links = tile.find_all('a')
+                if links:
+                    self.paths['founders'] = FOUNDER_PATHS[1]
+                    return link_texts(links)
+
+        # identifier-multi-formatters inside a founders tile-field
+        for formatter, tile in self.multi_formatters:
+            if tile is not None and any(ind in tile.text for ind in FOUNDER_INDICATORS):
+                links = formatter.find_all('a')
+                if links:
+                    self.paths['founders'] = FOUNDER_PATHS[2]
+                    return link_texts(links)
+        return None
+
+def scan_document(soup):
+    """
+    Walk the parsed document once and collect candidates for every field.
+
+    Args:
+        soup: BeautifulSoup object
+
+    Returns:
+        DocumentScan holding the candidates in document order
+    """
+    scan = DocumentScan()
+
+    # Number of currently open ancestors matching each context
+    context = {
+        'profile-v3-header': 0,    # <profile-v3-header> tags
+        '.profile-v3-header': 0,   # elements with class profile-v3-header
+        '.top-row': 0,
+        'link-formatter': 0,
+        'field-formatter': 0,
+        'tile-description': 0,
+        '.overview-row': 0,
+        'first-header': 0          # inside the first <profile-v3-header>
+    }
+    tile_fields = []
+    position = 0
+
+    # Each entry holds an open tag, its child iterator, the contexts it opened and its position
+    stack = [(soup, iter(soup.contents), (), 0)]
+    while stack:
+        parent, children, _, parent_position = stack[-1]
+        node = next(children, None)
+        if node is None:
+            tag, _, opened, _ = stack.pop()
+            for key in opened:
+                context[key] -= 1
+            if tag.name == 'tile-field':
+                tile_fields.pop()
+            continue
+
+        if not isinstance(node, Tag):
+            if parent.name == 'span' and isinstance(node, NavigableString):
+                for indicator in FOUNDER_INDICATORS:
+                    if indicator in node:
+                        scan.founder_labels[indicator].append(parent_position)
+            continue
+
+        position += 1
+        name = node.name
+        classes = get_classes(node)
+
+        # Company name candidates
+        if 'entity-name' in classes:
+            tiers = scan.name_tiers
+            if tiers[0] is None:
+                tiers[0] = node
+            if tiers[1] is None and name == 'span':
+                tiers[1] = node
+            if tiers[2] is None and context['.profile-v3-header']:
+                tiers[2] = node
+            if tiers[3] is None and context['.top-row']:
+                tiers[3] = node
+            if scan.header_entity is None and context['first-header']:
+                scan.header_entity = node
+
+        # Website candidates
+        if name == 'a':
+            href = node.get('href')
+            is_http = isinstance(href, str) and href.startswith('http')
+            tiers = scan.website_tiers
+            matches = (
+                is_http and '.com' in (node.get('title') or ''),
+                context['link-formatter'] and node.get('target') == '_blank',
+                is_http and context['field-formatter']
+            )
+            for tier, matched in enumerate(matches):
+                if matched and tiers[tier] is None and has_website_extension(node.text.strip()):
+                    tiers[tier] = node
+            if (scan.website_href is None and href is not None
+                    and has_website_extension(href) and 'crunchbase.com' not in href):
+                scan.website_href = href
+
+        # Description candidates
+        tiers = scan.description_tiers
+        if 'expanded-only-content' in classes:
+            if tiers[0] is None and 'chips-container' not in classes:
+                tiers[0] = node
+            if tiers[1] is None and name == 'span' and context['profile-v3-header']:
+                tiers[1] = node
+        if name == 'span':
+            if tiers[2] is None and 'description' in classes and context['tile-description']:
+                tiers[2] = node
+            if tiers[3] is None and 'class' not in node.attrs and context['.overview-row']:
+                tiers[3] = node
+        elif name == 'p':
+            scan.paragraphs.append(node)
+
+        # Founder candidates
+        tile = tile_fields[-1] if tile_fields else None
+        if name == 'field-formatter':
+            scan.field_formatter_positions.append(position)
+            scan.field_formatters.append(node)
+        elif name == 'identifier-multi-formatter':
+            scan.multi_formatters.append((node, tile))
+        elif name == 'span' and tile is not None:
+            scan.tile_spans.append((node, tile))
+
+        # Open contexts for the descendants of this tag
+        opened = []
+        if name == 'profile-v3-header':
+            opened.append('profile-v3-header')
+            if scan.header is None:
+                scan.header = node
+                opened.append('first-header')
+        elif name in ('link-formatter', 'field-formatter', 'tile-description'):
+            opened.append(name)
+        elif name == 'tile-field':
+            tile_fields.append(node)
+        for class_name in ('profile-v3-header', 'top-row', 'overview-row'):
+            if class_name in classes:
+                opened.append('.' + class_name)
+        for key in opened:
+            context[key] += 1
+
+        stack.append((node, iter(node.contents), opened, position))
+
+    return scan
@@ -0,0 +1,195 @@
+from multiprocessing import util
+import os
+import sqlite3
+import threading
+import logging
+from app.config import Config
+from app.services import metrics
+from app.services.scanner import COMPANY_NAME_PATHS, WEBSITE_PATHS, DESCRIPTION_PATHS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fields whose selector cascade is tracked; each path list ends with its fallback scan.
+# Fields are always resolved in this fixed priority; the counts are only reported.
+TRACKED_PATHS = {
+    'company_name': COMPANY_NAME_PATHS,
+    'website': WEBSITE_PATHS,
+    'description': DESCRIPTION_PATHS
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS selector_stats (
+    field TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (field, selector)
+);
+"""
+
+# One connection per thread and process; SQLite handles cross-process locking
+_local = threading.local()
+
+# Counts not yet written to disk, keyed by (field, selector), as [hits, misses, wins]
+_pending = {}
+_pending_pages = 0
+_alerted = set()
+_lock = threading.Lock()
+
+def get_connection():
+    """Return this thread's stats connection, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(os.path.dirname(Config.SELECTOR_STATS_PATH), exist_ok=True)
+        conn = sqlite3.connect(Config.SELECTOR_STATS_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def load_stats():
+    """Read the persisted counts as {field: {selector: (hits, misses, wins)}}."""
+    stats = {field: {} for field in TRACKED_PATHS}
+    rows = get_connection().execute("SELECT field, selector, hits, misses, wins FROM selector_stats").fetchall()
+    for field, selector, hits, misses, wins in rows:
+        if field in stats:
+            stats[field][selector] = (hits, misses, wins)
+    return stats
+
+def rank_selectors(field, field_stats):
+    """
+    Rank the targeted selectors of a field by how often they found a candidate, for reporting.
+
+    Args:
+        field: Field name
+        field_stats: Dictionary of selector to (hits, misses, wins)
+
+    Returns:
+        List of selector tier indices, or None while there are too few samples
+    """
+    paths = TRACKED_PATHS[field]
+    hits, misses, _ = field_stats.get(paths[0], (0, 0, 0))
+    if hits + misses < Config.SELECTOR_MIN_SAMPLES:
+        return None
+    # Ties keep the original priority
+    return sorted(range(len(paths) - 1), key=lambda tier: (-field_stats.get(paths[tier], (0, 0, 0))[0], tier))
+
+def fallback_share(field, field_stats):
+    """Return the share of resolved pages served by the field's fallback scan, and the sample size."""
+    wins = [field_stats.get(path, (0, 0, 0))[2] for path in TRACKED_PATHS[field]]
+    resolved = sum(wins)
+    return (wins[-1] / resolved if resolved else 0.0), resolved
+
+def check_fallbacks(stats):
+    """Warn once per field when its fallback scan starts resolving most pages."""
+    for field, field_stats in stats.items():
+        share, resolved = fallback_share(field, field_stats)
+        dominant = resolved >= Config.SELECTOR_MIN_SAMPLES and share >= Config.SELECTOR_FALLBACK_ALERT
+        if dominant and field not in _alerted:
+            _alerted.add(field)
+            metrics.increment('selector_fallback_alerts_total', field=field)
+            logger.warning(f"Fallback scan resolved {share:.0%} of {resolved} pages for {field}; "
+                           f"the targeted selectors may no longer match the page markup")
+        elif not dominant:
+            _alerted.discard(field)
+
+def record_field(field, available, path):
+    """
+    Count which selectors had a candidate for a field and which one resolved it.
+
+    Args:
+        field: Field name
+        available: Whether each of the field's paths had a candidate, in path order
+        path: Selector path that resolved the field, or None
+    """
+    global _pending_pages
+    if not Config.SELECTOR_STATS_ENABLED or field not in TRACKED_PATHS or available is None:
+        return
+
+    with _lock:
+        for selector, had_candidate in zip(TRACKED_PATHS[field], available):
+            counts = _pending.setdefault((field, selector), [0, 0, 0])
+            counts[0 if had_candidate else 1] += 1
+            if selector == path:
+                counts[2] += 1
+        if field == 'company_name':
+            _pending_pages += 1
+        flush = _pending_pages >= Config.SELECTOR_STATS_FLUSH
+
+    if flush:
+        flush_stats()
+
+def flush_stats():
+    """Write pending counts to disk and check whether fallback scans now dominate."""
+    global _pending_pages
+    with _lock:
+        pending = list(_pending.items())
+        _pending.clear()
+        _pending_pages = 0
+    if not pending:
+        return
+
+    try:
+        conn = get_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO selector_stats (field, selector, hits, misses, wins) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(field, selector) DO UPDATE SET hits = hits + excluded.hits, "
+                "misses = misses + excluded.misses, wins = wins + excluded.wins",
+                [(field, selector, hits, misses, wins) for (field, selector), (hits, misses, wins) in pending]
+            )
+        with _lock:
+            check_fallbacks(load_stats())
+    except Exception as e:
+        logger.error(f"Error saving selector stats: {str(e)}")
+
+def get_selector_stats():
+    """
+    Report per-selector counts, the hit ranking and fallback share of each field.
+
+    Returns:
+        Dictionary keyed by field name
+    """
+    flush_stats()
+    report = {}
+    for field, field_stats in load_stats().items():
+        paths = TRACKED_PATHS[field]
+        ranking = rank_selectors(field, field_stats)
+        share, resolved = fallback_share(field, field_stats)
+        report[field] = {
+            'selectors': [
+                dict(zip(('selector', 'hits', 'misses', 'wins'), (path,) + field_stats.get(path, (0, 0, 0))),
+                     fallback=tier == len(paths) - 1)
+                for tier, path in enumerate(paths)
+            ],
+            'ranking': [paths[tier] for tier in ranking] if ranking is not None else None,
+            'fallback_share': share,
+            'fallback_dominant': resolved >= Config.SELECTOR_MIN_SAMPLES and share >= Config.SELECTOR_FALLBACK_ALERT
+        }
+    return report
+
+def clear_stats():
+    """Forget all selector statistics."""
+    global _pending_pages
+    with _lock:
+        _pending.clear()
+        _pending_pages = 0
+        _alerted.clear()
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM selector_stats")
+
+def register_exit_flush(_=None):
+    """Flush pending counts when this process exits, including process pool workers (which skip atexit)."""
+    util.Finalize(None, flush_stats, exitpriority=0)
+
+register_exit_flush()
+# Forked workers drop the finalizers they inherit, so each registers its own
+util.register_after_fork(flush_stats, register_exit_flush)
@@ -257,7 +257,8 @@ function updateSettings() {
         industry_vertical: document.getElementById('industry_vertical').value,
         industry: document.getElementById('industry').value,
         sourcing_analyst: document.getElementById('sourcing_analyst').value,
-        investment_cycle: document.getElementById('investment_cycle').value
+        investment_cycle: document.getElementById('investment_cycle').value,
+        email_template: document.getElementById('email_template').value
     };
     
     // Get the button and store original content
@@ -332,13 +333,19 @@ function processFile() {
     const formData = new FormData();
     formData.append('file', file);
     
-    // Send API request
-    fetch('/api/process', {
+    // Queue the file for background processing, then poll until the job finishes
+    fetch('/api/jobs', {
         method: 'POST',
         body: formData
     })
     .then(response => response.json())
     .then(data => {
+        if (data.status !== 'success') {
+            throw new Error(data.message || 'Failed to process file.');
+        }
+        return pollJob(data.status_url);
+    })
+    .then(job => {
         // Restore button state BEFORE showing modal or handling response
         submitButton.innerHTML = originalButtonHtml;
         submitButton.disabled = false;
@@ -346,12 +353,13 @@ function processFile() {
         // Hide loading spinner
         toggleLoading(false);
         
-        if (data.status === 'success') {
+        const fileResult = job.files[0];
+        if (job.status === 'done' && fileResult && fileResult.result) {
             // Display results
-            showProcessedDataPreview(data);
+            showProcessedDataPreview({status: 'success', ...fileResult.result});
         } else {
             // Show error message
-            showError(data.message || 'Failed to process file.');
+            showError((fileResult && fileResult.error) || job.error || 'Failed to process file.');
         }
     })
     .catch(error => {
@@ -367,6 +375,32 @@ function processFile() {
     });
 }
 
+/**
+ * Poll a processing job until it is done, failed or cancelled, giving up after timeoutMs
+ */
+function pollJob(statusUrl, intervalMs = 1000, timeoutMs = 15 * 60 * 1000) {
+    const deadline = Date.now() + timeoutMs;
+    return new Promise((resolve, reject) => {
+        const check = () => {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.status !== 'success') {
+                        reject(new Error(data.message || 'Failed to get job status.'));
+                    } else if (['done', 'failed', 'cancelled'].includes(data.job.status)) {
+                        resolve(data.job);
+                    } else if (Date.now() >= deadline) {
+                        reject(new Error('Timed out waiting for the file to be processed.'));
+                    } else {
+                        setTimeout(check, intervalMs);
+                    }
+                })
+                .catch(reject);
+        };
+        check();
+    });
+}
+
 /**
  * Create a table to display data
  */
@@ -576,7 +610,8 @@ function showProcessedDataPreview(data) {
                 
                 // Update the working data based on field type
                 if (type === 'email_templates') {
-                    workingData[type][index] = this.value;
+                    // Edited text replaces the rendered template for this contact
+                    workingData[type][index].Text = this.value;
                 } else {
                     workingData[type][index][fieldName] = this.value;
                     
@@ -769,7 +804,7 @@ function displayDataPreview(data) {
                 <div class="card-header">Template #${index + 1}</div>
                 <div class="card-body">
                     <textarea class="form-control editable-field" data-type="email_templates" 
-                            data-index="${index}" rows="6">${template}</textarea>
+                            data-index="${index}" rows="6">${template.Preview}</textarea>
                 </div>
             </div>`;
         });
@@ -0,0 +1,139 @@
+import json
+import random
+
+FIRST_NAMES = ['Jane', 'Bob', 'Priya', 'Luis', 'Mei', 'Omar', 'Anna', 'Kwame', 'Sofia', 'Ivan']
+LAST_NAMES = ['Doe', 'Van Smith', 'Patel', 'Garcia', 'Chen', 'Haddad', 'Novak', 'Mensah', 'Rossi', 'Petrov']
+
+def generate_profile_html(size_kb=50, founders=2, missing=(), seed=0, app_state=False):
+    """
+    Generate a synthetic Crunchbase company profile page.
+    
+    Args:
+        size_kb: Approximate page size in kilobytes, padded with scripts, styles, SVG and cards
+        founders: Number of founders listed on the page
+        missing: Fields to leave out: 'name', 'website', 'description', 'founders'
+        seed: Random seed so pages are reproducible
+        app_state: Also embed the entity as serialized Angular transfer state, as saved pages do
+        
+    Returns:
+        HTML content as a string
+    """
+    rng = random.Random(seed)
+    company = f"Company {seed}"
+    domain = f"company{seed}.com"
+    
+    header = ['<profile-v3-header><div class="top-row">']
+    if 'name' not in missing:
+        header.append(f'<span class="entity-name">{company}</span>')
+    header.append('</div>')
+    if 'description' not in missing:
+        header.append(f'<span class="expanded-only-content">{company} builds software that helps '
+                      f'teams ship products faster and with fewer defects.</span>')
+    header.append('</profile-v3-header>')
+    
+    founder_names = [] if 'founders' in missing else [
+        f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}' for _ in range(founders)]
+    overview = ['<section class="overview-row">']
+    if 'website' not in missing:
+        overview.append(f'<link-formatter><a target="_blank" href="https://www.{domain}/">www.{domain}</a></link-formatter>')
+    if 'founders' not in missing and founders:
+        links = ', '.join(f'<a href="/person/p{i}">{name}</a>' for i, name in enumerate(founder_names))
+        overview.append(f'<tile-field><span class="label">Founders</span>'
+                        f'<field-formatter><identifier-multi-formatter>{links}</identifier-multi-formatter>'
+                        f'</field-formatter></tile-field>')
+    overview.append('</section>')
+    
+    if app_state:
+        properties = {'identifier': {'value': company, 'entity_def_id': 'organization'}}
+        if 'description' not in missing:
+            properties['short_description'] = (f'{company} builds software that helps '
+                                               f'teams ship products faster and with fewer defects.')
+        cards = {'company_about_fields2': {}}
+        if 'website' not in missing:
+            cards['company_about_fields2']['website'] = {'value': f'https://www.{domain}/'}
+        if 'founders' not in missing and founders:
+            cards['company_about_fields2']['founder_identifiers'] = [
+                {'value': name, 'entity_def_id': 'person'} for name in founder_names]
+        state = json.dumps({f'GET/v4/data/entities/organizations/company-{seed}': {
+            'data': {'properties': properties, 'cards': cards}}})
+        state = state.replace('&', '&a;').replace('"', '&q;').replace("'", '&s;').replace('<', '&l;').replace('>', '&g;')
+        overview.append(f'<script id="client-app-state" type="application/json">{state}</script>')
+    
+    body = ''.join(header + overview)
+    head = '<html><head><title>Crunchbase</title><style>.x{color:red}</style></head><body>'
+    tail = '</body></html>'
+    
+    # Pad the page with the kind of dead weight saved pages carry
+    padding = []
+    size = len(head) + len(body) + len(tail)
+    target = size_kb * 1024
+    index = 0
+    while size < target:
+        kind = index % 4
+        if kind == 0:
+            state = json.dumps({'key': index, 'values': [rng.random() for _ in range(20)]})
+            chunk = f'<script type="application/json">{state}</script>'
+        elif kind == 1:
+            chunk = f'<svg viewBox="0 0 24 24"><path d="M{index} 0L{index} 24Z"></path></svg>'
+        elif kind == 2:
+            chunk = (f'<div class="card"><a href="https://www.crunchbase.com/organization/other-{index}">'
+                     f'Other {index}</a><span class="label">Similar company</span></div>')
+        else:
+            chunk = f'<style>.c{index}{{margin:{index % 16}px}}</style>'
+        padding.append(chunk)
+        size += len(chunk)
+        index += 1
+    
+    return head + body + ''.join(padding) + tail
+
+def generate_list_html(rows=100, seed=0, app_state=False):
+    """
+    Generate a synthetic Crunchbase search results page.
+    
+    Args:
+        rows: Number of company rows in the results grid
+        seed: Random seed so pages are reproducible
+        app_state: Also embed the rows as serialized Angular transfer state
+        
+    Returns:
+        HTML content as a string
+    """
+    rng = random.Random(seed)
+    grid = ['<sheet-grid><grid-header><grid-row class="header">'
+            '<grid-column-header data-columnid="identifier">Organization Name</grid-column-header>'
+            '<grid-column-header data-columnid="short_description">Description</grid-column-header>'
+            '<grid-column-header data-columnid="website">Website</grid-column-header>'
+            '<grid-column-header data-columnid="founder_identifiers">Founders</grid-column-header>'
+            '</grid-row></grid-header><grid-body>']
+    entities = []
+    for index in range(rows):
+        company = f"Company {seed}-{index}"
+        domain = f"company{seed}-{index}.com"
+        description = f'{company} builds software for teams.'
+        # Every fifth row lists no founders
+        founder_names = [] if index % 5 == 4 else [
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}' for _ in range(1 + index % 3)]
+        founders = ', '.join(f'<a href="/person/p{index}-{i}">{name}</a>' for i, name in enumerate(founder_names))
+        grid.append(
+            f'<grid-row><grid-cell data-columnid="identifier"><identifier-formatter>'
+            f'<a href="/organization/company-{seed}-{index}"><div class="identifier-label">{company}</div></a>'
+            f'</identifier-formatter></grid-cell>'
+            f'<grid-cell data-columnid="short_description"><span class="field-type-text_long">{description}</span></grid-cell>'
+            f'<grid-cell data-columnid="website"><link-formatter><a target="_blank" href="https://www.{domain}/">'
+            f'www.{domain}</a></link-formatter></grid-cell>'
+            f'<grid-cell data-columnid="founder_identifiers"><identifier-multi-formatter>{founders}'
+            f'</identifier-multi-formatter></grid-cell></grid-row>')
+        entities.append({'properties': {
+            'identifier': {'value': company, 'entity_def_id': 'organization'},
+            'short_description': description,
+            'website': {'value': f'https://www.{domain}/'},
+            'founder_identifiers': [{'value': name, 'entity_def_id': 'person'} for name in founder_names]
+        }})
+    grid.append('</grid-body></sheet-grid>')
+    
+    if app_state:
+        state = json.dumps({'POST/v4/data/searches/organizations': {'count': rows, 'entities': entities}})
+        state = state.replace('&', '&a;').replace('"', '&q;').replace("'", '&s;').replace('<', '&l;').replace('>', '&g;')
+        grid.append(f'<script id="client-app-state" type="application/json">{state}</script>')
+    
+    return '<html><head><title>Crunchbase</title></head><body>' + ''.join(grid) + '</body></html>'
@@ -0,0 +1,71 @@
+"""
+Memory benchmark for accumulated result rows.
+
+Usage:
+    python -m benchmarks.memory
+    python -m benchmarks.memory --rows 100000 1000000
+
+Compares the bytes held by rows kept as plain dictionaries with the packed
+rows of a ResultTable. Rows are round-tripped through JSON, as they are when
+confirmed through the web app, so no strings are shared by accident.
+"""
+import argparse
+import json
+import sys
+
+from app.services.result_store import ResultTable, RowShape, unpack_row
+from benchmarks.run import make_pipeline_rows
+
+DEFAULT_ROW_COUNTS = [100000, 1000000]
+CHUNK_ROWS = 10000
+
+def deep_size(obj, seen):
+    """Return the bytes of an object and everything it references that was not seen yet."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, RowShape):
+        size += deep_size(obj.keys, seen) + deep_size(obj.positions, seen)
+    return size
+
+def iter_confirmed_rows(count):
+    """Yield synthetic pipeline rows decoded from JSON, in chunks to bound peak memory."""
+    for start in range(0, count, CHUNK_ROWS):
+        rows = make_pipeline_rows(min(CHUNK_ROWS, count - start))
+        yield from json.loads(json.dumps(rows))
+
+def measure(count):
+    """Measure the bytes per row of plain and packed storage."""
+    plain = list(iter_confirmed_rows(count))
+    plain_bytes = deep_size(plain, set())
+    del plain
+
+    table = ResultTable()
+    table.extend(iter_confirmed_rows(count))
+    packed_bytes = deep_size(table.records, set())
+
+    # Packed rows must rebuild the same dictionaries, in the same column order
+    sample = next(iter_confirmed_rows(1))
+    assert list(unpack_row(table.records[0]).items()) == list(sample.items())
+    return plain_bytes, packed_bytes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure memory held by accumulated result rows.')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROW_COUNTS, help='Row counts to measure')
+    args = parser.parse_args(argv)
+
+    for count in args.rows:
+        plain_bytes, packed_bytes = measure(count)
+        print(f"{count:>9} rows  dicts {plain_bytes / 2**20:9.1f} MiB ({plain_bytes / count:6.0f} B/row)  "
+              f"packed {packed_bytes / 2**20:9.1f} MiB ({packed_bytes / count:6.0f} B/row)  "
+              f"-{(1 - packed_bytes / plain_bytes) * 100:.0f}%")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
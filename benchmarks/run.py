@@ -0,0 +1,218 @@
+"""
+Micro-benchmarks for the extraction and export hot paths.
+
+Usage:
+    python -m benchmarks.run --output benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.config import Config
+from app.services import extractor
+from app.services.csv_generator import save_to_csv
+from app.services.exporter import PIPELINE_FIELDS, available_formats, generate_results_zip
+from app.services.parsers import PARSER_BACKENDS, parse_html
+from app.services.prefilter import prune_html
+from app.services.result_store import MemoryResultStore, ResultTable, PIPELINE_KEYS, is_duplicate_entry
+from app.services.scanner import scan_document
+from benchmarks.html_generator import generate_list_html, generate_profile_html
+
+DEFAULT_SIZES_KB = [50, 500, 5000]
+FULL_SIZES_KB = [50, 500, 5000, 20000]
+ROW_COUNTS = [1000, 10000, 100000]
+
+def time_call(func, repeat=5, number=1):
+    """Time a call, returning per-call min and median seconds over several repeats."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {'min': min(timings), 'median': statistics.median(timings), 'repeat': repeat, 'number': number}
+
+def make_pipeline_rows(count):
+    """Build synthetic pipeline rows."""
+    return [{
+        'Deal Name': f'Company {i}',
+        'Company Name': f'Company {i}',
+        'Contact Name': f'Founder {i}',
+        'Contact Email': f'founder{i}@company{i}.com',
+        'Sub-Pipeline': 'HV STEM',
+        'Description': f'Company {i} builds software that helps teams ship products faster.',
+        'Stage': '1. Source',
+        'Industry Vertical': 'Software',
+        'Investment Cycle': 'Fall 2025',
+        'Contact': 'Reached Out',
+        'Sourcing Analyst': 'Analyst'
+    } for i in range(count)]
+
+def available_backends():
+    """Return the parser backends whose packages are installed."""
+    backends = []
+    for name, builder in PARSER_BACKENDS.items():
+        try:
+            from bs4 import BeautifulSoup
+            BeautifulSoup('<p></p>', builder)
+            backends.append(name)
+        except Exception:
+            pass
+    return backends
+
+def bench_extraction(results, sizes_kb, repeat):
+    """Benchmark parsing, scanning and each extract_* function."""
+    for size_kb in sizes_kb:
+        for founders, missing in [(2, ()), (10, ()), (2, ('website', 'description'))]:
+            label = f"{size_kb}kb-f{founders}" + (f"-no-{'-'.join(missing)}" if missing else '')
+            html = generate_profile_html(size_kb=size_kb, founders=founders, missing=missing, seed=size_kb)
+            runs = repeat if size_kb < 5000 else 1
+            
+            results[f'prune_html[{label}]'] = time_call(lambda: prune_html(html), runs)
+            for backend in available_backends():
+                results[f'parse_html[{backend}][{label}]'] = time_call(lambda: parse_html(html, backend), runs)
+                results[f'parse_html_unfiltered[{backend}][{label}]'] = time_call(
+                    lambda: parse_html(html, backend, prefilter=False), runs)
+            
+            soup = parse_html(html)
+            results[f'scan_document[{label}]'] = time_call(lambda: scan_document(soup), runs)
+            for name in ['extract_company_name', 'extract_website', 'extract_description', 'extract_founders']:
+                func = getattr(extractor, name)
+                results[f'{name}[{label}]'] = time_call(lambda: func(soup), runs)
+            
+            results[f'process_html_file[{label}]'] = time_call(
+                lambda: extractor.process_html_file(html, Config.DEFAULT_SETTINGS), runs)
+
+def bench_app_state(results, repeat):
+    """Benchmark extract_page_fields on pages carrying serialized app state, with and without the fast path."""
+    for size_kb in DEFAULT_SIZES_KB:
+        html = generate_profile_html(size_kb=size_kb, founders=2, seed=size_kb, app_state=True)
+        runs = repeat if size_kb < 5000 else 1
+        for enabled in (True, False):
+            Config.APP_STATE_ENABLED = enabled
+            label = 'app_state' if enabled else 'dom'
+            results[f'extract_page_fields[{label}][{size_kb}kb]'] = time_call(
+                lambda: extractor.extract_page_fields(html), runs)
+    Config.APP_STATE_ENABLED = True
+
+def bench_list_pages(results, repeat):
+    """Benchmark process_html_file on search result pages, read from the grid and from app state."""
+    for rows in [50, 500]:
+        for state in (False, True):
+            html = generate_list_html(rows=rows, seed=rows, app_state=state)
+            label = 'app_state' if state else 'grid'
+            results[f'process_html_file[list-{label}][{rows}rows]'] = time_call(
+                lambda: extractor.process_html_file(html, Config.DEFAULT_SETTINGS), repeat)
+
+def bench_helpers(results, repeat):
+    """Benchmark parse_domain and split_name."""
+    results['parse_domain'] = time_call(lambda: extractor.parse_domain('https://www.example.com/about'), repeat, 10000)
+    results['split_name'] = time_call(lambda: extractor.split_name('Bob Van Smith'), repeat, 10000)
+
+def bench_dedup(results, repeat):
+    """Benchmark is_duplicate_entry against plain lists and indexed result tables."""
+    for count in ROW_COUNTS:
+        rows = make_pipeline_rows(count)
+        table = ResultTable()
+        table.extend(rows)
+        table.contains(rows[0], PIPELINE_KEYS)  # Build the index outside the timing
+        missing_row = make_pipeline_rows(count + 1)[-1]
+        
+        if count <= 10000:
+            results[f'is_duplicate_entry[list][{count}]'] = time_call(
+                lambda: is_duplicate_entry(missing_row, rows, PIPELINE_KEYS), repeat)
+        results[f'is_duplicate_entry[table][{count}]'] = time_call(
+            lambda: is_duplicate_entry(missing_row, table, PIPELINE_KEYS), repeat, 1000)
+
+def bench_export(results, repeat):
+    """Benchmark save_to_csv and the streamed zip download in each available format."""
+    for count in ROW_COUNTS:
+        rows = make_pipeline_rows(count)
+        runs = repeat if count < 100000 else 1
+        results[f'save_to_csv[{count}]'] = time_call(lambda: save_to_csv(rows, PIPELINE_FIELDS), runs)
+        
+        store = MemoryResultStore()
+        store.add_results({'pipelines': rows, 'contacts': rows}, {'pipelines': PIPELINE_KEYS, 'contacts': PIPELINE_KEYS})
+        results[f'download_zip[{count}]'] = time_call(
+            lambda: sum(len(chunk) for chunk in generate_results_zip(store)), runs)
+        for export_format in available_formats():
+            if export_format != 'csv':
+                results[f'download_zip[{export_format}][{count}]'] = time_call(
+                    lambda: sum(len(chunk) for chunk in generate_results_zip(store, export_format=export_format)), runs)
+
+def compare(results, baseline_path, threshold):
+    """Print timings against a baseline file and return the regressed benchmark names."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    
+    regressions = []
+    for name, timing in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = timing['min'] / baseline[name]['min'] if baseline[name]['min'] else 1.0
+        flag = ''
+        if ratio > threshold:
+            flag = '  <-- REGRESSION'
+            regressions.append(name)
+        print(f"{name:70s} {baseline[name]['min'] * 1000:10.3f}ms -> {timing['min'] * 1000:10.3f}ms  x{ratio:.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run extraction and export micro-benchmarks.')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Compare results against this baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Slowdown ratio reported as a regression')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repeats per benchmark')
+    parser.add_argument('--full', action='store_true', help='Include 20 MB pages')
+    parser.add_argument('--only', help='Only run groups: extraction,app_state,list,helpers,dedup,export')
+    args = parser.parse_args(argv)
+    
+    # Keep timings free of cache hits and log output
+    Config.PARSE_CACHE_ENABLED = False
+    Config.APOLLO_CACHE_ENABLED = False
+    Config.SELECTOR_STATS_ENABLED = False
+    logging.disable(logging.CRITICAL)
+    
+    groups = args.only.split(',') if args.only else ['extraction', 'app_state', 'list', 'helpers', 'dedup', 'export']
+    results = {}
+    if 'extraction' in groups:
+        bench_extraction(results, FULL_SIZES_KB if args.full else DEFAULT_SIZES_KB, args.repeat)
+    if 'app_state' in groups:
+        bench_app_state(results, args.repeat)
+    if 'list' in groups:
+        bench_list_pages(results, args.repeat)
+    if 'helpers' in groups:
+        bench_helpers(results, args.repeat)
+    if 'dedup' in groups:
+        bench_dedup(results, args.repeat)
+    if 'export' in groups:
+        bench_export(results, args.repeat)
+    
+    regressions = []
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+    else:
+        for name, timing in sorted(results.items()):
+            print(f"{name:70s} {timing['min'] * 1000:10.3f}ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'python': platform.python_version(),
+                    'platform': platform.platform()
+                },
+                'results': results
+            }, f, indent=2, sort_keys=True)
+    
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Saved Crunchbase pages used by the tests, built from explicit values so expected fields are known."""
+import json
+
+def padding(count):
+    """Dead weight saved pages carry: JSON scripts, SVG icons, cards of other companies and styles."""
+    chunks = []
+    for index in range(count):
+        kind = index % 4
+        if kind == 0:
+            chunks.append(f'<script type="application/json">{json.dumps({"key": index})}</script>')
+        elif kind == 1:
+            chunks.append(f'<svg viewBox="0 0 24 24"><path d="M{index} 0L{index} 24Z"></path></svg>')
+        elif kind == 2:
+            chunks.append(f'<div class="card"><a href="https://www.crunchbase.com/organization/other-{index}">'
+                          f'Other {index}</a><span class="label">Similar company</span></div>')
+        else:
+            chunks.append(f'<style>.c{index}{{margin:{index % 16}px}}</style>')
+    return ''.join(chunks)
+
+def profile_page(company, domain, description, founders, missing=()):
+    """
+    Build a company profile page.
+
+    Args:
+        company: Company name shown in the profile header
+        domain: Domain of the company website
+        description: Short description shown in the header
+        founders: Founder names listed in the overview
+        missing: Fields to leave out: 'name', 'website', 'description', 'founders'
+    """
+    header = ['<profile-v3-header><div class="top-row">']
+    if 'name' not in missing:
+        header.append(f'<span class="entity-name">{company}</span>')
+    header.append('</div>')
+    if 'description' not in missing:
+        header.append(f'<span class="expanded-only-content">{description}</span>')
+    header.append('</profile-v3-header>')
+
+    overview = ['<section class="overview-row">']
+    if 'website' not in missing:
+        overview.append(f'<link-formatter><a target="_blank" href="https://www.{domain}/">www.{domain}</a>'
+                        '</link-formatter>')
+    if 'founders' not in missing and founders:
+        links = ', '.join(f'<a href="/person/p{i}">{name}</a>' for i, name in enumerate(founders))
+        overview.append('<tile-field><span class="label">Founders</span><field-formatter>'
+                        f'<identifier-multi-formatter>{links}</identifier-multi-formatter></field-formatter></tile-field>')
+    overview.append('</section>')
+
+    return ('<html><head><title>Crunchbase</title><style>.x{color:red}</style></head><body>'
+            + ''.join(header + overview) + padding(40) + '</body></html>')
+
+def list_page(companies):
+    """
+    Build a search results page.
+
+    Args:
+        companies: List of (company, domain, description, founders) tuples, one grid row each
+    """
+    grid = ['<sheet-grid><grid-header><grid-row class="header">'
+            '<grid-column-header data-columnid="identifier">Organization Name</grid-column-header>'
+            '<grid-column-header data-columnid="short_description">Description</grid-column-header>'
+            '<grid-column-header data-columnid="website">Website</grid-column-header>'
+            '<grid-column-header data-columnid="founder_identifiers">Founders</grid-column-header>'
+            '</grid-row></grid-header><grid-body>']
+    for index, (company, domain, description, founders) in enumerate(companies):
+        links = ', '.join(f'<a href="/person/p{index}-{i}">{name}</a>' for i, name in enumerate(founders))
+        grid.append(
+            f'<grid-row><grid-cell data-columnid="identifier"><identifier-formatter>'
+            f'<a href="/organization/c{index}"><div class="identifier-label">{company}</div></a>'
+            f'</identifier-formatter></grid-cell>'
+            f'<grid-cell data-columnid="short_description"><span class="field-type-text_long">{description}</span>'
+            f'</grid-cell><grid-cell data-columnid="website"><link-formatter><a target="_blank" '
+            f'href="https://www.{domain}/">www.{domain}</a></link-formatter></grid-cell>'
+            f'<grid-cell data-columnid="founder_identifiers"><identifier-multi-formatter>{links}'
+            f'</identifier-multi-formatter></grid-cell></grid-row>')
+    grid.append('</grid-body></sheet-grid>')
+    return '<html><head><title>Crunchbase</title></head><body>' + ''.join(grid) + '</body></html>'
@@ -0,0 +1,121 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from app.config import Config
+from app.services import apollo_client
+from app.services.extractor import get_email_from_apollo, get_emails_from_apollo
+
+GUESS = 'jane.doe@acme.com'
+FOUND = {'people': [{'email': 'jane@acme.com'}]}
+
+class StubApollo(ThreadingHTTPServer):
+    """Local stand-in for the Apollo people search API, answering from a script of responses."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.script = []
+        self.default = (200, {}, FOUND)
+        self.delay = 0
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def respond(self, *responses, default=None):
+        self.script = list(responses)
+        if default is not None:
+            self.default = default
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.requests.append((self.path, body, time.time()))
+            status, headers, payload = self.server.script.pop(0) if self.server.script else self.server.default
+        time.sleep(self.server.delay)
+        data = json.dumps(payload).encode('utf-8')
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # The client gave up waiting
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def apollo(monkeypatch):
+    server = StubApollo()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    monkeypatch.setattr(Config, 'APOLLO_API_URL', server.url)
+    monkeypatch.setattr(Config, 'APOLLO_API_KEY', 'test-key')
+    monkeypatch.setattr(Config, 'APOLLO_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'APOLLO_RATE_LIMIT', 0)
+    monkeypatch.setattr(Config, 'APOLLO_MAX_RETRIES', 2)
+    monkeypatch.setattr(Config, 'APOLLO_BACKOFF_FACTOR', 0.01)
+    monkeypatch.setattr(Config, 'APOLLO_READ_TIMEOUT', 0.2)
+    # The session is rebuilt with the retry policy above
+    monkeypatch.setattr(apollo_client, '_session', None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_lookup_posts_the_person_search(apollo):
+    assert apollo_client.find_email('Jane', 'Doe', 'acme.com') == 'jane@acme.com'
+    [(path, body, _)] = apollo.requests
+    assert path == '/v1/people/search'
+    assert body == {'api_key': 'test-key', 'q_person_first_name': 'Jane', 'q_person_last_name': 'Doe',
+                    'q_organization_domains': 'acme.com'}
+
+def test_rate_limited_request_is_retried_after_retry_after(apollo):
+    apollo.respond((429, {'Retry-After': '1'}, {}))
+    assert apollo_client.find_email('Jane', 'Doe', 'acme.com') == 'jane@acme.com'
+
+    assert len(apollo.requests) == 2
+    assert apollo.requests[1][2] - apollo.requests[0][2] >= 0.9
+
+def test_server_errors_are_retried_up_to_the_limit(apollo):
+    apollo.respond(default=(503, {}, {}))
+    with pytest.raises(requests.HTTPError):
+        apollo_client.find_email('Jane', 'Doe', 'acme.com')
+    assert len(apollo.requests) == 1 + Config.APOLLO_MAX_RETRIES
+
+    # The extractor falls back to the guessed address
+    assert get_email_from_apollo('Jane', 'Doe', 'acme.com') == GUESS
+
+def test_recovers_from_a_transient_server_error(apollo):
+    apollo.respond((502, {}, {}), (500, {}, {}))
+    assert apollo_client.find_email('Jane', 'Doe', 'acme.com') == 'jane@acme.com'
+    assert len(apollo.requests) == 3
+
+def test_timeout_falls_back_to_the_guessed_address(apollo):
+    apollo.delay = 1
+    started = time.time()
+    assert get_email_from_apollo('Jane', 'Doe', 'acme.com') == GUESS
+    assert time.time() - started < 1 + Config.APOLLO_MAX_RETRIES
+
+def test_no_match_falls_back_to_the_guessed_address(apollo):
+    apollo.respond(default=(200, {}, {'people': []}))
+    assert get_email_from_apollo('Jane', 'Doe', 'acme.com') == GUESS
+
+def test_concurrent_identical_lookups_share_one_request(apollo, monkeypatch):
+    monkeypatch.setattr(Config, 'APOLLO_READ_TIMEOUT', 5)
+    apollo.delay = 0.3
+    people = [('Jane', 'Doe', 'acme.com'), (' jane', 'DOE ', 'Acme.com')] * 4
+    assert get_emails_from_apollo(people) == ['jane@acme.com'] * len(people)
+    assert len(apollo.requests) == 1
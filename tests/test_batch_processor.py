@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from app.config import Config
+from app.services import batch_processor
+
+def extract_or_crash(content, settings):
+    """Stand-in for process_html_file whose worker dies on a 'crash' page."""
+    if content == 'crash':
+        os._exit(1)
+    if content == 'error':
+        raise ValueError('bad page')
+    return {'page': content}
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(Config, 'BATCH_MAX_WORKERS', 2)
+    monkeypatch.setattr(batch_processor, 'process_html_file', extract_or_crash)
+    monkeypatch.setattr(batch_processor, '_executor', None)
+    yield
+    if batch_processor._executor is not None:
+        batch_processor._executor.shutdown()
+
+def test_batch_returns_rows_and_errors_in_order():
+    results = batch_processor.process_html_batch([('a.html', 'a'), ('b.html', 'error'), ('c.html', 'c')], {})
+    assert results == [('a.html', {'page': 'a'}, None), ('b.html', None, 'bad page'), ('c.html', {'page': 'c'}, None)]
+
+def test_dead_worker_fails_only_its_page():
+    files = [('a.html', 'a'), ('crash.html', 'crash'), ('c.html', 'c')]
+    results = batch_processor.process_html_batch(files, {})
+
+    assert [(name, data) for name, data, _ in results] == [('a.html', {'page': 'a'}), ('crash.html', None), ('c.html', {'page': 'c'})]
+    assert results[1][2]
+
+def test_pool_is_replaced_after_a_worker_dies():
+    broken = batch_processor.get_executor()
+    with pytest.raises(batch_processor.BrokenProcessPool):
+        broken.submit(extract_or_crash, 'crash', {}).result()
+
+    # The next batch hits the broken pool on submit and recovers instead of failing every page
+    results = batch_processor.process_html_batch([('a.html', 'a'), ('c.html', 'c')], {})
+    assert results == [('a.html', {'page': 'a'}, None), ('c.html', {'page': 'c'}, None)]
+    assert batch_processor.get_executor() is not broken
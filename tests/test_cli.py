@@ -0,0 +1,98 @@
+import csv
+import os
+
+import pytest
+
+from app import cli
+from app.config import Config
+
+def profile_page(company, founder):
+    slug = company.lower()
+    return ('<html><body><profile-v3-header><div class="top-row">'
+            f'<span class="entity-name">{company}</span></div>'
+            f'<span class="expanded-only-content">{company} makes things,\nin two lines.</span></profile-v3-header>'
+            f'<link-formatter><a target="_blank" href="https://www.{slug}.com/">www.{slug}.com</a></link-formatter>'
+            '<span class="wrappable-label-with-info">Founders</span><field-formatter><identifier-multi-formatter>'
+            f'<a href="/person/p">{founder}</a></identifier-multi-formatter></field-formatter></body></html>')
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(Config, 'APOLLO_API_KEY', 'YOUR_APOLLO_API_KEY')
+    monkeypatch.setattr(Config, 'APOLLO_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'PARSE_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_ENABLED', False)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATES_ENABLED', False)
+
+@pytest.fixture
+def pages(tmp_path):
+    directory = tmp_path / 'pages'
+    directory.mkdir()
+
+    def add(name, company, founder='Jane Doe'):
+        (directory / name).write_text(profile_page(company, founder), encoding='utf-8')
+    add.directory = str(directory)
+    return add
+
+def read_rows(output, filename):
+    with open(os.path.join(output, filename), newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def read_checkpoint(output):
+    return cli.load_checkpoint(output)[0]
+
+def test_run_writes_rows_and_resumes(pages, tmp_path):
+    output = str(tmp_path / 'out')
+    pages('a.html', 'Acme')
+    pages('b.html', 'Globex')
+    assert cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1) == 0
+
+    pages('c.html', 'Initech')
+    assert cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1) == 0
+    assert [row['Company Name'] for row in read_rows(output, 'companies.csv')] == ['Acme', 'Globex', 'Initech']
+    assert [row['Description'] for row in read_rows(output, 'pipelines.csv')][0] == 'Acme makes things,\nin two lines.'
+    assert read_checkpoint(output) == {'a.html', 'b.html', 'c.html'}
+
+def test_resume_drops_rows_torn_by_a_crash(pages, tmp_path):
+    output = str(tmp_path / 'out')
+    pages('a.html', 'Acme')
+    cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1)
+    expected = {filename: read_rows(output, filename) for _, filename, _, _ in cli.OUTPUT_TABLES}
+
+    # A crash between writing page b's rows and checkpointing it: one complete row, one cut
+    # off inside a quoted multi-line field, and half a checkpoint line
+    with open(os.path.join(output, 'companies.csv'), 'a', encoding='utf-8') as f:
+        f.write('Globex,www.globex.com\r\nInit')
+    with open(os.path.join(output, 'pipelines.csv'), 'a', encoding='utf-8') as f:
+        f.write('Globex,Globex,Jane Doe,jane.doe@globex.com,HV STEM,"Globex makes things,\nin')
+    with open(os.path.join(output, 'email_templates.txt'), 'a', encoding='utf-8') as f:
+        f.write('\n\njane.doe@globex.com\nGlobex Inv')
+    with open(os.path.join(output, cli.CHECKPOINT_FILE), 'a', encoding='utf-8') as f:
+        f.write('b.ht')
+
+    pages('b.html', 'Globex')
+    assert cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1) == 0
+    assert read_checkpoint(output) == {'a.html', 'b.html'}
+
+    fresh = str(tmp_path / 'fresh')
+    cli.run(pages.directory, fresh, Config.DEFAULT_SETTINGS.copy(), 1)
+    for filename in list(expected) + [cli.TEMPLATES_FILE]:
+        with open(os.path.join(output, filename), 'rb') as resumed, open(os.path.join(fresh, filename), 'rb') as f:
+            assert resumed.read() == f.read(), filename
+    assert read_rows(output, 'companies.csv')[:1] == expected['companies.csv']
+
+def test_crash_before_the_first_checkpoint(pages, tmp_path, monkeypatch):
+    output = str(tmp_path / 'out')
+    pages('a.html', 'Acme')
+
+    write = cli.OutputWriter.write
+    def crash(self, extracted_data):
+        self.files['companies'].write('Acme,www.ac')
+        self.files['companies'].flush()
+        raise KeyboardInterrupt
+    monkeypatch.setattr(cli.OutputWriter, 'write', crash)
+    with pytest.raises(KeyboardInterrupt):
+        cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1)
+
+    monkeypatch.setattr(cli.OutputWriter, 'write', write)
+    assert cli.run(pages.directory, output, Config.DEFAULT_SETTINGS.copy(), 1) == 0
+    assert read_rows(output, 'companies.csv') == [{'Company Name': 'Acme', 'Website': 'www.acme.com'}]
@@ -0,0 +1,140 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.config import Config
+from app.services import job_queue
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_STORE_PATH', str(tmp_path / 'jobs.sqlite3'))
+    monkeypatch.setattr(Config, 'JOB_WORKERS', 1)
+    monkeypatch.setattr(job_queue, '_local', threading.local())
+    monkeypatch.setattr(job_queue, '_executor', None)
+    yield
+    if job_queue._executor is not None:
+        job_queue._executor.shutdown()
+
+class BlockingHandler:
+    """Job handler that waits to be released before each file and records what it processed."""
+
+    def __init__(self, fail=()):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.fail = fail
+        self.processed = []
+
+    def __call__(self, filename, content):
+        self.started.set()
+        assert self.release.wait(5)
+        if filename in self.fail:
+            raise ValueError(f'cannot read {filename}')
+        self.processed.append(filename)
+        return {'length': len(content)}
+
+def wait_for(job_id, statuses, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = job_queue.get_job(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stayed {job['status']}")
+
+def test_job_runs_from_queued_to_done():
+    handler = BlockingHandler()
+    job_id = job_queue.submit_job([('a.html', 'aa'), ('b.html', 'bbb')], handler)
+    assert job_queue.get_job(job_id)['status'] in (job_queue.QUEUED, job_queue.RUNNING)
+
+    assert handler.started.wait(5)
+    job = job_queue.get_job(job_id)
+    assert job['status'] == job_queue.RUNNING
+    assert [f['status'] for f in job['files']] == [job_queue.RUNNING, job_queue.QUEUED]
+
+    handler.release.set()
+    job = wait_for(job_id, job_queue.FINISHED_STATUSES)
+    assert job['status'] == job_queue.DONE
+    assert job['error'] is None
+    assert [(f['filename'], f['status'], f['result']) for f in job['files']] == [
+        ('a.html', job_queue.DONE, {'length': 2}), ('b.html', job_queue.DONE, {'length': 3})]
+
+def test_cancel_while_queued():
+    running, queued = BlockingHandler(), BlockingHandler()
+    first = job_queue.submit_job([('a.html', 'a')], running)
+    second = job_queue.submit_job([('b.html', 'b')], queued)
+
+    assert job_queue.cancel_job(second) == job_queue.CANCELLED
+    queued.release.set()
+    running.release.set()
+    wait_for(first, job_queue.FINISHED_STATUSES)
+    job_queue._executor.shutdown()
+
+    job = job_queue.get_job(second)
+    assert job['status'] == job_queue.CANCELLED
+    assert [f['status'] for f in job['files']] == [job_queue.CANCELLED]
+    assert queued.processed == []
+
+def test_cancel_while_running_stops_before_the_next_file():
+    handler = BlockingHandler()
+    job_id = job_queue.submit_job([('a.html', 'a'), ('b.html', 'b')], handler)
+    assert handler.started.wait(5)
+
+    assert job_queue.cancel_job(job_id) == job_queue.RUNNING
+    handler.release.set()
+    job = wait_for(job_id, job_queue.FINISHED_STATUSES)
+    assert job['status'] == job_queue.CANCELLED
+    assert [f['status'] for f in job['files']] == [job_queue.DONE, job_queue.CANCELLED]
+    assert job_queue.cancel_job(job_id) == job_queue.CANCELLED
+
+def test_job_fails_only_if_every_file_fails():
+    handler = BlockingHandler(fail=('a.html',))
+    handler.release.set()
+    partial = wait_for(job_queue.submit_job([('a.html', 'a'), ('b.html', 'b')], handler), job_queue.FINISHED_STATUSES)
+    assert partial['status'] == job_queue.DONE
+    assert partial['error'] == '1 of 2 files failed'
+    assert partial['files'][0]['error'] == 'cannot read a.html'
+
+    failed = wait_for(job_queue.submit_job([('a.html', 'a')], handler), job_queue.FINISHED_STATUSES)
+    assert failed['status'] == job_queue.FAILED
+
+def test_unexpected_error_fails_the_job(monkeypatch):
+    def broken(job_id):
+        raise RuntimeError('database is locked')
+    monkeypatch.setattr(job_queue, 'is_cancel_requested', broken)
+    handler = BlockingHandler()
+    handler.release.set()
+
+    job = wait_for(job_queue.submit_job([('a.html', 'a')], handler), job_queue.FINISHED_STATUSES)
+    assert job['status'] == job_queue.FAILED
+    assert job['error'] == 'database is locked'
+    assert [f['status'] for f in job['files']] == [job_queue.FAILED]
+
+def insert_job(job_id, status, owner, heartbeat_at):
+    conn = job_queue.get_connection()
+    conn.execute("INSERT INTO jobs (id, status, created_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?)",
+                 (job_id, status, heartbeat_at, owner, heartbeat_at))
+    conn.execute("INSERT INTO job_files (job_id, position, filename, status) VALUES (?, 0, 'a.html', ?)",
+                 (job_id, status))
+
+def test_jobs_of_dead_or_silent_workers_are_failed():
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True, check=True)
+    host = socket.gethostname()
+    now = time.time()
+    insert_job('dead', job_queue.RUNNING, f'{host}:{exited.stdout.strip()}', now)
+    insert_job('alive', job_queue.QUEUED, job_queue.worker_name(), now - 2 * Config.JOB_STALE_AFTER)
+    insert_job('remote_silent', job_queue.RUNNING, 'elsewhere:1', now - 2 * Config.JOB_STALE_AFTER)
+    insert_job('remote_recent', job_queue.RUNNING, 'elsewhere:1', now)
+
+    # Status polls report what is stored; only the sweep fails jobs
+    assert job_queue.get_job('dead')['status'] == job_queue.RUNNING
+    assert job_queue.fail_stale_jobs() == 2
+    statuses = {job_id: job_queue.get_job(job_id)['status']
+                for job_id in ('dead', 'alive', 'remote_silent', 'remote_recent')}
+    assert statuses == {'dead': job_queue.FAILED, 'alive': job_queue.QUEUED,
+                        'remote_silent': job_queue.FAILED, 'remote_recent': job_queue.RUNNING}
+    assert job_queue.get_job('dead')['files'][0]['status'] == job_queue.FAILED
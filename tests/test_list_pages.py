@@ -0,0 +1,68 @@
+import pytest
+
+from app.config import Config
+from app.services.extractor import process_html_file
+from app.services.list_extractor import is_list_page
+
+GRID_HEADER = ('<sheet-grid><grid-header><grid-row class="header">'
+               '<grid-column-header data-columnid="identifier">Organization Name</grid-column-header>'
+               '<grid-column-header data-columnid="website">Website</grid-column-header>'
+               '</grid-row></grid-header><grid-body>')
+GRID_FOOTER = '</grid-body></sheet-grid>'
+
+def grid(*companies):
+    rows = ''.join(
+        f'<grid-row><grid-cell data-columnid="identifier"><identifier-formatter><a href="/organization/{slug}">'
+        f'<div class="identifier-label">{name}</div></a></identifier-formatter></grid-cell>'
+        f'<grid-cell data-columnid="website"><link-formatter><a href="https://www.{slug}.com/">www.{slug}.com</a>'
+        f'</link-formatter></grid-cell></grid-row>'
+        for name, slug in companies)
+    return GRID_HEADER + rows + GRID_FOOTER
+
+PROFILE = ('<profile-v3-header><div class="top-row"><span class="entity-name">Acme</span></div>'
+           '<span class="expanded-only-content">Acme builds rockets.</span></profile-v3-header>'
+           '<link-formatter><a target="_blank" href="https://www.acme.com/">www.acme.com</a></link-formatter>')
+
+def page(body):
+    return f'<html><head><title>Crunchbase</title></head><body>{body}</body></html>'
+
+PAGES = {
+    'list': page(grid(('Globex', 'globex'), ('Initech', 'initech'))),
+    'empty_list': page(grid()),
+    'profile_with_similar_companies': page(PROFILE + '<h2>Similar Companies</h2>' + grid(('Globex', 'globex'))),
+    'profile_with_empty_grid': page(PROFILE + grid()),
+    'profile': page(PROFILE)
+}
+
+@pytest.fixture(autouse=True)
+def dom_only(monkeypatch):
+    monkeypatch.setattr(Config, 'LIST_PAGES_ENABLED', True)
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', False)
+    monkeypatch.setattr(Config, 'PARSE_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_ENABLED', False)
+    monkeypatch.setattr(Config, 'APOLLO_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'APOLLO_API_KEY', 'YOUR_APOLLO_API_KEY')
+
+def companies(name):
+    return process_html_file(PAGES[name], Config.DEFAULT_SETTINGS.copy())['companies']
+
+@pytest.mark.parametrize('name, expected', [
+    ('list', True),
+    ('empty_list', True),
+    ('profile_with_similar_companies', False),
+    ('profile_with_empty_grid', False),
+    ('profile', False)
+])
+def test_list_page_detection(name, expected):
+    assert is_list_page(PAGES[name]) is expected
+
+def test_list_page_has_a_row_per_company():
+    assert companies('list') == [{'Company Name': 'Globex', 'Website': 'www.globex.com'},
+                                 {'Company Name': 'Initech', 'Website': 'www.initech.com'}]
+
+def test_empty_list_page_has_no_rows():
+    assert companies('empty_list') == []
+
+@pytest.mark.parametrize('name', ['profile_with_similar_companies', 'profile_with_empty_grid'])
+def test_profile_with_an_embedded_grid_keeps_its_company(name):
+    assert companies(name) == [{'Company Name': 'Acme', 'Website': 'www.acme.com'}]
@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.config import Config
+from app.services import materialized_export
+from app.services.email_generator import create_template_records
+from app.services.exporter import generate_results_zip
+from app.services.materialized_export import MANIFEST_NAME, MaterializedExport, memory_directory
+from app.services.result_store import DEDUP_KEYS, MemoryResultStore, SQLiteResultStore
+
+DEDUP = {table: key_sets[0] for table, key_sets in DEDUP_KEYS.items()}
+
+def make_results(start, count, settings):
+    """Build the rows a confirm of `count` new companies would add."""
+    contacts, companies, pipelines = [], [], []
+    for i in range(start, start + count):
+        name = f'Company {i}, "Quoted" & Co'
+        contacts.append({'Contact Name': f'Jane Doe{i}', 'First Name': 'Jane', 'Last Name': f'Doe{i}',
+                         'Prospect Quality Level': 'Prospect', 'Company Name': name, 'Industry': '',
+                         'Email': f'jane{i}@company{i}.com'})
+        companies.append({'Company Name': name, 'Website': f'https://company{i}.com'})
+        pipelines.append({'Deal Name': name, 'Company Name': name, 'Contact Name': f'Jane Doe{i}',
+                          'Contact Email': f'jane{i}@company{i}.com', 'Description': f'Line one\nline {i}'})
+    return {'contacts': contacts, 'companies': companies, 'pipelines': pipelines,
+            'email_templates': create_template_records(contacts, settings)}
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_BATCH_ROWS', 3)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATES_ENABLED', False)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    store = MemoryResultStore() if request.param == 'memory' else SQLiteResultStore(str(tmp_path / 'results.sqlite3'))
+    store.exports = MaterializedExport(str(tmp_path / 'exports'))
+    return store
+
+def add(store, start, count):
+    return store.add_results(make_results(start, count, store.get_settings()), DEDUP)
+
+def served(store):
+    path, _ = store.exports.download(store)
+    with open(path, 'rb') as f:
+        return f.read()
+
+def assert_served_matches_stream(store):
+    assert served(store) == b''.join(generate_results_zip(store))
+
+def test_empty_store(store):
+    assert_served_matches_stream(store)
+
+def test_append_updates_files_without_rebuilding(store):
+    add(store, 0, 5)
+    assert_served_matches_stream(store)
+    build = store.exports.load_manifest()['build']
+
+    add(store, 5, 4)
+    add(store, 0, 2)  # duplicates only: nothing changes
+    assert_served_matches_stream(store)
+    assert store.exports.load_manifest()['build'] == build
+
+def test_remove_last_truncates_each_file(store):
+    add(store, 0, 4)
+    assert_served_matches_stream(store)
+    build = store.exports.load_manifest()['build']
+
+    for _ in range(5):
+        store.remove_last()
+        assert_served_matches_stream(store)
+    add(store, 10, 2)
+    assert_served_matches_stream(store)
+    assert store.exports.load_manifest()['build'] == build
+
+def test_clear_resets_files(store):
+    add(store, 0, 3)
+    assert_served_matches_stream(store)
+    store.clear()
+    assert_served_matches_stream(store)
+    add(store, 3, 2)
+    assert_served_matches_stream(store)
+
+def test_template_settings_change_rebuilds(store):
+    add(store, 0, 3)
+    assert_served_matches_stream(store)
+    build = store.exports.load_manifest()['build']
+
+    # Settings the templates do not read keep the files
+    store.update_settings({'industry_vertical': 'Fintech'})
+    assert_served_matches_stream(store)
+    assert store.exports.load_manifest()['build'] == build
+
+    store.update_settings({'sourcing_analyst': 'Alex Kim'})
+    assert_served_matches_stream(store)
+    assert store.exports.load_manifest()['build'] != build
+
+def test_template_change_applies_to_new_entries(store):
+    add(store, 0, 2)
+    assert_served_matches_stream(store)
+    store.update_settings({'email_template': 'follow_up'})
+    add(store, 2, 2)
+    assert_served_matches_stream(store)
+
+@pytest.mark.parametrize('manifest', [None, b'{"store_id": ', b'[]', b'{}'])
+def test_missing_or_corrupted_manifest_rebuilds(store, manifest):
+    add(store, 0, 3)
+    assert_served_matches_stream(store)
+
+    path = store.exports.path(MANIFEST_NAME)
+    os.remove(path)
+    if manifest is not None:
+        with open(path, 'wb') as f:
+            f.write(manifest)
+    add(store, 3, 2)
+    assert_served_matches_stream(store)
+
+def test_manifest_missing_files_rebuilds(store):
+    add(store, 0, 3)
+    assert_served_matches_stream(store)
+
+    manifest = store.exports.load_manifest()
+    del manifest['files']['companies.csv']
+    store.exports.save_manifest(manifest)
+    add(store, 3, 2)
+    assert_served_matches_stream(store)
+
+def test_manifest_of_another_store_is_not_served(store, tmp_path):
+    add(store, 0, 3)
+    assert_served_matches_stream(store)
+
+    other = MemoryResultStore()
+    other.exports = store.exports
+    add(other, 7, 1)
+    assert_served_matches_stream(other)
+    assert_served_matches_stream(store)
+
+def test_keeps_the_two_newest_archives(store):
+    paths = []
+    for i in range(4):
+        add(store, i, 1)
+        path, _ = store.exports.download(store)
+        os.utime(path, (i, i))
+        paths.append(path)
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+
+def test_memory_directories_of_exited_processes_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(materialized_export.atexit, 'register', lambda *args, **kwargs: None)
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True, check=True)
+    stale = tmp_path / f'memory-{exited.stdout.strip()}'
+    stale.mkdir()
+    live = tmp_path / f'memory-{os.getppid()}'
+    live.mkdir()
+
+    directory = memory_directory(str(tmp_path))
+    assert directory == str(tmp_path / f'memory-{os.getpid()}')
+    assert not stale.exists()
+    assert live.exists()
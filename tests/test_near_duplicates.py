@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from app.config import Config
+from app.services import near_duplicates, result_store
+from app.services.near_duplicates import NearDuplicateIndex, canonical_domain, make_signature, name_tokens, score
+from app.services.result_store import MemoryResultStore, SQLiteResultStore
+
+def company(name, website):
+    return {'Company Name': name, 'Website': website}
+
+def contact(name, email, company_name):
+    return {'Contact Name': name, 'Email': email, 'Company Name': company_name}
+
+STORED_COMPANIES = [
+    company('Acme, Inc.', 'https://www.acme.com/'),
+    company('Acme Rocket Space', 'https://rockets.example.org'),
+    company('Globex', 'http://globex.io'),
+    company('Unknown Company', 'https://unknown.com')
+]
+
+PROBE_COMPANIES = [
+    company('ACME Inc', 'acme.com'),                                      # same domain and name
+    company('Acme Rocket Space Labs', 'https://rockets.example.org/about'),  # same domain, close name
+    company('Globex Corporation', 'https://other.io'),                     # name only
+    company('Initech', 'https://initech.com'),                             # nothing shared
+    company('Unknown Company', 'https://unknown.com')                      # placeholders only
+]
+
+STORED_CONTACTS = [
+    contact('Jane Doe', 'jane@acme.com', 'Acme'),
+    contact('Bob Chen', 'bob@gmail.com', 'Globex')
+]
+
+PROBE_CONTACTS = [
+    contact('Jane  Doe', 'j.doe@acme.com', 'Acme Inc.'),   # same person at the same domain
+    contact('Bob Chen', 'bob.chen@gmail.com', 'Initech'),  # free-mail domains say nothing about the company
+    contact('Unknown Contact', 'x@unknown.com', 'Acme')     # placeholder founder and domain
+]
+
+@pytest.fixture(autouse=True)
+def near_duplicates_enabled(monkeypatch):
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATES_ENABLED', True)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATE_THRESHOLD', 0.85)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryResultStore()
+    return SQLiteResultStore(str(tmp_path / 'results.sqlite3'))
+
+def test_signature_normalizes_domain_name_and_founder():
+    assert canonical_domain('https://www.Acme.com/about') == 'acme.com'
+    assert canonical_domain('jane@Acme.com') == 'acme.com'
+    assert name_tokens('Acme, Inc.') == frozenset({'acme'})
+    assert name_tokens('The Company') == frozenset({'the', 'company'})
+    assert make_signature('contacts', contact('Jane  Doe', 'jane@acme.com', 'Acme LLC')) == \
+        ('acme.com', frozenset({'acme'}), 'jane doe')
+
+def test_placeholders_and_free_mail_are_not_signals():
+    assert canonical_domain('jane@gmail.com') is None
+    assert canonical_domain('https://unknown.com') is None
+    assert name_tokens('Unknown Company') is None
+    assert make_signature('contacts', contact('Unknown Contact', 'a@outlook.com', 'Unknown Company')) == \
+        (None, None, None)
+
+def test_score_uses_only_shared_signals():
+    full = ('acme.com', frozenset({'acme', 'rocket'}), 'jane doe')
+    assert score(full, full) == (1.0, 3)
+    assert score(full, ('acme.com', frozenset({'acme'}), None)) == (pytest.approx((0.4 + 0.35 * 0.5) / 0.75), 2)
+    assert score(full, (None, None, 'john roe')) == (0.0, 1)
+    assert score((None, None, None), full) == (0.0, 0)
+
+def test_index_needs_two_signals_and_the_threshold():
+    index = NearDuplicateIndex('companies')
+    for position, entry in enumerate(STORED_COMPANIES):
+        index.add(position, entry)
+
+    assert [index.find(probe) and index.find(probe)[0] for probe in PROBE_COMPANIES] == [0, 1, None, None, None]
+
+    index.remove(0)
+    assert index.find(PROBE_COMPANIES[0]) is None
+
+def test_oversized_blocks_are_skipped(monkeypatch, store):
+    store.add_results({'companies': STORED_COMPANIES[1:2]}, {'companies': None})
+    assert store.find_near_duplicate('companies', PROBE_COMPANIES[1]) is not None
+
+    # Once the shared domain block outgrows MAX_BLOCK_SIZE it no longer yields candidates
+    monkeypatch.setattr(near_duplicates, 'MAX_BLOCK_SIZE', 2)
+    monkeypatch.setattr(result_store, 'MAX_BLOCK_SIZE', 2)
+    store.add_results({'companies': [company('Foo', 'https://rockets.example.org/foo'),
+                                     company('Bar', 'https://rockets.example.org/bar')]}, {'companies': None})
+    assert store.find_near_duplicate('companies', PROBE_COMPANIES[1]) is None
+
+def test_stores_find_the_same_near_duplicates(tmp_path):
+    results = {'companies': STORED_COMPANIES, 'contacts': STORED_CONTACTS}
+    keys = {'companies': None, 'contacts': None}
+    memory = MemoryResultStore()
+    sqlite = SQLiteResultStore(str(tmp_path / 'results.sqlite3'))
+    memory.add_results(results, keys)
+    sqlite.add_results(results, keys)
+
+    for table, probes in [('companies', PROBE_COMPANIES), ('contacts', PROBE_CONTACTS)]:
+        found = [memory.find_near_duplicate(table, probe) for probe in probes]
+        assert [sqlite.find_near_duplicate(table, probe) for probe in probes] == found
+    assert found == [STORED_CONTACTS[0], None, None]
+
+def test_sqlite_backfills_keys_of_entries_stored_before_near_duplicates(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    conn = SQLiteResultStore(path).get_connection()
+    # An older database: entries without blocking keys, and no record of the backfill
+    conn.executemany("INSERT INTO results (table_name, data) VALUES ('companies', ?)",
+                     [(json.dumps(entry),) for entry in STORED_COMPANIES])
+    conn.execute("DELETE FROM store_meta WHERE name = 'near_keys'")
+
+    store = SQLiteResultStore(path)
+    assert store.find_near_duplicate('companies', PROBE_COMPANIES[0]) == STORED_COMPANIES[0]
+    near_keys = "SELECT COUNT(*) FROM result_keys WHERE key_name = 'near'"
+    indexed = conn.execute(near_keys).fetchone()[0]
+
+    # The backfill runs once
+    SQLiteResultStore(path)
+    assert conn.execute(near_keys).fetchone()[0] == indexed
+
+def test_near_duplicates_are_kept_unless_enabled(monkeypatch, store):
+    store.add_results({'companies': STORED_COMPANIES[:1]}, {'companies': result_store.COMPANY_KEYS})
+
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATES_ENABLED', False)
+    assert not store.is_stored('companies', PROBE_COMPANIES[0], result_store.COMPANY_KEYS)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATES_ENABLED', True)
+    assert store.is_stored('companies', PROBE_COMPANIES[0], result_store.COMPANY_KEYS)
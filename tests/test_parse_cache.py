@@ -0,0 +1,65 @@
+import pytest
+
+from app.config import Config
+from app.services import parse_cache
+from app.services.extractor import extract_page_fields
+
+# The app state names one company and the DOM another, so the result shows which one was read
+PAGE = ('<html><body><profile-v3-header><div class="top-row"><span class="entity-name">Acme DOM</span></div>'
+        '</profile-v3-header>'
+        '<script id="client-app-state" type="application/json">{&q;GET/v4/data/entities/organizations/acme&q;: '
+        '{&q;data&q;: {&q;properties&q;: {&q;identifier&q;: {&q;value&q;: &q;Acme State&q;, '
+        '&q;entity_def_id&q;: &q;organization&q;}}}}}</script></body></html>')
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'PARSE_CACHE_ENABLED', True)
+    monkeypatch.setattr(Config, 'PARSE_CACHE_DIR', str(tmp_path / 'parse_cache'))
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_ENABLED', False)
+    monkeypatch.setattr(Config, 'HTML_PARSER', 'html.parser')
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', True)
+    monkeypatch.setattr(Config, 'PREFILTER_ENABLED', True)
+    parse_cache.clear_cache()
+    yield
+    parse_cache.clear_cache()
+
+def test_key_names_backend_and_switches(monkeypatch):
+    key = parse_cache.content_key(PAGE)
+    assert parse_cache.content_key(PAGE.encode('utf-8')) == key
+    assert parse_cache.content_key(PAGE, 'html.parser') == key
+
+    other_keys = {parse_cache.content_key(PAGE, 'lxml'), parse_cache.content_key(PAGE, 'html5lib')}
+    monkeypatch.setattr(Config, 'HTML_PARSER', 'lxml')
+    assert parse_cache.content_key(PAGE) == parse_cache.content_key(PAGE, 'lxml')
+    monkeypatch.setattr(Config, 'HTML_PARSER', 'html.parser')
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', False)
+    other_keys.add(parse_cache.content_key(PAGE))
+    monkeypatch.setattr(Config, 'PREFILTER_ENABLED', False)
+    other_keys.add(parse_cache.content_key(PAGE))
+    assert len(other_keys) == 4 and key not in other_keys
+
+@pytest.mark.parametrize('disk_only', [False, True])
+def test_toggling_app_state_is_not_served_from_the_cache(monkeypatch, disk_only):
+    assert extract_page_fields(PAGE)['company_name'] == 'Acme State'
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', False)
+    if disk_only:
+        parse_cache.clear_cache()
+    assert extract_page_fields(PAGE)['company_name'] == 'Acme DOM'
+
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', True)
+    if disk_only:
+        parse_cache.clear_cache()
+    assert extract_page_fields(PAGE)['company_name'] == 'Acme State'
+    stats = parse_cache.get_cache_stats()
+    assert (stats['disk_hits'] if disk_only else stats['hits']) == 1
+
+def test_cached_fields_are_copies():
+    fields = extract_page_fields(PAGE)
+    fields['company_name'] = 'Changed'
+    fields['founders'].append('Someone')
+
+    cached = extract_page_fields(PAGE)
+    assert cached['company_name'] == 'Acme State'
+    assert cached['founders'] == []
+    cached['founders'].append('Someone else')
+    assert extract_page_fields(PAGE)['founders'] == []
@@ -0,0 +1,114 @@
+import importlib.util
+
+import pytest
+
+from app.config import Config
+from app.services.extractor import extract_page_fields, process_html_file
+from sample_pages import list_page, profile_page
+
+# Packages each backend needs; backends that are not installed are skipped
+BACKEND_PACKAGES = {'html.parser': None, 'lxml': 'lxml', 'html5lib': 'html5lib'}
+
+# Hand-written pages with the markup quirks saved pages have: unclosed tags, entities, stray whitespace
+SAMPLE_PAGES = {
+    'unclosed_tags': (
+        '<html><head><title>Acme | Crunchbase</title></head><body>'
+        '<profile-v3-header><div class="top-row"><span class="entity-name">Acme &amp; Co</span></div>'
+        '<span class="expanded-only-content">Acme builds   rockets &mdash; reusable ones</span><p>and more'
+        '</profile-v3-header>'
+        '<link-formatter><a target="_blank" href="https://www.acme.com/">www.acme.com</a></link-formatter>'
+        '<span class="wrappable-label-with-info">Founders</span>'
+        '<field-formatter><identifier-multi-formatter><a href="/person/jane">Jane Doe</a>, '
+        '<a href="/person/john">John Roe</a></identifier-multi-formatter></field-formatter>'
+        '</body></html>'
+    ),
+    'no_fields': '<html><body><div>Nothing to see<br>here</div></body></html>',
+    'misnested_paragraph': (
+        '<html><body><span class="entity-name">Acme</span>'
+        '<span class="expanded-only-content">Rockets<p>and more</span>'
+        '<a href="https://www.acme.com/" title="www.acme.com">www.acme.com</a></body></html>'
+    )
+}
+
+# Known differences: html5lib repairs a <p> inside a <span> the way browsers do, which moves later text
+KNOWN_DIFFERENCES = {('misnested_paragraph', 'html5lib')}
+
+BRIGHTLINE = ('Brightline Robotics', 'brightline.io', 'Brightline Robotics builds warehouse robots.')
+
+GENERATED_PAGES = {
+    'profile': profile_page(*BRIGHTLINE, ['Priya Patel', 'Luis Garcia', 'Mei Chen']),
+    'profile_one_founder': profile_page(*BRIGHTLINE, ['Priya Patel']),
+    'profile_missing_website': profile_page(*BRIGHTLINE, ['Priya Patel'], missing=('website',)),
+    'profile_missing_founders': profile_page(*BRIGHTLINE, ['Priya Patel'], missing=('founders', 'description')),
+    'list': list_page([
+        ('Acme', 'acme.com', 'Acme builds rockets.', ['Jane Doe', 'John Roe']),
+        ('Globex', 'globex.io', 'Globex sells widgets.', [])
+    ])
+}
+
+# Fields every backend must read from the generated profile pages
+EXPECTED_FIELDS = {
+    'profile': {'company_name': 'Brightline Robotics', 'website': 'www.brightline.io',
+                'description': 'Brightline Robotics builds warehouse robots.',
+                'founders': ['Priya Patel', 'Luis Garcia', 'Mei Chen']},
+    'profile_one_founder': {'company_name': 'Brightline Robotics', 'website': 'www.brightline.io',
+                            'description': 'Brightline Robotics builds warehouse robots.',
+                            'founders': ['Priya Patel']},
+    'profile_missing_website': {'company_name': 'Brightline Robotics', 'website': '',
+                                'description': 'Brightline Robotics builds warehouse robots.',
+                                'founders': ['Priya Patel']},
+    'profile_missing_founders': {'company_name': 'Brightline Robotics', 'website': 'www.brightline.io',
+                                 'description': '', 'founders': []}
+}
+
+# (Company Name, Website, Contact Name, Description) of each row on the generated list page
+EXPECTED_LIST_ROWS = [
+    ('Acme', 'www.acme.com', 'Jane Doe', 'Acme builds rockets.'),
+    ('Globex', 'www.globex.io', 'Unknown Contact', 'Globex sells widgets.')
+]
+
+@pytest.fixture(autouse=True)
+def dom_only(monkeypatch):
+    """Read every field from the DOM, without caches, stats or Apollo lookups."""
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', False)
+    monkeypatch.setattr(Config, 'PARSE_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_ENABLED', False)
+    monkeypatch.setattr(Config, 'APOLLO_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'APOLLO_API_KEY', 'YOUR_APOLLO_API_KEY')
+
+def installed_backends():
+    return [backend for backend, package in BACKEND_PACKAGES.items()
+            if package is None or importlib.util.find_spec(package) is not None]
+
+@pytest.mark.parametrize('backend', [backend for backend in BACKEND_PACKAGES if backend != 'html.parser'])
+@pytest.mark.parametrize('name', sorted({**SAMPLE_PAGES, **GENERATED_PAGES}))
+def test_backends_extract_identical_rows(name, backend, request):
+    if backend not in installed_backends():
+        pytest.skip(f"{BACKEND_PACKAGES[backend]} is not installed")
+    if (name, backend) in KNOWN_DIFFERENCES:
+        request.applymarker(pytest.mark.xfail(strict=True, reason=f"{backend} repairs misnested markup differently"))
+    page = {**SAMPLE_PAGES, **GENERATED_PAGES}[name]
+    settings = Config.DEFAULT_SETTINGS.copy()
+
+    expected = process_html_file(page, settings, 'html.parser')
+    assert process_html_file(page, settings, backend) == expected
+
+@pytest.mark.parametrize('backend', list(BACKEND_PACKAGES))
+@pytest.mark.parametrize('name', sorted(EXPECTED_FIELDS))
+def test_backends_extract_expected_profile_fields(name, backend):
+    if backend not in installed_backends():
+        pytest.skip(f"{BACKEND_PACKAGES[backend]} is not installed")
+    fields = extract_page_fields(GENERATED_PAGES[name], backend)
+
+    assert {key: fields[key] for key in EXPECTED_FIELDS[name]} == EXPECTED_FIELDS[name]
+
+@pytest.mark.parametrize('backend', list(BACKEND_PACKAGES))
+def test_backends_extract_expected_list_rows(backend):
+    if backend not in installed_backends():
+        pytest.skip(f"{BACKEND_PACKAGES[backend]} is not installed")
+    rows = process_html_file(GENERATED_PAGES['list'], Config.DEFAULT_SETTINGS.copy(), backend)
+
+    companies = [(row['Company Name'], row['Website']) for row in rows['companies']]
+    pipelines = [(row['Contact Name'], row['Description']) for row in rows['pipelines']]
+    assert [company + pipeline for company, pipeline in zip(companies, pipelines)] == EXPECTED_LIST_ROWS
+    assert len(companies) == len(pipelines) == len(EXPECTED_LIST_ROWS)
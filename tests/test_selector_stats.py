@@ -0,0 +1,38 @@
+from concurrent.futures import ProcessPoolExecutor
+import threading
+
+import pytest
+
+from app.config import Config
+from app.services import selector_stats
+from app.services.extractor import extract_page_fields
+
+PAGE = ('<html><body><profile-v3-header><div class="top-row"><span class="entity-name">Acme</span></div>'
+        '</profile-v3-header></body></html>')
+
+@pytest.fixture
+def stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_ENABLED', True)
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_PATH', str(tmp_path / 'selector_stats.sqlite3'))
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_FLUSH', 1000)
+    monkeypatch.setattr(Config, 'PARSE_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'APP_STATE_ENABLED', False)
+    monkeypatch.setattr(selector_stats, '_local', threading.local())
+    selector_stats.clear_stats()
+    yield
+    selector_stats.clear_stats()
+
+def name_hits():
+    return selector_stats.load_stats()['company_name']['.entity-name'][0]
+
+def test_counts_are_flushed_every_few_pages(stats, monkeypatch):
+    monkeypatch.setattr(Config, 'SELECTOR_STATS_FLUSH', 2)
+    extract_page_fields(PAGE)
+    assert selector_stats.load_stats()['company_name'] == {}
+    extract_page_fields(PAGE)
+    assert name_hits() == 2
+
+def test_process_pool_workers_flush_their_counts_on_exit(stats):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(executor.map(extract_page_fields, [PAGE] * 5))
+    assert name_hits() == 5